@@ -39,6 +39,23 @@ def create_app(config_name):
         cf_services = json.loads(application.config['VCAP_SERVICES'])
         application.config['SQLALCHEMY_DATABASE_URI'] = cf_services['postgres'][0]['credentials']['uri']
 
+    from .json_utils import set_json_backend
+    json_backend = set_json_backend(application.config['DM_API_JSON_BACKEND'])
+    if json_backend != application.config['DM_API_JSON_BACKEND']:
+        application.logger.warning("JSON backend {} is not installed (or is too old), using {}".format(
+            application.config['DM_API_JSON_BACKEND'], json_backend
+        ))
+
+    from .validation import _SCHEMAS, set_validation_engine, warm_validator_cache
+    set_validation_engine(application.config['DM_API_VALIDATION_ENGINE'])
+    if application.config['DM_API_SCHEMA_BUNDLE_PATH']:
+        _SCHEMAS.use_bundle(application.config['DM_API_SCHEMA_BUNDLE_PATH'])
+    if application.config['DM_API_WARM_VALIDATOR_CACHE']:
+        warm_validator_cache()
+    application.logger.info("Loaded {} of {} JSON schemas in {:.3f}s at startup".format(
+        _SCHEMAS.loaded_count, len(_SCHEMAS), _SCHEMAS.load_seconds
+    ))
+
     from .main import main as main_blueprint
     from .status import status as status_blueprint
     from .callbacks import callbacks as callbacks_blueprint
@@ -47,6 +64,9 @@ def create_app(config_name):
     application.register_blueprint(callbacks_blueprint, url_prefix='/callbacks')
     application.register_blueprint(status_blueprint)
 
+    from .compression import compress_response
+    application.after_request(compress_response)
+
     return application
 
 
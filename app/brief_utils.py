@@ -6,12 +6,13 @@ from .service_utils import filter_services
 from .utils import index_object
 
 
-def validate_brief_data(brief, enforce_required=True, required_fields=None):
+def validate_brief_data(brief, enforce_required=True, required_fields=None, touched_fields=None):
     errs = get_validation_errors(
         'briefs-{}-{}'.format(brief.framework.slug, brief.lot.slug),
         brief.data,
         enforce_required=enforce_required,
-        required_fields=required_fields
+        required_fields=required_fields,
+        touched_fields=touched_fields
     )
 
     criteria_weighting_keys = ['technicalWeighting', 'culturalWeighting', 'priceWeighting']
@@ -0,0 +1,98 @@
+"""
+Compressing responses for clients that accept it.
+
+`compress_response` runs after every request, once the JSON has been encoded. It gzips (or, if the brotli package is
+installed and 'br' is in DM_API_COMPRESSION_ENCODINGS, brotli compresses) JSON and text responses of at least
+DM_API_COMPRESSION_MIN_SIZE bytes, picking the encoding from the request's Accept-Encoding. Streamed responses are
+compressed as they're written out. scripts/benchmark_compression.py shows what each level costs and saves.
+"""
+import gzip
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json',)
+
+
+def available_encodings():
+    """The configured encodings that can be used, in order of preference."""
+    return [
+        encoding for encoding in current_app.config['DM_API_COMPRESSION_ENCODINGS']
+        if encoding == 'gzip' or (encoding == 'br' and brotli is not None)
+    ]
+
+
+def _level(encoding):
+    if encoding == 'br':
+        return current_app.config['DM_API_BROTLI_QUALITY']
+    return current_app.config['DM_API_GZIP_LEVEL']
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level)
+
+
+def _compressed_chunks(chunks, encoding, level):
+    # Chunks are flushed as they come, so streamed responses still arrive a batch at a time. This runs after the
+    # request has finished, so mustn't use the app or request context.
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            if chunk:
+                yield compressor.process(_as_bytes(chunk)) + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            if chunk:
+                yield compressor.compress(_as_bytes(chunk)) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+def _as_bytes(chunk):
+    return chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def _is_compressible(response):
+    return (
+        200 <= response.status_code < 300 and response.status_code != 204 and
+        not response.direct_passthrough and
+        'Content-Encoding' not in response.headers and
+        (response.mimetype in COMPRESSIBLE_MIMETYPES or (response.mimetype or '').startswith('text/'))
+    )
+
+
+def compress_response(response):
+    """
+    `after_request` handler compressing `response` with the best encoding the client accepts. Compressed responses'
+    ETags become weak, as the compressed bytes aren't the representation the ETag was made for.
+    """
+    encodings = available_encodings()
+    if not encodings or not _is_compressible(response):
+        return response
+    if not response.is_streamed and len(response.get_data()) < current_app.config['DM_API_COMPRESSION_MIN_SIZE']:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compressed_chunks(response.response, encoding, _level(encoding))
+    else:
+        response.set_data(compress(response.get_data(), encoding, _level(encoding)))
+    response.headers['Content-Encoding'] = encoding
+
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+
+    return response
@@ -1,5 +1,13 @@
+import multiprocessing
+import time
+from collections import Counter, defaultdict
+
+from . import db
+from .models import DraftService, Lot
+from .service_utils import get_service_validator_name
 from .utils import get_json_from_request, json_has_required_keys, \
     json_has_matching_id
+from .validation import get_validation_errors
 
 
 def validate_and_return_draft_request(draft_id=0):
@@ -8,3 +16,89 @@ def validate_and_return_draft_request(draft_id=0):
     if draft_id:
         json_has_matching_id(json_payload['services'], draft_id)
     return json_payload['services']
+
+
+def _validate_draft_row(row):
+    """Validate one (draft id, lot slug, schema name, data) row. Runs in a worker process, so must stay picklable."""
+    draft_id, lot_slug, schema_name, data = row
+    return draft_id, lot_slug, list(get_validation_errors(schema_name, data))
+
+
+def _stream_draft_rows(framework, batch_size):
+    rows = db.session.query(
+        DraftService.id, Lot.slug, DraftService.data
+    ).join(
+        Lot, DraftService.lot_id == Lot.id
+    ).filter(
+        DraftService.framework_id == framework.id,
+        DraftService.status.in_(('submitted', 'failed')),
+    ).order_by(
+        DraftService.id
+    ).execution_options(
+        stream_results=True
+    ).yield_per(batch_size)
+
+    for draft_id, lot_slug, data in rows:
+        yield draft_id, lot_slug, get_service_validator_name(framework.slug, lot_slug), data
+
+
+def _bulk_update_status(draft_ids, status, batch_size):
+    for start in range(0, len(draft_ids), batch_size):
+        DraftService.query.filter(
+            DraftService.id.in_(draft_ids[start:start + batch_size]),
+            DraftService.status != status,
+        ).update({'status': status}, synchronize_session=False)
+
+
+def validate_drafts_for_framework(framework, processes=None, batch_size=500, dry_run=False):
+    """
+    Check every completed (submitted or failed) draft service on `framework` against its lot's schema, marking it
+    'submitted' if it is valid and 'failed' if it isn't. Drafts are streamed from the database and validated across
+    a pool of `processes` worker processes (one per CPU by default, or in this process if `processes` is 1), and the
+    statuses are written in bulk at the end.
+
+    Returns a summary of the run: counts of valid and invalid drafts per lot, how often each question failed and the
+    ids of the invalid drafts.
+    """
+    start = time.perf_counter()
+    valid_ids, invalid_ids = [], []
+    lots = defaultdict(Counter)
+    failed_questions = Counter()
+
+    # The pool has to be started before the query, so that the workers aren't forked holding its open cursor
+    pool = multiprocessing.Pool(processes) if processes != 1 else None
+    try:
+        rows = _stream_draft_rows(framework, batch_size)
+        if pool is None:
+            results = map(_validate_draft_row, rows)
+        else:
+            results = pool.imap_unordered(_validate_draft_row, rows, chunksize=max(1, batch_size // 10))
+
+        for draft_id, lot_slug, errors in results:
+            if errors:
+                invalid_ids.append(draft_id)
+                lots[lot_slug]['failed'] += 1
+                failed_questions.update(errors)
+            else:
+                valid_ids.append(draft_id)
+                lots[lot_slug]['submitted'] += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if not dry_run:
+        _bulk_update_status(valid_ids, 'submitted', batch_size)
+        _bulk_update_status(invalid_ids, 'failed', batch_size)
+        db.session.commit()
+
+    return {
+        'framework': framework.slug,
+        'submitted': len(valid_ids),
+        'failed': len(invalid_ids),
+        'lots': {lot_slug: dict(counts) for lot_slug, counts in lots.items()},
+        'failedQuestions': dict(failed_questions.most_common()),
+        'failedDraftIds': sorted(invalid_ids),
+        'seconds': round(time.perf_counter() - start, 3),
+        'dryRun': dry_run,
+    }
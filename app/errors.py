@@ -1,7 +1,6 @@
-from flask import jsonify
-
 from .main import main
 from .callbacks import callbacks
+from .json_utils import jsonify
 from .models import ValidationError
 
 
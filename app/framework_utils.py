@@ -1,4 +1,14 @@
-from flask import abort
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import abort, current_app, g, has_request_context
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from . import db
+from .models import AuditEvent, Framework, FrameworkStats, User
 from .validation import get_validation_errors
 
 
@@ -25,3 +35,192 @@ def format_framework_integrity_error_message(error, json_framework):
         error_message = format(error)
 
     return error_message
+
+
+# Frameworks (with their lots) as they were last read from the database, detached from any session, when they were
+# read and the framework version (see `_framework_version`) they were read at. See `get_framework_by_slug`.
+_framework_cache = {'frameworks': {}, 'loaded_at': None, 'version': None}
+_framework_cache_lock = threading.Lock()
+
+
+def _framework_version():
+    """
+    The id of the latest audit event for any framework. `create_framework` and `update_framework` audit every change,
+    so this moves on whichever process made the change. Read once per request.
+    """
+    if has_request_context() and getattr(g, 'framework_version', None) is not None:
+        return g.framework_version[0]
+    version = db.session.query(func.max(AuditEvent.id)).filter(AuditEvent.object_type == Framework.__name__).scalar()
+    if has_request_context():
+        g.framework_version = (version,)
+    return version
+
+
+def _load_frameworks():
+    # Use a session of our own, so the cached instances aren't tied to (or expired with) the request's session
+    session = Session(bind=db.engine)
+    try:
+        frameworks = session.query(Framework).all()
+        session.expunge_all()
+    finally:
+        session.close()
+    return {framework.slug: framework for framework in frameworks}
+
+
+def _cached_frameworks(ttl):
+    # The version is read before the frameworks, so a change made in between is at worst read again next time
+    version = _framework_version()
+    with _framework_cache_lock:
+        loaded_at = _framework_cache['loaded_at']
+        if loaded_at is None or time.monotonic() - loaded_at >= ttl or _framework_cache['version'] != version:
+            _framework_cache['frameworks'] = _load_frameworks()
+            _framework_cache['loaded_at'] = time.monotonic()
+            _framework_cache['version'] = version
+        return _framework_cache['frameworks']
+
+
+def invalidate_framework_cache():
+    """Make this process read frameworks from the database again. Call after creating or updating a framework."""
+    with _framework_cache_lock:
+        _framework_cache['loaded_at'] = None
+
+
+def get_framework_by_slug(slug):
+    """
+    Return the Framework with `slug`, with its lots, or None - from a cache of all frameworks, refreshed every
+    DM_API_FRAMEWORK_CACHE_TTL seconds (0 turns it off), rather than the database. The framework is merged into the
+    request's session without a query, so it can be used in relationships like any other instance.
+
+    Each process has its own cache. Before using it, each request checks (with one cheap query) the id of the latest
+    framework audit event, so a framework changed through the API by any process is read again straight away. Changes
+    made without going through the API are picked up within DM_API_FRAMEWORK_CACHE_TTL seconds. Slugs that aren't
+    cached are looked up in the database, so new frameworks are found straight away.
+    """
+    ttl = current_app.config['DM_API_FRAMEWORK_CACHE_TTL']
+    framework = _cached_frameworks(ttl).get(slug) if ttl else None
+    if framework is None:
+        return Framework.query.filter(Framework.slug == slug).first()
+    return db.session.merge(framework, load=False)
+
+
+def get_frameworks():
+    """
+    All frameworks, with their lots - from the cache `get_framework_by_slug` uses, if it's on, so as up to date as a
+    query for framework changes made through the API. Cached frameworks aren't in the request's session, so they're
+    only for reading ids, slugs, statuses and lots from.
+    """
+    ttl = current_app.config['DM_API_FRAMEWORK_CACHE_TTL']
+    if ttl:
+        return list(_cached_frameworks(ttl).values())
+    return Framework.query.all()
+
+
+def get_framework_by_slug_or_404(slug):
+    framework = get_framework_by_slug(slug)
+    if framework is None:
+        abort(404)
+    return framework
+
+
+# One pass over the framework's interested suppliers and their drafts, counting drafts by status, lot and whether the
+# supplier has completed their declaration, and suppliers by declaration status and whether they've submitted a draft.
+FRAMEWORK_STATS_STATEMENT = text("""
+WITH supplier_drafts AS (
+    SELECT
+        supplier_frameworks.supplier_id,
+        supplier_frameworks.declaration ->> 'status' AS declaration_status,
+        COALESCE(supplier_frameworks.declaration ->> 'status' = 'complete', false) AS declaration_made,
+        COALESCE(
+            bool_or(draft_services.status = 'submitted') OVER (PARTITION BY supplier_frameworks.supplier_id), false
+        ) AS has_completed_services,
+        draft_services.id AS draft_id,
+        draft_services.status,
+        lots.slug AS lot
+    FROM
+        supplier_frameworks
+    LEFT JOIN
+        draft_services ON draft_services.supplier_id = supplier_frameworks.supplier_id
+            AND draft_services.framework_id = supplier_frameworks.framework_id
+    LEFT JOIN
+        lots ON lots.id = draft_services.lot_id
+    WHERE
+        supplier_frameworks.framework_id = :framework_id
+        AND supplier_frameworks.declaration IS NOT NULL
+)
+SELECT
+    GROUPING(status) = 0 AS is_services,
+    status, lot, declaration_made,
+    declaration_status, has_completed_services,
+    CASE WHEN GROUPING(status) = 0 THEN count(draft_id) ELSE count(DISTINCT supplier_id) END AS count
+FROM
+    supplier_drafts
+GROUP BY GROUPING SETS (
+    (status, lot, declaration_made),
+    (declaration_status, has_completed_services)
+)
+HAVING
+    GROUPING(status) = 1 OR count(draft_id) > 0""")
+
+
+def _label_columns(labels, rows):
+    return [
+        dict(zip(labels, row))
+        for row in sorted(rows, key=lambda x: list(map(str, x)))
+    ]
+
+
+def compute_framework_stats(framework_id):
+    """Count the framework's draft services, interested suppliers and (all) supplier users, as /frameworks/<slug>/stats
+    returns them"""
+    seven_days_ago = datetime.utcnow() + timedelta(-7)
+
+    services, interested_suppliers = [], []
+    for row in db.session.execute(FRAMEWORK_STATS_STATEMENT, {'framework_id': framework_id}):
+        if row.is_services:
+            services.append((row.status, row.lot, row.declaration_made, row.count))
+        else:
+            interested_suppliers.append((row.declaration_status, row.has_completed_services, row.count))
+
+    supplier_users = db.session.query(
+        User.logged_in_at > seven_days_ago, func.count()
+    ).filter(
+        User.role == 'supplier'
+    ).group_by(
+        User.logged_in_at > seven_days_ago
+    ).all()
+
+    return {
+        'services': _label_columns(['status', 'lot', 'declaration_made', 'count'], services),
+        'supplier_users': _label_columns(['recent_login', 'count'], supplier_users),
+        'interested_suppliers': _label_columns(
+            ['declaration_status', 'has_completed_services', 'count'], interested_suppliers
+        ),
+    }
+
+
+def framework_stats(framework_id):
+    """
+    Return the framework's stats (see `compute_framework_stats`) and when they were counted - from the framework_stats
+    table, recounting them first if they're more than DM_API_FRAMEWORK_STATS_TTL seconds old (0 always recounts).
+    Recounted stats are committed, so every process shares them.
+    """
+    max_age = timedelta(seconds=current_app.config['DM_API_FRAMEWORK_STATS_TTL'])
+    stored = db.session.query(
+        FrameworkStats.stats, FrameworkStats.refreshed_at
+    ).filter(
+        FrameworkStats.framework_id == framework_id
+    ).first()
+    if stored and datetime.utcnow() - stored.refreshed_at < max_age:
+        return stored.stats, stored.refreshed_at
+
+    stats, refreshed_at = compute_framework_stats(framework_id), datetime.utcnow()
+    # Concurrent requests can both recount stale stats - the last to commit wins
+    statement = insert(FrameworkStats.__table__).values(
+        framework_id=framework_id, stats=stats, refreshed_at=refreshed_at
+    )
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['framework_id'],
+        set_={'stats': statement.excluded.stats, 'refreshed_at': statement.excluded.refreshed_at},
+    ))
+    db.session.commit()
+    return stats, refreshed_at
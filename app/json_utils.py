@@ -0,0 +1,145 @@
+"""
+Encoding and decoding the JSON in API requests and responses.
+
+Which library does the work is set with `set_json_backend`: 'stdlib' uses the `json` module, 'orjson' uses orjson,
+which is several times faster on large documents like services and declarations. orjson is optional - if it isn't
+installed, or is older than 3.9 (which added the `orjson.Fragment` that RawJSON needs), we stay on the stdlib. Both
+backends give the same documents, with datetimes in DATETIME_FORMAT and Decimals as numbers.
+
+Values that are already JSON - like a `data` column read from Postgres as text - can be wrapped in `RawJSON` to be
+written into the output as they are, rather than being decoded only to be encoded again.
+"""
+import json
+import re
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import current_app, request
+from dmutils.formats import DATE_FORMAT, DATETIME_FORMAT
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKENDS = ('stdlib', 'orjson')
+_json_backend = 'stdlib'
+
+
+def set_json_backend(backend):
+    """
+    Choose the JSON library used by `encode`, `decode` and `jsonify`. Returns the backend actually in use, which is
+    'stdlib' if orjson was asked for but isn't installed or doesn't have `orjson.Fragment` (so would have to decode
+    RawJSON only to encode it again).
+    """
+    global _json_backend
+    if backend not in JSON_BACKENDS:
+        raise ValueError("Unknown JSON backend {!r}".format(backend))
+    if backend == 'orjson' and not hasattr(orjson, 'Fragment'):
+        backend = 'stdlib'
+    _json_backend = backend
+    return _json_backend
+
+
+class RawJSON(object):
+    """A value that is already encoded as JSON (bytes or str), to be included in `encode` output unchanged."""
+    __slots__ = ('json',)
+
+    def __init__(self, json):
+        self.json = json.encode('utf-8') if isinstance(json, str) else json
+
+    def __repr__(self):
+        return '<RawJSON: {!r}>'.format(self.json)
+
+
+def merge_raw_json_object(raw, extra):
+    """
+    Add the keys in `extra` to the JSON object `raw` without decoding it, returning RawJSON. The new keys are written
+    after the existing ones so they take precedence if a key is repeated (JSON decoders keep the last value).
+    """
+    body = RawJSON(raw).json.strip()
+    if not (body.startswith(b'{') and body.endswith(b'}')):
+        raise ValueError("Not a JSON object: {!r}".format(raw))
+    body = body[1:-1].strip()
+    extra_members = encode(extra)[1:-1]
+    if not extra_members:
+        return RawJSON(b'{' + body + b'}')
+    return RawJSON(b'{' + body + (b',' if body else b'') + extra_members + b'}')
+
+
+def json_default(obj):
+    """Convert the non-JSON types our models and views use into JSON types."""
+    if isinstance(obj, datetime):
+        return obj.strftime(DATETIME_FORMAT)
+    if isinstance(obj, date):
+        return obj.strftime(DATE_FORMAT)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    raise TypeError("{!r} is not JSON serializable".format(obj))
+
+
+def _orjson_default(obj):
+    if isinstance(obj, RawJSON):
+        # orjson.Fragment is written out as it is
+        return orjson.Fragment(obj.json)
+    return json_default(obj)
+
+
+def _encode_stdlib(obj, indent, sort_keys):
+    # The json module can't write raw values, so RawJSON is encoded as a placeholder string that's swapped for the
+    # raw JSON afterwards. The random token means no real string can be mistaken for a placeholder.
+    raw_values = []
+    token = uuid.uuid4().hex
+
+    def default(value):
+        if isinstance(value, RawJSON):
+            raw_values.append(value.json)
+            return '\x00{}:{}'.format(token, len(raw_values) - 1)
+        return json_default(value)
+
+    encoded = json.dumps(obj, default=default, indent=indent, sort_keys=sort_keys).encode('utf-8')
+    if raw_values:
+        placeholder = re.compile(b'"\\\\u0000' + token.encode('ascii') + b':([0-9]+)"')
+        encoded = placeholder.sub(lambda match: raw_values[int(match.group(1))], encoded)
+    return encoded
+
+
+def encode(obj, indent=None, sort_keys=True):
+    """Encode `obj` as UTF-8 JSON bytes. Only an `indent` of 2 is supported with orjson."""
+    if isinstance(obj, RawJSON):
+        return obj.json
+
+    if _json_backend == 'orjson':
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_orjson_default, option=option)
+
+    return _encode_stdlib(obj, indent, sort_keys)
+
+
+def decode(data):
+    """Decode JSON `data` (bytes or str), raising ValueError if it isn't valid JSON."""
+    if _json_backend == 'orjson':
+        return orjson.loads(data)
+
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def jsonify(*args, **kwargs):
+    """
+    Drop-in replacement for `flask.jsonify` using the configured backend. Like Flask, the output is sorted according to
+    JSON_SORT_KEYS and pretty printed according to JSONIFY_PRETTYPRINT_REGULAR (except for XMLHttpRequests).
+    """
+    indent = None
+    if current_app.config['JSONIFY_PRETTYPRINT_REGULAR'] and not request.is_xhr:
+        indent = 2
+    return current_app.response_class(
+        encode(dict(*args, **kwargs), indent=indent, sort_keys=current_app.config['JSON_SORT_KEYS']),
+        mimetype='application/json',
+    )
@@ -9,7 +9,11 @@ main.before_request(requires_authentication)
 
 @main.after_request
 def add_cache_control(response):
-    response.cache_control.max_age = 24 * 60 * 60
+    if 'ETag' in response.headers:
+        # responses with validators can be stored, but should be revalidated (see `conditional_response`)
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.max_age = 24 * 60 * 60
     return response
 
 
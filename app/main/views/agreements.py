@@ -5,8 +5,9 @@ from sqlalchemy.exc import IntegrityError
 from dmapiclient.audit import AuditTypes
 
 from .. import main
+from ...framework_utils import get_framework_by_slug_or_404
 from ...models import (
-    AuditEvent, db, Framework, FrameworkAgreement, SupplierFramework, User
+    AuditEvent, db, FrameworkAgreement, SupplierFramework, User
 )
 from ...utils import (
     get_json_from_request,
@@ -41,9 +42,7 @@ def create_framework_agreement():
             )
         )
 
-    framework = Framework.query.filter(
-        Framework.slug == update_json['frameworkSlug']
-    ).first_or_404()
+    framework = get_framework_by_slug_or_404(update_json['frameworkSlug'])
 
     framework_agreement = FrameworkAgreement(
         supplier_id=update_json['supplierId'],
@@ -154,7 +154,8 @@ def list_audits():
 
         audits = AuditEvent.query.join(audits_subquery, audits_subquery.c.id == AuditEvent.id)
 
-    sort_order = db.desc if convert_to_boolean(request.args.get('latest_first')) else db.asc
+    latest_first = convert_to_boolean(request.args.get('latest_first'))
+    sort_order = db.desc if latest_first else db.asc
     audits = audits.order_by(sort_order(AuditEvent.created_at), sort_order(AuditEvent.id))
 
     return paginated_result_response(
@@ -163,7 +164,9 @@ def list_audits():
         page=page,
         per_page=per_page,
         endpoint='.list_audits',
-        request_args=request.args
+        request_args=request.args,
+        cursor_columns=[AuditEvent.created_at, AuditEvent.id],
+        cursor_descending=latest_first,
     ), 200
 
 
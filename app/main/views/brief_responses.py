@@ -1,7 +1,7 @@
 from datetime import datetime
 from dmutils.formats import DATE_FORMAT
 
-from flask import abort, request, current_app
+from flask import abort, jsonify, request, current_app
 from sqlalchemy.exc import IntegrityError, DataError
 
 from dmapiclient.audit import AuditTypes
@@ -14,13 +14,14 @@ from ...utils import (
     get_request_page_questions,
     get_valid_page_or_1,
     json_has_required_keys,
-    list_result_response,
     paginated_result_response,
     single_result_response,
+    streamed_list_result_response,
     validate_and_return_updater_request,
 )
 
 from ...brief_utils import get_supplier_service_eligible_for_brief
+from ...projections import get_fields_or_400, project_sparse_fields, sparse_field_serializer, sparse_result_or_404
 from ...service_utils import validate_and_return_supplier
 
 COMPLETED_BRIEF_RESPONSE_STATUSES = ['submitted', 'pending-awarded', 'awarded']
@@ -125,7 +126,12 @@ def update_brief_response(brief_response_id):
 
     brief_response.update_from_json(brief_response_json)
 
-    brief_response.validate(enforce_required=False, required_fields=page_questions, max_day_rate=service_max_day_rate)
+    brief_response.validate(
+        enforce_required=False,
+        required_fields=page_questions,
+        max_day_rate=service_max_day_rate,
+        touched_fields=brief_response_json.keys(),
+    )
 
     audit = AuditEvent(
         audit_type=AuditTypes.update_brief_response,
@@ -199,6 +205,12 @@ def submit_brief_response(brief_response_id):
 
 @main.route('/brief-responses/<int:brief_response_id>', methods=['GET'])
 def get_brief_response(brief_response_id):
+    fields = get_fields_or_400(request.args)
+    if fields is not None:
+        return jsonify(briefResponses=sparse_result_or_404(
+            BriefResponse.query.filter(BriefResponse.id == brief_response_id), RESOURCE_NAME, fields
+        )), 200
+
     brief_response = BriefResponse.query.filter(
         BriefResponse.id == brief_response_id
     ).first_or_404()
@@ -231,13 +243,6 @@ def list_brief_responses():
         # Inclusive date range filtering
         brief_responses = brief_responses.filter(BriefResponse.awarded_at.between(day_start, day_end))
 
-    brief_responses = brief_responses.options(
-        db.defaultload(BriefResponse.brief).defaultload(Brief.framework).lazyload("*"),
-        db.defaultload(BriefResponse.brief).defaultload(Brief.lot).lazyload("*"),
-        db.defaultload(BriefResponse.brief).defaultload(Brief.awarded_brief_response).lazyload("*"),
-        db.defaultload(BriefResponse.supplier).lazyload("*"),
-    )
-
     if request.args.get('framework'):
         brief_responses = brief_responses.join(BriefResponse.brief).join(Brief.framework).filter(
             Brief.framework.has(Framework.slug.in_(
@@ -245,8 +250,21 @@ def list_brief_responses():
             ))
         )
 
+    fields = get_fields_or_400(request.args)
+    if fields is not None:
+        brief_responses = project_sparse_fields(brief_responses, RESOURCE_NAME, fields)
+        serializer = sparse_field_serializer(fields)
+    else:
+        brief_responses = brief_responses.options(
+            db.defaultload(BriefResponse.brief).defaultload(Brief.framework).lazyload("*"),
+            db.defaultload(BriefResponse.brief).defaultload(Brief.lot).lazyload("*"),
+            db.defaultload(BriefResponse.brief).defaultload(Brief.awarded_brief_response).lazyload("*"),
+            db.defaultload(BriefResponse.supplier).lazyload("*"),
+        )
+        serializer = None
+
     if brief_id or supplier_id:
-        return list_result_response(RESOURCE_NAME, brief_responses), 200
+        return streamed_list_result_response(RESOURCE_NAME, brief_responses, serializer=serializer), 200
 
     return paginated_result_response(
         result_name=RESOURCE_NAME,
@@ -254,5 +272,6 @@ def list_brief_responses():
         page=page,
         per_page=current_app.config['DM_API_BRIEF_RESPONSES_PAGE_SIZE'],
         endpoint='.list_brief_responses',
-        request_args=request.args
+        request_args=request.args,
+        serializer=serializer,
     ), 200
@@ -7,6 +7,7 @@ from .. import main
 from ... import db
 from ...models import User, Brief, BriefResponse, AuditEvent, Framework, Lot, Supplier, Service
 from ...utils import (
+    conditional_response,
     get_int_or_400,
     get_json_from_request,
     get_request_page_questions,
@@ -16,8 +17,11 @@ from ...utils import (
     single_result_response,
     paginated_result_response,
     purge_nulls_from_data,
+    resource_etag,
+    streamed_list_result_response,
     validate_and_return_updater_request,
 )
+from ...projections import get_fields_or_400, project_sparse_fields, sparse_field_serializer, sparse_result_or_404
 from ...service_utils import validate_and_return_lot, filter_services
 from ...brief_utils import index_brief, validate_brief_data
 from ...validation import get_validation_errors
@@ -92,7 +96,9 @@ def update_brief(brief_id):
 
     brief.update_from_json(brief_json)
 
-    validate_brief_data(brief, enforce_required=False, required_fields=page_questions)
+    validate_brief_data(
+        brief, enforce_required=False, required_fields=page_questions, touched_fields=brief_json.keys()
+    )
 
     audit = AuditEvent(
         audit_type=AuditTypes.update_brief,
@@ -115,15 +121,47 @@ def update_brief(brief_id):
 
 @main.route('/briefs/<int:brief_id>', methods=['GET'])
 def get_brief(brief_id):
+    fields = get_fields_or_400(request.args)
+    if fields is not None:
+        return jsonify(briefs=sparse_result_or_404(
+            Brief.query.filter(Brief.id == brief_id), RESOURCE_NAME, fields
+        )), 200
+
     brief = Brief.query.filter(
         Brief.id == brief_id
     ).first_or_404()
 
-    return single_result_response(
+    return conditional_response(*_brief_validators(brief), make_response=lambda: single_result_response(
         RESOURCE_NAME,
         brief,
         serialize_kwargs={"with_users": True, "with_clarification_questions": True}
-    ), 200
+    ))
+
+
+def _brief_validators(brief):
+    """
+    The ETag and Last-Modified for `get_brief`. A brief's status changes over time without it being updated, as do
+    its clarification questions and users, so those are part of both.
+    """
+    now = datetime.utcnow()
+    etag_values = [
+        brief.id, brief.updated_at, brief.status, brief.framework.name, brief.framework.status,
+        [question.id for question in brief.clarification_questions],
+        [(user.id, user.updated_at) for user in brief.users],
+    ]
+    changed_at = [brief.updated_at] + [question.published_at for question in brief.clarification_questions] + [
+        user.updated_at for user in brief.users
+    ]
+
+    if brief.published_at:
+        etag_values.append(brief.clarification_questions_are_closed)
+        changed_at.extend(
+            moment for moment in (brief.clarification_questions_closed_at, brief.applications_closed_at) if moment < now
+        )
+    if brief.awarded_brief_response:
+        changed_at.append(brief.awarded_brief_response.awarded_at)
+
+    return resource_etag(*etag_values), max(changed_at)
 
 
 @main.route('/briefs', methods=['GET'])
@@ -144,15 +182,16 @@ def list_briefs():
     if user_id:
         briefs = briefs.filter(Brief.users.any(id=user_id))
 
+    # Filter on the briefs' own framework and lot ids rather than with correlated EXISTS subqueries
     if request.args.get('framework'):
-        briefs = briefs.filter(Brief.framework.has(
-            Framework.slug.in_(framework_slug.strip() for framework_slug in request.args["framework"].split(","))
-        ))
+        briefs = briefs.filter(Brief.framework_id.in_(db.session.query(Framework.id).filter(
+            Framework.slug.in_([framework_slug.strip() for framework_slug in request.args["framework"].split(",")])
+        )))
 
     if request.args.get('lot'):
-        briefs = briefs.filter(Brief.lot.has(
-            Lot.slug.in_(lot_slug.strip() for lot_slug in request.args["lot"].split(","))
-        ))
+        briefs = briefs.filter(Brief._lot_id.in_(db.session.query(Lot.id).filter(
+            Lot.slug.in_([lot_slug.strip() for lot_slug in request.args["lot"].split(",")])
+        )))
 
     if request.args.get('status'):
         briefs = briefs.has_statuses(
@@ -178,8 +217,18 @@ def list_briefs():
             day_end = datetime(day_value.year, day_value.month, day_value.day, 23, 59, 59, 999999)
             briefs = briefs.has_datetime_field_after("{}_at".format(status), day_end)
 
+    fields = get_fields_or_400(request.args)
+    if fields is not None:
+        cursor_columns = None if request.args.get('human') else [Brief.id]
+        return _list_sparse_briefs(briefs, fields, page, stream=bool(user_id), cursor_columns=cursor_columns), 200
+
     if user_id:
-        return list_result_response(
+        # streamed results can't include joined-loaded collections like the framework's lots
+        briefs = briefs.options(
+            db.defaultload(Brief.framework).lazyload("*"),
+            db.defaultload(Brief.awarded_brief_response).lazyload("*"),
+        )
+        return streamed_list_result_response(
             RESOURCE_NAME,
             briefs,
             serialize_kwargs={"with_users": with_users, "with_clarification_questions": with_clarification_questions}
@@ -192,10 +241,29 @@ def list_briefs():
             per_page=current_app.config['DM_API_BRIEFS_PAGE_SIZE'],
             endpoint='.list_briefs',
             request_args=request.args,
-            serialize_kwargs={"with_users": with_users, "with_clarification_questions": with_clarification_questions}
+            serialize_kwargs={"with_users": with_users, "with_clarification_questions": with_clarification_questions},
+            # The 'human' ordering mixes directions and nullable columns, so only supports page numbers
+            cursor_columns=None if request.args.get('human') else [Brief.id],
         ), 200
 
 
+def _list_sparse_briefs(briefs, fields, page, stream, cursor_columns):
+    results_query = project_sparse_fields(briefs, RESOURCE_NAME, fields, extra_columns=cursor_columns or [])
+    serializer = sparse_field_serializer(fields)
+    if stream:
+        return streamed_list_result_response(RESOURCE_NAME, results_query, serializer=serializer)
+    return paginated_result_response(
+        result_name=RESOURCE_NAME,
+        results_query=results_query,
+        page=page,
+        per_page=current_app.config['DM_API_BRIEFS_PAGE_SIZE'],
+        endpoint='.list_briefs',
+        request_args=request.args,
+        cursor_columns=cursor_columns,
+        serializer=serializer,
+    )
+
+
 @main.route('/briefs/<int:brief_id>/<any(publish, withdraw, cancel, unsuccessful):action>', methods=['POST'])
 def update_brief_status(brief_id, action):
     updater_json = validate_and_return_updater_request()
@@ -5,7 +5,8 @@ from flask import abort, current_app, request
 from .. import main
 from ... import db
 from ...models import BuyerEmailDomain, AuditEvent
-from ...validation import validate_buyer_email_domain_json_or_400, is_approved_buyer_domain
+from ...models.buyer_domains import approved_buyer_domain_names, invalidate_buyer_domain_cache
+from ...validation import validate_buyer_email_domain_json_or_400, domain_has_approved_suffix
 from ...utils import (
     get_json_from_request,
     get_valid_page_or_1,
@@ -28,7 +29,10 @@ def create_buyer_email_domain():
 
     new_domain = json_payload["buyerEmailDomains"]['domainName'].lower()
 
-    if is_approved_buyer_domain(BuyerEmailDomain.query.all(), new_domain):
+    # Check against the domains as they are now, rather than as another process may have added them since this one
+    # last read them
+    invalidate_buyer_domain_cache()
+    if domain_has_approved_suffix(approved_buyer_domain_names(), new_domain):
         abort(409, "Domain name {} has already been approved".format(new_domain))
 
     buyer_email_domain = BuyerEmailDomain(domain_name=new_domain)
@@ -51,6 +55,7 @@ def create_buyer_email_domain():
 
     db.session.add(audit)
     db.session.commit()
+    invalidate_buyer_domain_cache()
 
     return single_result_response(RESOURCE_NAME, buyer_email_domain), 201
 
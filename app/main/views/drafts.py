@@ -27,6 +27,7 @@ from ...service_utils import (
     validate_service_data,
 )
 from ...draft_utils import validate_and_return_draft_request
+from ...framework_utils import get_framework_by_slug, get_framework_by_slug_or_404
 
 RESOURCE_NAME = "services"
 
@@ -50,12 +51,12 @@ def copy_draft_service_from_existing_service(service_id):
 
     service = Service.query.filter(
         Service.service_id == service_id
+    ).options(
+        *Service.loading_options('write')
     ).first_or_404()
 
     if target_framework_slug:
-        target_framework = Framework.query.filter(
-            Framework.slug == target_framework_slug
-        ).first_or_404()
+        target_framework = get_framework_by_slug_or_404(target_framework_slug)
         if not target_framework.status == 'open':
             abort(400, "Target framework is not open")
         target_framework_id = target_framework.id
@@ -124,9 +125,7 @@ def copy_published_from_framework(framework_slug, lot_slug):
     if not isinstance(questions_to_copy, list):
         abort(400, "Data error: 'questions_to_copy' must be a list")
 
-    target_framework = Framework.query.filter(
-        Framework.slug == framework_slug
-    ).first_or_404()
+    target_framework = get_framework_by_slug_or_404(framework_slug)
 
     if target_framework.status != 'open':
         abort(400, "Target framework is not open")
@@ -211,7 +210,12 @@ def edit_draft_service(draft_id):
     ).first_or_404()
 
     draft.update_from_json(update_json)
-    validate_service_data(draft, enforce_required=(draft.status == 'submitted'), required_fields=page_questions)
+    validate_service_data(
+        draft,
+        enforce_required=(draft.status == 'submitted'),
+        required_fields=page_questions,
+        touched_fields=update_json.keys(),
+    )
 
     audit = AuditEvent(
         audit_type=AuditTypes.update_draft_service,
@@ -251,6 +255,8 @@ def list_draft_services():
 
     services = DraftService.query.order_by(
         asc(DraftService.id)
+    ).options(
+        *DraftService.loading_options('list')
     )
 
     if service_id:
@@ -258,9 +264,7 @@ def list_draft_services():
         services = services.filter(DraftService.service_id == service_id)
 
     if framework_slug:
-        framework = Framework.query.filter(
-            Framework.slug == framework_slug
-        ).first()
+        framework = get_framework_by_slug(framework_slug)
         if not framework:
             abort(404, "framework '{}' not found".format(framework_slug))
         services = services.filter(DraftService.framework_id == framework.id)
@@ -279,6 +283,8 @@ def fetch_draft_service(draft_id):
 
     draft = DraftService.query.filter(
         DraftService.id == draft_id
+    ).options(
+        *DraftService.loading_options('single')
     ).first_or_404()
 
     last_audit_event = AuditEvent.query.last_for_object(draft, [
@@ -306,6 +312,8 @@ def delete_draft_service(draft_id):
 
     draft = DraftService.query.filter(
         DraftService.id == draft_id
+    ).options(
+        *DraftService.loading_options('write')
     ).first_or_404()
 
     audit = AuditEvent(
@@ -341,6 +349,8 @@ def publish_draft_service(draft_id):
 
     draft = DraftService.query.filter(
         DraftService.id == draft_id
+    ).options(
+        *DraftService.loading_options('write')
     ).first_or_404()
 
     if draft.status == 'not-submitted':
@@ -356,6 +366,8 @@ def publish_draft_service(draft_id):
         """
         service = Service.query.filter(
             Service.service_id == draft.service_id
+        ).options(
+            *Service.loading_options('write')
         ).first_or_404()
 
         service_from_draft = update_and_validate_service(service, draft.data)
@@ -450,6 +462,8 @@ def complete_draft_service(draft_id):
 
     draft = DraftService.query.filter(
         DraftService.id == draft_id
+    ).options(
+        *DraftService.loading_options('write')
     ).first_or_404()
 
     validate_service_data(draft)
@@ -489,6 +503,8 @@ def update_draft_service_status(draft_id):
 
     draft = DraftService.query.filter(
         DraftService.id == draft_id
+    ).options(
+        *DraftService.loading_options('write')
     ).first_or_404()
 
     draft.status = new_status
@@ -521,6 +537,8 @@ def copy_draft_service(draft_id):
 
     original_draft = DraftService.query.filter(
         DraftService.id == draft_id
+    ).options(
+        *DraftService.loading_options('write')
     ).first_or_404()
 
     draft_copy = original_draft.copy()
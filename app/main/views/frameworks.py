@@ -1,32 +1,35 @@
-import datetime
-
-from flask import jsonify, abort, request
-from sqlalchemy import func, orm, case, text
+from flask import jsonify, abort, request, current_app
+from sqlalchemy import orm, text
 from sqlalchemy.exc import IntegrityError, DataError
 from dmapiclient.audit import AuditTypes
 from dmutils.config import convert_to_boolean
+from dmutils.formats import DATETIME_FORMAT
 
 from .. import main
 from ...models import (
     AuditEvent,
     db,
-    DraftService,
     Framework,
     Lot,
-    Supplier,
     SupplierFramework,
-    User,
 )
 from ... import supplier_constants
 from ...utils import (
+    conditional_response,
     get_json_from_request,
     json_has_required_keys,
     json_only_has_required_keys,
     list_result_response,
+    resource_etag,
     single_result_response,
     validate_and_return_updater_request,
 )
-from ...framework_utils import validate_framework_agreement_details_data, format_framework_integrity_error_message
+from ...framework_utils import (
+    format_framework_integrity_error_message,
+    framework_stats,
+    invalidate_framework_cache,
+    validate_framework_agreement_details_data,
+)
 
 RESOURCE_NAME = "frameworks"
 FRAMEWORK_UPDATE_WHITELISTED_ATTRIBUTES_MAP = {
@@ -99,6 +102,7 @@ def create_framework():
         db.session.rollback()
         abort(400, format_framework_integrity_error_message(error, json_framework))
 
+    invalidate_framework_cache()
     return single_result_response(RESOURCE_NAME, framework), 201
 
 
@@ -108,7 +112,13 @@ def get_framework(framework_slug):
         Framework.slug == framework_slug
     ).first_or_404()
 
-    return single_result_response(RESOURCE_NAME, framework), 200
+    # Frameworks are only changed by `create_framework` and `update_framework`, which both audit the change, so the
+    # latest audit event for the framework identifies its version
+    latest_event = AuditEvent.query.last_for_object(framework)
+    etag = resource_etag(framework.id, framework.slug, latest_event and latest_event.id)
+    return conditional_response(
+        etag, latest_event and latest_event.created_at, lambda: single_result_response(RESOURCE_NAME, framework)
+    )
 
 
 @main.route('/frameworks/<string:framework_slug>', methods=['POST'])
@@ -206,6 +216,7 @@ WHERE
         db.session.rollback()
         abort(400, format_framework_integrity_error_message(error, json_framework))
 
+    invalidate_framework_cache()
     return single_result_response(RESOURCE_NAME, framework), 200
 
 
@@ -215,75 +226,9 @@ def get_framework_stats(framework_slug):
         Framework.slug == framework_slug
     ).first_or_404()
 
-    seven_days_ago = datetime.datetime.utcnow() + datetime.timedelta(-7)
-
-    has_completed_drafts_query = db.session.query(
-        DraftService.supplier_id, func.min(DraftService.id)
-    ).filter(
-        DraftService.framework_id == framework.id,
-        DraftService.status == 'submitted'
-    ).group_by(
-        DraftService.supplier_id
-    ).subquery('completed_drafts')
-
-    drafts_alias = orm.aliased(DraftService, has_completed_drafts_query)
-
-    def label_columns(labels, query):
-        return [
-            dict(zip(labels, item))
-            for item in sorted(query, key=lambda x: list(map(str, x)))
-        ]
-
-    is_declaration_complete = case([
-        (SupplierFramework.declaration['status'].astext == 'complete', True)
-    ], else_=False)
-
-    return jsonify({
-        'services': label_columns(
-            ['status', 'lot', 'declaration_made', 'count'],
-            db.session.query(
-                DraftService.status, Lot.slug, is_declaration_complete, func.count()
-            ).outerjoin(
-                SupplierFramework, DraftService.supplier_id == SupplierFramework.supplier_id
-            ).join(
-                Lot, DraftService.lot_id == Lot.id
-            ).group_by(
-                DraftService.status, Lot.slug, is_declaration_complete
-            ).filter(
-                SupplierFramework.framework_id == framework.id,
-                DraftService.framework_id == framework.id,
-                SupplierFramework.declaration.isnot(None)
-            ).all()
-        ),
-        'supplier_users': label_columns(
-            ['recent_login', 'count'],
-            db.session.query(
-                User.logged_in_at > seven_days_ago, func.count()
-            ).filter(
-                User.role == 'supplier'
-            ).group_by(
-                User.logged_in_at > seven_days_ago
-            ).all()
-        ),
-        'interested_suppliers': label_columns(
-            ['declaration_status', 'has_completed_services', 'count'],
-            db.session.query(
-                SupplierFramework.declaration['status'].astext,
-                drafts_alias.supplier_id.isnot(None), func.count()
-            ).select_from(
-                Supplier
-            ).join(
-                SupplierFramework
-            ).outerjoin(
-                drafts_alias
-            ).filter(
-                SupplierFramework.framework_id == framework.id,
-                SupplierFramework.declaration.isnot(None)
-            ).group_by(
-                SupplierFramework.declaration['status'].astext, drafts_alias.supplier_id.isnot(None)
-            ).all()
-        )
-    }), 200
+    stats, refreshed_at = framework_stats(framework.id)
+
+    return jsonify(dict(stats, refreshed_at=refreshed_at.strftime(DATETIME_FORMAT))), 200
 
 
 @main.route('/frameworks/<string:framework_slug>/suppliers', methods=['GET'])
@@ -336,11 +281,14 @@ def get_framework_suppliers(framework_slug):
         )
 
     with_declarations = convert_to_boolean(request.args.get("with_declarations", "true"))
+    raw_declarations = with_declarations and current_app.config['DM_API_RAW_JSON_PASSTHROUGH']
 
     return list_result_response(
         "supplierFrameworks",
-        supplier_frameworks,
-        serialize_kwargs={"with_users": False, "with_declaration": with_declarations}
+        supplier_frameworks.options(*SupplierFramework.declaration_loading_options(raw_declarations)),
+        serialize_kwargs={
+            "with_users": False, "with_declaration": with_declarations, "raw_declaration": raw_declarations,
+        }
     ), 200
 
 
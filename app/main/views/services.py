@@ -4,17 +4,27 @@ from sqlalchemy import asc
 
 from .. import main
 from ...models import ArchivedService, Service, Supplier, AuditEvent, Framework, ValidationError
+from ...projections import (
+    get_fields_or_400,
+    project_services,
+    project_sparse_fields,
+    serialize_service_rows,
+    sparse_field_serializer,
+    sparse_result_or_404,
+)
 from ...validation import is_valid_service_id_or_400
 from ...utils import (
+    conditional_response,
     display_list,
     get_int_or_400,
     get_json_from_request,
     get_valid_page_or_1,
     json_only_has_required_keys,
-    list_result_response,
     paginated_result_response,
     pagination_links,
+    resource_etag,
     single_result_response,
+    streamed_list_result_response,
     url_for,
     validate_and_return_updater_request,
 )
@@ -72,23 +82,37 @@ def list_services():
     except ValidationError as e:
         abort(400, e.message)
 
+    fields = get_fields_or_400(request.args)
+    if fields is not None:
+        def project(query):
+            return project_sparse_fields(query, RESOURCE_NAME, fields, extra_columns=[Service.id])
+        serializer = sparse_field_serializer(fields)
+    else:
+        raw_data = current_app.config['DM_API_RAW_JSON_PASSTHROUGH']
+
+        def project(query):
+            return project_services(query, raw_data)
+        serializer = serialize_service_rows
+
     if supplier_id is not None:
         supplier = Supplier.query.filter(Supplier.supplier_id == supplier_id).all()
         if not supplier:
             abort(404, "supplier_id '%d' not found" % supplier_id)
 
         services = services.default_order().filter(Service.supplier_id == supplier_id)
-        return list_result_response(RESOURCE_NAME, services), 200
+        return streamed_list_result_response(RESOURCE_NAME, project(services), serializer=serializer), 200
     else:
         services = services.order_by(asc(Service.id))
 
     return paginated_result_response(
         result_name=RESOURCE_NAME,
-        results_query=services,
+        results_query=project(services),
         page=page,
         per_page=current_app.config['DM_API_SERVICES_PAGE_SIZE'],
         endpoint='.list_services',
-        request_args=request.args
+        request_args=request.args,
+        cursor_columns=[Service.id],
+        serializer=serializer,
     ), 200
 
 
@@ -108,7 +132,9 @@ def list_archived_services_by_service_id():
 
     services = ArchivedService.query.filter(
         ArchivedService.service_id == service_id
-    ).order_by(asc(ArchivedService.id))
+    ).order_by(asc(ArchivedService.id)).options(
+        *ArchivedService.loading_options('list')
+    )
 
     services = services.paginate(
         page=page,
@@ -137,6 +163,8 @@ def update_service(service_id):
 
     service = Service.query.filter(
         Service.service_id == service_id
+    ).options(
+        *Service.loading_options('write')
     ).first_or_404()
 
     update_details = validate_and_return_updater_request()
@@ -162,6 +190,8 @@ def revert_service(service_id):
 
     service = Service.query.filter(
         Service.service_id == service_id
+    ).options(
+        *Service.loading_options('write')
     ).first_or_404()
 
     update_details = validate_and_return_updater_request()
@@ -238,8 +268,16 @@ def import_service(service_id):
 
 @main.route('/services/<string:service_id>', methods=['GET'])
 def get_service(service_id):
+    fields = get_fields_or_400(request.args)
+    if fields is not None:
+        return jsonify(services=sparse_result_or_404(
+            Service.query.filter(Service.service_id == service_id), RESOURCE_NAME, fields
+        )), 200
+
     service = Service.query.filter(
         Service.service_id == service_id
+    ).options(
+        *Service.loading_options('single')
     ).first_or_404()
 
     service_made_unavailable_audit_event = None
@@ -260,13 +298,32 @@ def get_service(service_id):
             audit_event_object_reference, [audit_event_update_type]
         )
 
-    if service_made_unavailable_audit_event is not None:
-        service_made_unavailable_audit_event = service_made_unavailable_audit_event.serialize()
+    def serialized_service():
+        return jsonify(
+            services=service.serialize(),
+            serviceMadeUnavailableAuditEvent=(
+                service_made_unavailable_audit_event and service_made_unavailable_audit_event.serialize()
+            ),
+        )
 
-    return jsonify(
-        services=service.serialize(),
-        serviceMadeUnavailableAuditEvent=service_made_unavailable_audit_event
-    ), 200
+    return conditional_response(
+        *_service_validators(service, service_made_unavailable_audit_event), make_response=serialized_service
+    )
+
+
+def _service_validators(service, audit_event):
+    """
+    The ETag and Last-Modified for `get_service`. The supplier and framework fields in the response can change
+    without the service being updated, so they're part of the ETag; so is the audit event, which can be acknowledged.
+    """
+    etag = resource_etag(
+        service.service_id, service.updated_at, service.supplier.name, service.framework.name, service.framework.status,
+        audit_event and (audit_event.id, audit_event.acknowledged),
+    )
+    last_modified = service.updated_at
+    if audit_event is not None:
+        last_modified = max(last_modified, audit_event.acknowledged_at or audit_event.created_at)
+    return etag, last_modified
 
 
 @main.route('/archived-services/<int:archived_service_id>', methods=['GET'])
@@ -279,6 +336,8 @@ def get_archived_service(archived_service_id):
 
     service = ArchivedService.query.filter(
         ArchivedService.id == archived_service_id
+    ).options(
+        *ArchivedService.loading_options('single')
     ).first_or_404()
 
     return single_result_response(RESOURCE_NAME, service), 200
@@ -307,6 +366,8 @@ def update_service_status(service_id, status):
 
     service = Service.query.filter(
         Service.service_id == service_id
+    ).options(
+        *Service.loading_options('write')
     ).first_or_404()
 
     if status not in valid_statuses:
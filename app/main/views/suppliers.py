@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from flask import jsonify, abort, request, current_app
+from flask import abort, request, current_app
 from sqlalchemy.exc import IntegrityError, DataError
 from sqlalchemy.orm import lazyload
 from dmapiclient.audit import AuditTypes
@@ -8,7 +8,17 @@ from dmutils.formats import DATETIME_FORMAT
 
 from .. import main
 from ... import db
+from ...framework_utils import get_framework_by_slug_or_404
+from ...json_utils import jsonify
 from ...models import Supplier, ContactInformation, AuditEvent, Service, SupplierFramework, Framework, User
+from ...projections import (
+    get_fields_or_400,
+    project_sparse_fields,
+    project_suppliers,
+    serialize_supplier_rows,
+    sparse_field_serializer,
+    sparse_result_or_404,
+)
 from ...validation import (
     is_valid_string_or_400,
     validate_contact_information_json_or_400,
@@ -74,6 +84,15 @@ def list_suppliers():
                 Supplier.name.ilike(prefix + '%'))
 
     suppliers = suppliers.distinct(Supplier.name, Supplier.supplier_id)
+    cursor_columns = [Supplier.name, Supplier.supplier_id]
+
+    fields = get_fields_or_400(request.args)
+    if fields is not None:
+        suppliers = project_sparse_fields(suppliers, RESOURCE_NAME, fields, extra_columns=cursor_columns)
+        serializer = sparse_field_serializer(fields)
+    else:
+        suppliers = project_suppliers(suppliers)
+        serializer = serialize_supplier_rows
 
     try:
         return paginated_result_response(
@@ -82,7 +101,9 @@ def list_suppliers():
             page=page,
             per_page=current_app.config['DM_API_SUPPLIERS_PAGE_SIZE'],
             endpoint='.list_suppliers',
-            request_args=request.args
+            request_args=request.args,
+            cursor_columns=cursor_columns,
+            serializer=serializer,
         ), 200
     except DataError:
         abort(400, 'invalid framework')
@@ -90,6 +111,12 @@ def list_suppliers():
 
 @main.route('/suppliers/<int:supplier_id>', methods=['GET'])
 def get_supplier(supplier_id):
+    fields = get_fields_or_400(request.args)
+    if fields is not None:
+        return jsonify(suppliers=sparse_result_or_404(
+            Supplier.query.filter(Supplier.supplier_id == supplier_id), RESOURCE_NAME, fields
+        )), 200
+
     supplier = Supplier.query.filter(
         Supplier.supplier_id == supplier_id
     ).first_or_404()
@@ -274,9 +301,7 @@ def update_contact_information(supplier_id, contact_id):
 
 @main.route('/suppliers/<int:supplier_id>/frameworks/<framework_slug>/declaration', methods=['PUT'])
 def set_a_declaration(supplier_id, framework_slug):
-    framework = Framework.query.filter(
-        Framework.slug == framework_slug
-    ).first_or_404()
+    framework = get_framework_by_slug_or_404(framework_slug)
 
     supplier_framework = SupplierFramework.find_by_supplier_and_framework(
         supplier_id, framework_slug
@@ -345,9 +370,12 @@ def get_supplier_frameworks_info(supplier_id):
     ).first_or_404()
 
     service_counts = SupplierFramework.get_service_counts(supplier_id)
+    raw_declaration = current_app.config['DM_API_RAW_JSON_PASSTHROUGH']
 
     supplier_frameworks = SupplierFramework.query.filter(
         SupplierFramework.supplier == supplier
+    ).options(
+        *SupplierFramework.declaration_loading_options(raw_declaration)
     ).all()
 
     return jsonify(frameworkInterest=[
@@ -355,17 +383,20 @@ def get_supplier_frameworks_info(supplier_id):
             'drafts_count': service_counts.get((supplier_framework.framework_id, 'not-submitted'), 0),
             'complete_drafts_count': service_counts.get((supplier_framework.framework_id, 'submitted'), 0),
             'services_count': service_counts.get((supplier_framework.framework_id, 'published'), 0)
-        })
+        }, raw_declaration=raw_declaration)
         for supplier_framework in supplier_frameworks]
     ), 200
 
 
 @main.route('/suppliers/<int:supplier_id>/frameworks/<framework_slug>', methods=['GET'])
 def get_supplier_framework_info(supplier_id, framework_slug):
+    raw_declaration = current_app.config['DM_API_RAW_JSON_PASSTHROUGH']
+
     supplier_framework = SupplierFramework.find_by_supplier_and_framework(
         supplier_id, framework_slug
     ).options(
-        lazyload('*')
+        lazyload('*'),
+        *SupplierFramework.declaration_loading_options(raw_declaration)
     ).first()
 
     if supplier_framework is None:
@@ -374,16 +405,14 @@ def get_supplier_framework_info(supplier_id, framework_slug):
     return single_result_response(
         "frameworkInterest",
         supplier_framework,
-        serialize_kwargs={"with_users": True}
+        serialize_kwargs={"with_users": True, "raw_declaration": raw_declaration}
     ), 200
 
 
 @main.route('/suppliers/<int:supplier_id>/frameworks/<framework_slug>', methods=['PUT'])
 def register_framework_interest(supplier_id, framework_slug):
 
-    framework = Framework.query.filter(
-        Framework.slug == framework_slug
-    ).first_or_404()
+    framework = get_framework_by_slug_or_404(framework_slug)
 
     supplier = Supplier.query.filter(
         Supplier.supplier_id == supplier_id
@@ -430,9 +459,7 @@ def register_framework_interest(supplier_id, framework_slug):
 
 @main.route('/suppliers/<int:supplier_id>/frameworks/<framework_slug>', methods=['POST'])
 def update_supplier_framework(supplier_id, framework_slug):
-    framework = Framework.query.filter(
-        Framework.slug == framework_slug
-    ).first_or_404()
+    framework = get_framework_by_slug_or_404(framework_slug)
 
     supplier = Supplier.query.filter(
         Supplier.supplier_id == supplier_id
@@ -489,9 +516,7 @@ def update_supplier_framework(supplier_id, framework_slug):
 @main.route('/suppliers/<int:supplier_id>/frameworks/<framework_slug>/variation/<variation_slug>', methods=['PUT'])
 def agree_framework_variation(supplier_id, framework_slug, variation_slug):
 
-    framework = Framework.query.filter(
-        Framework.slug == framework_slug
-    ).first_or_404()
+    framework = get_framework_by_slug_or_404(framework_slug)
 
     supplier = Supplier.query.filter(
         Supplier.supplier_id == supplier_id
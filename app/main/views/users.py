@@ -1,27 +1,30 @@
 from datetime import datetime
 
 from dmapiclient.audit import AuditTypes
-from sqlalchemy import func
 from sqlalchemy.orm import lazyload
 from sqlalchemy.exc import DataError, IntegrityError
 from flask import abort, current_app, jsonify, request
 
 from .. import main
 from ... import db, encryption
-from ...models import AuditEvent, BuyerEmailDomain, Framework, Service, Supplier, SupplierFramework, User
+from ...framework_utils import get_framework_by_slug
+from ...models import AuditEvent, Supplier, SupplierFramework, SupplierServiceCount, User
+from ...models.buyer_domains import is_approved_buyer_email_address
+from ...projections import get_fields_or_400, project_sparse_fields, sparse_field_serializer, sparse_result_or_404
 from ...supplier_utils import check_supplier_role
 from ...utils import (
+    conditional_response,
     get_json_from_request,
     get_valid_page_or_1,
     json_has_required_keys,
     json_has_matching_id,
     paginated_result_response,
+    resource_etag,
     single_result_response,
     validate_and_return_updater_request,
 )
 from ...validation import (
     admin_email_address_has_approved_domain,
-    buyer_email_address_has_approved_domain,
     validate_user_auth_json_or_400,
     validate_user_json_or_400,
 )
@@ -76,23 +79,34 @@ def auth_user():
 
 @main.route('/users/<int:user_id>', methods=['GET'])
 def get_user_by_id(user_id):
+    fields = get_fields_or_400(request.args)
+    if fields is not None:
+        return jsonify(users=sparse_result_or_404(User.query.filter(User.id == user_id), RESOURCE_NAME, fields)), 200
+
     user = User.query.filter(
         User.id == user_id
     ).first_or_404()
-    return single_result_response(RESOURCE_NAME, user), 200
+
+    # `locked` depends on config as well as the user, and the supplier can be renamed without the user being updated
+    etag = resource_etag(
+        user.id, user.updated_at, user.locked, user.supplier and (user.supplier.name, user.supplier.organisation_size)
+    )
+    return conditional_response(etag, user.updated_at, lambda: single_result_response(RESOURCE_NAME, user))
 
 
 @main.route('/users', methods=['GET'])
 def list_users():
     user_query = User.query.order_by(User.id)
     page = get_valid_page_or_1()
+    fields = get_fields_or_400(request.args)
 
     # email_address is a primary key
     email_address = request.args.get('email_address')
     if email_address:
-        single_user = user_query.filter(
-            User.email_address == email_address.lower()
-        ).first_or_404()
+        user_query = user_query.filter(User.email_address == email_address.lower())
+        if fields is not None:
+            return jsonify(users=[sparse_result_or_404(user_query, RESOURCE_NAME, fields)])
+        single_user = user_query.first_or_404()
         return jsonify(
             users=[single_user.serialize()]
         )
@@ -119,13 +133,19 @@ def list_users():
 
         user_query = user_query.filter(User.supplier_id == supplier_id)
 
+    serializer = None
+    if fields is not None:
+        user_query = project_sparse_fields(user_query, RESOURCE_NAME, fields)
+        serializer = sparse_field_serializer(fields)
+
     return paginated_result_response(
         result_name=RESOURCE_NAME,
         results_query=user_query,
         page=page,
         per_page=current_app.config['DM_API_SERVICES_PAGE_SIZE'],
         endpoint='.list_users',
-        request_args=request.args
+        request_args=request.args,
+        serializer=serializer,
     ), 200
 
 
@@ -262,7 +282,7 @@ def update_user(user_id):
 def export_users_for_framework(framework_slug):
 
     # 400 if framework slug is invalid
-    framework = Framework.query.filter(Framework.slug == framework_slug).first()
+    framework = get_framework_by_slug(framework_slug)
     if not framework:
         abort(400, 'invalid framework')
 
@@ -272,13 +292,12 @@ def export_users_for_framework(framework_slug):
     suppliers_with_a_complete_service = frozenset(framework.get_supplier_ids_for_completed_service())
 
     supplier_id_published_service_count = dict(db.session.query(
-        Service.supplier_id,
-        func.count(Service.id)
+        SupplierServiceCount.supplier_id,
+        SupplierServiceCount.count
     ).filter(
-        Service.status == 'published',
-        Service.framework_id == framework.id
-    ).group_by(
-        Service.supplier_id
+        SupplierServiceCount.framework_id == framework.id,
+        SupplierServiceCount.table_name == 'services',
+        SupplierServiceCount.status == 'published',
     ).all())
 
     supplier_frameworks_and_users = db.session.query(
@@ -348,7 +367,7 @@ def email_has_valid_buyer_domain():
     if not email_address:
         abort(400, "'email_address' is a required parameter")
 
-    domain_ok = buyer_email_address_has_approved_domain(BuyerEmailDomain.query.all(), email_address)
+    domain_ok = is_approved_buyer_email_address(email_address)
     return jsonify(valid=domain_ok), 200
 
 
@@ -1,4 +1,11 @@
+import threading
+import time
+
+from flask import current_app, g, has_request_context
+from sqlalchemy import func
+
 from app import db
+from app.validation import domain_has_approved_suffix
 
 
 class BuyerEmailDomain(db.Model):
@@ -12,3 +19,55 @@ class BuyerEmailDomain(db.Model):
             "id": self.id,
             "domainName": self.domain_name,
         }
+
+
+# The names of all buyer email domains, when they were read from the database and the version (see
+# `_buyer_domain_version`) they were read at. See `approved_buyer_domain_names`.
+_buyer_domain_cache = {'domain_names': frozenset(), 'loaded_at': None, 'version': None}
+_buyer_domain_cache_lock = threading.Lock()
+
+
+def _buyer_domain_version():
+    """
+    The highest id and number of buyer email domains, which change whichever process adds or removes a domain. Read
+    once per request.
+    """
+    if has_request_context() and getattr(g, 'buyer_domain_version', None) is not None:
+        return g.buyer_domain_version
+    version = tuple(db.session.query(func.max(BuyerEmailDomain.id), func.count(BuyerEmailDomain.id)).one())
+    if has_request_context():
+        g.buyer_domain_version = version
+    return version
+
+
+def invalidate_buyer_domain_cache():
+    """Make this process read buyer email domains from the database again. Call after adding a domain."""
+    with _buyer_domain_cache_lock:
+        _buyer_domain_cache['loaded_at'] = None
+
+
+def approved_buyer_domain_names():
+    """
+    Return the set of buyer email domain names, cached by each process and read from the database again when a domain
+    has been added or removed (by any process), or at most every DM_API_BUYER_DOMAINS_CACHE_TTL seconds. 0 turns the
+    cache off.
+    """
+    ttl = current_app.config['DM_API_BUYER_DOMAINS_CACHE_TTL']
+    if not ttl:
+        return frozenset(domain_name for domain_name, in db.session.query(BuyerEmailDomain.domain_name))
+
+    # The version is read before the domains, so a domain added in between is at worst read again next time
+    version = _buyer_domain_version()
+    with _buyer_domain_cache_lock:
+        loaded_at = _buyer_domain_cache['loaded_at']
+        if loaded_at is None or time.monotonic() - loaded_at >= ttl or _buyer_domain_cache['version'] != version:
+            _buyer_domain_cache['domain_names'] = frozenset(
+                domain_name for domain_name, in db.session.query(BuyerEmailDomain.domain_name)
+            )
+            _buyer_domain_cache['loaded_at'] = time.monotonic()
+            _buyer_domain_cache['version'] = version
+        return _buyer_domain_cache['domain_names']
+
+
+def is_approved_buyer_email_address(email_address):
+    return domain_has_approved_suffix(approved_buyer_domain_names(), email_address.split('@')[-1])
@@ -1,26 +1,28 @@
 # TODO split this file into per-functional-area modules
 
 from datetime import datetime
+from functools import lru_cache
 
 import re
 import sqlalchemy.dialects.postgresql
-from flask import current_app
+from flask import current_app, g, has_request_context
 from flask_sqlalchemy import BaseQuery
 from six import string_types, iteritems
 from sqlalchemy import Sequence
-from sqlalchemy import asc, desc, exists
+from sqlalchemy import asc, desc, event, exists
 from sqlalchemy import func
-from sqlalchemy.dialects.postgresql import INTERVAL
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import validates, backref, mapper
+from sqlalchemy.orm import validates, backref, mapper, joinedload
 from sqlalchemy.orm.session import Session
 from sqlalchemy.sql.expression import (
     case as sql_case,
     cast as sql_cast,
     select as sql_select,
     false as sql_false,
+    literal as sql_literal,
     null as sql_null,
+    union_all as sql_union_all,
     and_ as sql_and,
     or_ as sql_or,
 )
@@ -30,7 +32,8 @@ from sqlalchemy_utils import generic_relationship
 from dmutils.dates import get_publishing_dates
 from dmutils.formats import DATETIME_FORMAT
 from .. import db
-from ..models.buyer_domains import BuyerEmailDomain
+from ..json_utils import RawJSON
+from ..models.buyer_domains import is_approved_buyer_email_address
 from app.utils import (
     drop_foreign_fields,
     link,
@@ -40,7 +43,7 @@ from app.utils import (
     url_for,
 )
 from ..validation import (
-    is_valid_service_id, get_validation_errors, buyer_email_address_has_approved_domain,
+    is_valid_service_id, get_validation_errors,
     admin_email_address_has_approved_domain
 )
 
@@ -55,6 +58,16 @@ class JSON(sqlalchemy.dialects.postgresql.JSON):
         super(JSON, self).__init__(none_as_null=True, astext_type=astext_type)
 
 
+class JSONB(sqlalchemy.dialects.postgresql.JSONB):
+    """
+    JSONB version of `JSON`, for documents we query by containment (`@>`) or key existence (`?`), which GIN indexes
+    can answer. Postgres stores JSONB parsed, so the text it gives back isn't the text it was given.
+    """
+
+    def __init__(self, astext_type=None):
+        super(JSONB, self).__init__(none_as_null=True, astext_type=astext_type)
+
+
 class FrameworkLot(db.Model):
     __tablename__ = 'framework_lots'
 
@@ -395,12 +408,16 @@ class Supplier(db.Model):
     # Drop this method once the supplier front end is using SupplierFramework counts
     def get_service_counts(self):
         services = db.session.query(
-            Framework.name, func.count(Framework.name)
-        ).join(Service.framework).filter(
+            Framework.name, SupplierServiceCount.count
+        ).join(
+            SupplierServiceCount, SupplierServiceCount.framework_id == Framework.id
+        ).filter(
             Framework.status == 'live',
-            Service.status == 'published',
-            Service.supplier_id == self.supplier_id
-        ).group_by(Framework.name).all()
+            SupplierServiceCount.supplier_id == self.supplier_id,
+            SupplierServiceCount.table_name == 'services',
+            SupplierServiceCount.status == 'published',
+            SupplierServiceCount.count > 0,
+        ).all()
 
         return dict(services)
 
@@ -467,6 +484,8 @@ class SupplierFramework(db.Model):
                              db.ForeignKey('frameworks.id'),
                              primary_key=True)
     declaration = db.Column(JSON)
+    # The declaration as Postgres stores it, for serializing without decoding it (see `declaration_loading_options`)
+    declaration_text = db.column_property(sql_cast(declaration, db.Text), deferred=True)
     on_framework = db.Column(db.Boolean, nullable=True)
     agreed_variations = db.Column(JSON)
 
@@ -520,6 +539,16 @@ class SupplierFramework(db.Model):
 
         return value
 
+    @staticmethod
+    def declaration_loading_options(raw_declaration):
+        """
+        Query options for loading supplier frameworks to `serialize(raw_declaration=raw_declaration)`: with raw
+        declarations, load the text of the declaration instead of the decoded declaration.
+        """
+        if not raw_declaration:
+            return ()
+        return db.defer(SupplierFramework.declaration), db.undefer(SupplierFramework.declaration_text)
+
     @staticmethod
     def find_by_supplier_and_framework(supplier_id, framework_slug):
         return SupplierFramework.query.filter(
@@ -531,38 +560,37 @@ class SupplierFramework(db.Model):
 
     @staticmethod
     def get_service_counts(supplier_id):
-
-        count_services_query = db.session.query(
-            Service.framework_id, Service.status, func.count()
-        ).filter(
-            Service.supplier_id == supplier_id
-        ).group_by(
-            Service.framework_id,
-            Service.status
-        ).all()
-
-        count_drafts_query = db.session.query(
-            DraftService.framework_id, DraftService.status, func.count()
+        """Number of the supplier's services and drafts by (framework id, status) - a draft count takes precedence"""
+        counts = db.session.query(
+            SupplierServiceCount.framework_id, SupplierServiceCount.status, SupplierServiceCount.count
         ).filter(
-            DraftService.supplier_id == supplier_id
-        ).group_by(
-            DraftService.framework_id,
-            DraftService.status
+            SupplierServiceCount.supplier_id == supplier_id,
+            SupplierServiceCount.count > 0,
+        ).order_by(
+            # 'services' sorts after 'draft_services'
+            desc(SupplierServiceCount.table_name)
         ).all()
 
         return {
             (row[0], row[1]): row[2]
-            for row in count_services_query + count_drafts_query
+            for row in counts
         }
 
+    def referenced_user_ids(self):
+        """Ids of the users who agreed variations and uploaded or countersigned the current agreement"""
+        user_ids = [variation.get("agreedUserId") for variation in (self.agreed_variations or {}).values()]
+        agreement = self.current_framework_agreement
+        if agreement:
+            user_ids.append((agreement.signed_agreement_details or {}).get("uploaderUserId"))
+            user_ids.append((agreement.countersigned_agreement_details or {}).get("approvedByUserId"))
+        return [user_id for user_id in user_ids if user_id]
+
     @staticmethod
-    def serialize_agreed_variation(agreed_variation, with_users=False):
+    def serialize_agreed_variation(agreed_variation, with_users=False, users=None):
         if not (with_users and agreed_variation.get("agreedUserId")):
             return agreed_variation
 
-        user = User.query.filter(
-            User.id == agreed_variation["agreedUserId"]
-        ).first()
+        user = (users or UserResolver.for_request()).by_id(agreed_variation["agreedUserId"])
         if not user:
             return agreed_variation
 
@@ -571,9 +599,13 @@ class SupplierFramework(db.Model):
             "agreedUserEmail": user.email_address,
         })
 
-    def serialize(self, data=None, with_users=False, with_declaration=True):
+    def serialize(self, data=None, with_users=False, with_declaration=True, raw_declaration=False):
+        users = UserResolver.for_request() if with_users else None
+        if users:
+            users.fetch(user_ids=self.referenced_user_ids())
+
         agreed_variations = {
-            k: self.serialize_agreed_variation(v, with_users=with_users)
+            k: self.serialize_agreed_variation(v, with_users=with_users, users=users)
             for k, v in iteritems(self.agreed_variations or {})
         }
 
@@ -590,7 +622,9 @@ class SupplierFramework(db.Model):
         }
         if with_declaration:
             supplier_framework.update({
-                "declaration": self.declaration,
+                "declaration": (
+                    self.declaration_text and RawJSON(self.declaration_text) if raw_declaration else self.declaration
+                ),
             })
         if data:
             supplier_framework.update(data)
@@ -631,18 +665,14 @@ class SupplierFramework(db.Model):
 
         if with_users:
             if (supplier_framework.get("agreementDetails") or {}).get("uploaderUserId"):
-                user = User.query.filter(
-                    User.id == supplier_framework['agreementDetails']['uploaderUserId']
-                ).first()
+                user = users.by_id(supplier_framework['agreementDetails']['uploaderUserId'])
 
                 if user:
                     supplier_framework['agreementDetails']['uploaderUserName'] = user.name
                     supplier_framework['agreementDetails']['uploaderUserEmail'] = user.email_address
 
             if (supplier_framework.get("countersignedDetails") or {}).get("approvedByUserId"):
-                user = User.query.filter(
-                    User.id == supplier_framework['countersignedDetails']['approvedByUserId']
-                ).first()
+                user = users.by_id(supplier_framework['countersignedDetails']['approvedByUserId'])
 
                 if user:
                     supplier_framework['countersignedDetails']['approvedByUserName'] = user.name
@@ -835,9 +865,8 @@ class User(db.Model):
 
     @validates('email_address')
     def validate_email_address(self, key, value):
-        existing_buyer_domains = BuyerEmailDomain.query.all()
         if value:
-            if self.role == 'buyer' and not buyer_email_address_has_approved_domain(existing_buyer_domains, value):
+            if self.role == 'buyer' and not is_approved_buyer_email_address(value):
                 raise ValidationError("invalid_buyer_domain")
             if self.role in self.ADMIN_ROLES and not admin_email_address_has_approved_domain(value):
                 raise ValidationError("invalid_admin_domain")
@@ -845,10 +874,8 @@ class User(db.Model):
 
     @validates('role')
     def validate_role(self, key, value):
-        existing_buyer_domains = BuyerEmailDomain.query.all()
         if self.email_address:
-            if value == 'buyer' and \
-                    not buyer_email_address_has_approved_domain(existing_buyer_domains, self.email_address):
+            if value == 'buyer' and not is_approved_buyer_email_address(self.email_address):
                 raise ValidationError("invalid_buyer_domain")
             if value in self.ADMIN_ROLES and \
                     not admin_email_address_has_approved_domain(self.email_address):
@@ -905,10 +932,75 @@ class User(db.Model):
         return user
 
 
+class UserResolver(object):
+    """
+    Names and email addresses of users, looked up by id or by email address for serializing things that refer to
+    them. `fetch` looks up everything a serialization will need in one query; anything already looked up during the
+    request isn't looked up again.
+    """
+
+    def __init__(self):
+        self._by_id = {}
+        self._by_email_address = {}
+
+    @classmethod
+    def for_request(cls):
+        """The request's resolver, or a new one outside of a request."""
+        if not has_request_context():
+            return cls()
+        if getattr(g, 'user_resolver', None) is None:
+            g.user_resolver = cls()
+        return g.user_resolver
+
+    @staticmethod
+    def _as_id(user_id):
+        try:
+            return int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+    def fetch(self, user_ids=(), email_addresses=()):
+        user_ids = {self._as_id(user_id) for user_id in user_ids} - {None} - set(self._by_id)
+        email_addresses = set(filter(None, email_addresses)) - set(self._by_email_address)
+        if not (user_ids or email_addresses):
+            return
+
+        self._by_id.update(dict.fromkeys(user_ids))
+        self._by_email_address.update(dict.fromkeys(email_addresses))
+        conditions = []
+        if user_ids:
+            conditions.append(User.id.in_(sorted(user_ids)))
+        if email_addresses:
+            conditions.append(User.email_address.in_(sorted(email_addresses)))
+        for user in db.session.query(User.id, User.name, User.email_address).filter(sql_or(*conditions)):
+            self._by_id[user.id] = self._by_email_address[user.email_address] = user
+
+    def by_id(self, user_id):
+        """The user's `(id, name, email_address)`, or None if there isn't one"""
+        self.fetch(user_ids=[user_id])
+        return self._by_id.get(self._as_id(user_id))
+
+    def by_email_address(self, email_address):
+        """The user's `(id, name, email_address)`, or None if there isn't one"""
+        self.fetch(email_addresses=[email_address])
+        return self._by_email_address.get(email_address)
+
+
 class ServiceTableMixin(object):
 
     STATUSES = ('disabled', 'enabled', 'published')
 
+    # How to load the collections hanging off a service's supplier and framework for each kind of query (see
+    # `loading_options`). Supplier.contact_information and Framework.lots are joined-loaded by default, which repeats
+    # every service row once per contact and lot. Lists only serialize, which never touches them, so they aren't
+    # loaded at all (leaving them empty for the rest of the session - only use 'list' when nothing else will read
+    # them); single fetches and writes might still use them, so they're loaded on access.
+    LOADING_PROFILES = {
+        'list': 'noload',
+        'single': 'lazyload',
+        'write': 'lazyload',
+    }
+
     # not used as the externally-visible "pk" by actual Services in favour of service_id
     id = db.Column(db.Integer, primary_key=True)
 
@@ -960,6 +1052,23 @@ class ServiceTableMixin(object):
     def lot(cls):
         return db.relationship(Lot, lazy='joined', innerjoin=True)
 
+    @classmethod
+    def loading_options(cls, profile):
+        """
+        Query options for loading services for `profile` - one of LOADING_PROFILES - e.g.
+
+            DraftService.query.options(*DraftService.loading_options('list'))
+
+        The supplier, framework and lot are always joined in: there's only one of each per service and serialize needs
+        them all.
+        """
+        load_collection = cls.LOADING_PROFILES[profile]
+        return (
+            getattr(joinedload(cls.supplier, innerjoin=True), load_collection)(Supplier.contact_information),
+            getattr(joinedload(cls.framework, innerjoin=True), load_collection)(Framework.lots),
+            joinedload(cls.lot, innerjoin=True),
+        )
+
     @validates('service_id')
     def validate_service_id(self, key, value):
         if not is_valid_service_id(value):
@@ -1035,6 +1144,8 @@ class ServiceTableMixin(object):
 class Service(db.Model, ServiceTableMixin):
     __tablename__ = 'services'
 
+    data = db.Column(JSONB, nullable=False)
+
     @staticmethod
     def create_from_draft(draft, status):
         return Service(
@@ -1048,39 +1159,61 @@ class Service(db.Model, ServiceTableMixin):
 
     class query_class(BaseQuery):
         def framework_is_live(self):
-            return self.filter(
-                Service.framework.has(Framework.status == 'live'))
+            return self.filter(Service.framework_id.in_(
+                db.session.query(Framework.id).filter(Framework.status == 'live')
+            ))
 
         def default_order(self):
-            service_name = Service.data['serviceName'] \
-                                  .cast(String) \
-                                  .label('data_servicename')
+            # The same expression as ix_services_supplier_id_service_name, so a supplier's services can be read in
+            # order from it
             return self.order_by(
                 asc(Service.framework_id),
                 asc(Service.lot_id),
-                asc(service_name))
+                asc(Service.data['serviceName'].astext))
 
         def has_statuses(self, *statuses):
             return self.filter(Service.status.in_(statuses))
 
         def has_frameworks(self, *frameworks):
-            return self.filter(
-                Service.framework.has(Framework.slug.in_(frameworks))
-            )
+            return self.filter(Service.framework_id.in_(
+                db.session.query(Framework.id).filter(Framework.slug.in_(frameworks))
+            ))
 
         def in_lot(self, lot_slug):
-            return self.filter(Service.lot.has(Lot.slug == lot_slug))
+            return self.filter(Service.lot_id.in_(db.session.query(Lot.id).filter(Lot.slug == lot_slug)))
+
+        def in_frameworks(self, *framework_ids):
+            return self.filter(Service.framework_id.in_(framework_ids) if framework_ids else sql_false())
+
+        def in_lots(self, *lot_ids):
+            return self.filter(Service.lot_id.in_(lot_ids) if lot_ids else sql_false())
 
         def data_has_key(self, key_to_find):
-            return self.filter(Service.data[key_to_find].astext != '')  # SQLAlchemy weirdness
+            return self.filter(Service.data.has_key(key_to_find))  # noqa: W601
 
         def data_key_contains_value(self, k, v):
-            return self.filter(Service.data[k].astext.contains(u'"{}"'.format(v)))  # Postgres 9.3: use string matching
+            return self.filter(Service.data.contains({k: [v]}))
 
     def get_link(self):
         return url_for("main.get_service", service_id=self.service_id)
 
 
+# Answers the `data_has_key` and `data_key_contains_value` filters (for locations and roles)
+db.Index('ix_services_data', Service.data, postgresql_using='gin')
+# Services listings filter by framework and status (mostly 'published') and are ordered by id; a supplier's services
+# are ordered by `default_order`
+db.Index('ix_services_framework_id_status_id', Service.framework_id, Service.status, Service.id)
+db.Index(
+    'ix_services_published_framework_id_id',
+    Service.framework_id, Service.id,
+    postgresql_where=Service.status == 'published',
+)
+db.Index(
+    'ix_services_supplier_id_service_name',
+    Service.supplier_id, Service.framework_id, Service.lot_id, Service.data['serviceName'].astext,
+)
+
+
 class ArchivedService(db.Model, ServiceTableMixin):
     """
         A record of a Service's past state
@@ -1122,6 +1255,8 @@ class DraftService(db.Model, ServiceTableMixin):
 
     STATUSES = ('not-submitted', 'submitted', 'enabled', 'disabled', 'published', 'failed')
 
+    data = db.Column(JSONB, nullable=False)
+
     # Overwrites service_id column to remove uniqueness and nullable constraint
     service_id = db.Column(db.String, index=True, unique=False, nullable=True,
                            default=None)
@@ -1189,6 +1324,50 @@ class DraftService(db.Model, ServiceTableMixin):
         return url_for("main.fetch_draft_service", draft_id=self.id)
 
 
+class SupplierServiceCount(db.Model):
+    """The number of services and draft services each supplier has on each framework with each status
+
+    Kept up to date by triggers on `services` and `draft_services` (see migration 1240), in the same transaction as the
+    write, so reading a supplier's counts is a primary key lookup rather than an aggregate over their services. Rows
+    stay in the table at 0 once a supplier's last service with a status goes. `rebuild` recounts everything.
+    """
+    __tablename__ = 'supplier_service_counts'
+
+    supplier_id = db.Column(db.BigInteger, db.ForeignKey('suppliers.supplier_id'), primary_key=True)
+    framework_id = db.Column(db.Integer, db.ForeignKey('frameworks.id'), primary_key=True)
+    # 'services' or 'draft_services' - both have 'enabled', 'disabled' and 'published' statuses
+    table_name = db.Column(db.String, primary_key=True)
+    status = db.Column(db.String, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def rebuild(cls):
+        """Recount every supplier's services and drafts (the caller commits)
+
+        Writes to services and draft services wait until the transaction ends, so none are missed or counted twice.
+        """
+        db.session.execute("LOCK TABLE services, draft_services IN SHARE MODE")
+        db.session.query(cls).delete(synchronize_session=False)
+        counts = sql_union_all(*(
+            sql_select([
+                table.c.supplier_id, table.c.framework_id, sql_literal(table.name), table.c.status, func.count()
+            ]).group_by(table.c.supplier_id, table.c.framework_id, table.c.status)
+            for table in (Service.__table__, DraftService.__table__)
+        ))
+        return db.session.execute(cls.__table__.insert().from_select(
+            ['supplier_id', 'framework_id', 'table_name', 'status', 'count'], counts
+        )).rowcount
+
+
+class FrameworkStats(db.Model):
+    """A framework's /frameworks/<slug>/stats, as last counted, and when (see `app.framework_utils.framework_stats`)"""
+    __tablename__ = 'framework_stats'
+
+    framework_id = db.Column(db.Integer, db.ForeignKey('frameworks.id'), primary_key=True)
+    stats = db.Column(JSONB, nullable=False)
+    refreshed_at = db.Column(db.DateTime, nullable=False)
+
+
 class AuditEvent(db.Model):
     __tablename__ = 'audit_events'
 
@@ -1265,9 +1444,7 @@ class AuditEvent(db.Model):
             })
 
         if include_user:
-            user = User.query.filter(
-                User.email_address == self.user
-            ).first()
+            user = UserResolver.for_request().by_email_address(self.user)
 
             if user:
                 data['userName'] = user.name
@@ -1275,6 +1452,16 @@ class AuditEvent(db.Model):
         return data
 
 
+# Briefs published on the same day with the same requirements length share their dates, so there are only ever a
+# couple of distinct results a day to remember
+BRIEF_PUBLISHING_DATES_CACHE_SIZE = 2048
+
+
+@lru_cache(maxsize=BRIEF_PUBLISHING_DATES_CACHE_SIZE)
+def _publishing_dates(published_day, requirements_length):
+    return get_publishing_dates({'publishedAt': published_day, 'requirementsLength': requirements_length})
+
+
 class Brief(db.Model):
     __tablename__ = 'briefs'
 
@@ -1298,6 +1485,16 @@ class Brief(db.Model):
     cancelled_at = db.Column(db.DateTime, index=True, nullable=True)
     unsuccessful_at = db.Column(db.DateTime, index=True, nullable=True)
 
+    # Deadlines worked out from `published_at` and the requirements length, stored when the brief is saved (see
+    # `_store_brief_deadlines`) so queries can filter and sort on them using an index
+    _applications_closed_at = db.Column("applications_closed_at", db.DateTime, index=True, nullable=True)
+    _clarification_questions_closed_at = db.Column(
+        "clarification_questions_closed_at", db.DateTime, index=True, nullable=True
+    )
+    _clarification_questions_published_by = db.Column(
+        "clarification_questions_published_by", db.DateTime, index=True, nullable=True
+    )
+
     __table_args__ = (db.ForeignKeyConstraint([framework_id, _lot_id],
                                               ['framework_lots.framework_id', 'framework_lots.lot_id']),
                       {})
@@ -1357,38 +1554,34 @@ class Brief(db.Model):
     def applications_closed_at(self):
         if self.published_at is None:
             return None
-        brief_publishing_date_and_length = self._build_date_and_length_data()
 
-        return get_publishing_dates(brief_publishing_date_and_length)['closing_date']
+        return self._publishing_dates()['closing_date']
 
     @applications_closed_at.expression
     def applications_closed_at(cls):
-        """
-        Set the applications_closed_at based on whether a brief has 'requirementsLength' one week or two weeks.
-        """
-        is_one_week = cls.data['requirementsLength'].astext == '1 week'
-        one_week_addition_function = func.date_trunc('day', cls.published_at) + sql_cast('1 week 23:59:59', INTERVAL)
-        two_week_addition_function = func.date_trunc('day', cls.published_at) + sql_cast('2 weeks 23:59:59', INTERVAL)
-        return sql_case(
-            [(is_one_week, one_week_addition_function)],
-            else_=two_week_addition_function
-        )
+        return cls._applications_closed_at
 
-    @property
+    @hybrid_property
     def clarification_questions_closed_at(self_or_cls):
         if self_or_cls.published_at is None:
             return None
-        brief_publishing_date_and_length = self_or_cls._build_date_and_length_data()
 
-        return get_publishing_dates(brief_publishing_date_and_length)['questions_close']
+        return self_or_cls._publishing_dates()['questions_close']
 
-    @property
+    @clarification_questions_closed_at.expression
+    def clarification_questions_closed_at(cls):
+        return cls._clarification_questions_closed_at
+
+    @hybrid_property
     def clarification_questions_published_by(self_or_cls):
         if self_or_cls.published_at is None:
             return None
-        brief_publishing_date_and_length = self_or_cls._build_date_and_length_data()
 
-        return get_publishing_dates(brief_publishing_date_and_length)['answers_close']
+        return self_or_cls._publishing_dates()['answers_close']
+
+    @clarification_questions_published_by.expression
+    def clarification_questions_published_by(cls):
+        return cls._clarification_questions_published_by
 
     @hybrid_property
     def clarification_questions_are_closed(self_or_cls):
@@ -1473,9 +1666,32 @@ class Brief(db.Model):
             (cls.applications_closed_at > datetime.utcnow(), cls.search_result_status_ordering['live']),
         ], else_=cls.search_result_status_ordering['closed'])
 
+    @classmethod
+    def status_condition(cls, status):
+        """
+        A condition matching briefs with `status`, equivalent to `Brief.status == status` but written as comparisons
+        of the columns themselves (rather than of a CASE expression) so it can use their indexes
+        """
+        now = datetime.utcnow()
+        awarded = exists([BriefResponse.id]).where(
+            sql_and(cls.id == BriefResponse.brief_id, BriefResponse.awarded_at.isnot(None))
+        )
+        published = [cls.withdrawn_at.is_(None), cls.published_at.isnot(None)]
+        closed = published + [cls._applications_closed_at <= now]
+        conditions = {
+            'withdrawn': [cls.withdrawn_at.isnot(None)],
+            'draft': [cls.withdrawn_at.is_(None), cls.published_at.is_(None)],
+            'live': published + [cls._applications_closed_at > now],
+            'cancelled': closed + [cls.cancelled_at.isnot(None)],
+            'unsuccessful': closed + [cls.cancelled_at.is_(None), cls.unsuccessful_at.isnot(None)],
+            'awarded': closed + [cls.cancelled_at.is_(None), cls.unsuccessful_at.is_(None), awarded],
+            'closed': closed + [cls.cancelled_at.is_(None), cls.unsuccessful_at.is_(None), ~awarded],
+        }
+        return sql_and(*conditions[status]) if status in conditions else sql_false()
+
     class query_class(BaseQuery):
         def has_statuses(self, *statuses):
-            return self.filter(Brief.status.in_(statuses))
+            return self.filter(sql_or(sql_false(), *(Brief.status_condition(status) for status in statuses)))
 
         def has_datetime_field_after(self, attr, start_datetime, inclusive=None):
             """Date filter values should be datetime objects."""
@@ -1560,12 +1776,17 @@ class Brief(db.Model):
             'requirementsLength': requirements_length
         }
 
+    def _publishing_dates(self):
+        date_and_length = self._build_date_and_length_data()
+        return _publishing_dates(date_and_length['publishedAt'], date_and_length['requirementsLength'])
+
     def serialize(self, with_users=False, with_clarification_questions=False):
         data = dict(self.data.items())
+        status = self.status
 
         data.update({
             'id': self.id,
-            'status': self.status,
+            'status': status,
             # TODO: remove top-level 'frameworkFoo' fields (use 'framework'git ad sub-dict instead)
             'frameworkSlug': self.framework.slug,
             'frameworkFramework': self.framework.framework,
@@ -1615,7 +1836,7 @@ class Brief(db.Model):
                 'cancelledAt': self.cancelled_at.strftime(DATETIME_FORMAT)
             })
 
-        if self.status == 'awarded':
+        if status == 'awarded':
             data.update({
                 'awardedBriefResponseId': self.awarded_brief_response.id
             })
@@ -1636,6 +1857,14 @@ class Brief(db.Model):
         return data
 
 
+@event.listens_for(Brief, 'before_insert')
+@event.listens_for(Brief, 'before_update')
+def _store_brief_deadlines(mapper, connection, brief):
+    brief._applications_closed_at = brief.applications_closed_at
+    brief._clarification_questions_closed_at = brief.clarification_questions_closed_at
+    brief._clarification_questions_published_by = brief.clarification_questions_published_by
+
+
 class BriefUser(db.Model):
     __tablename__ = 'brief_users'
 
@@ -1708,14 +1937,15 @@ class BriefResponse(db.Model):
             (cls.submitted_at.isnot(None), 'submitted'),
         ], else_='draft')
 
-    def validate(self, enforce_required=True, required_fields=None, max_day_rate=None):
+    def validate(self, enforce_required=True, required_fields=None, max_day_rate=None, touched_fields=None):
         errs = get_validation_errors(
             'brief-responses-{}-{}'.format(
                 self.brief.framework.slug,
                 self.brief.lot.slug),
             self.data,
             enforce_required=enforce_required,
-            required_fields=required_fields
+            required_fields=required_fields,
+            touched_fields=touched_fields
         )
 
         if (
@@ -0,0 +1,382 @@
+"""
+Column projections for the busiest list endpoints.
+
+Loading full model instances (with their joined relationships) and calling `serialize()` on each one is the bulk of
+the time spent serving a page of services or suppliers. These functions narrow a model query down to just the columns
+the response needs, with datetimes formatted by Postgres, and build the same dicts as the models' `serialize()`
+methods from the plain rows. Use them via the `serializer` argument of the response helpers in `app.utils`, e.g.
+
+    paginated_result_response(..., results_query=project_services(services), serializer=serialize_service_rows)
+
+The output must stay identical to `serialize()` - tests/test_projections.py compares the two.
+
+With `raw_data`, service `data` is read as text and the other fields are added to it without decoding it (see
+`app.json_utils.RawJSON`), so large service documents aren't decoded and re-encoded on every read.
+
+Sparse fieldsets (the `fields` request argument) go further, selecting only the requested fields - columns, or keys
+of a resource's `data` extracted by Postgres - see `project_sparse_fields`.
+"""
+import re
+from collections import defaultdict
+
+from flask import abort, current_app
+from six import string_types
+from sqlalchemy import func, Text
+from sqlalchemy.sql.expression import cast
+
+from . import db
+from .json_utils import merge_raw_json_object
+from .models import Brief, BriefResponse, ContactInformation, Framework, Lot, Service, Supplier, User
+from .models.main import filter_null_value_fields
+from .utils import link, url_for
+
+# Postgres equivalent of dmutils.formats.DATETIME_FORMAT
+SQL_DATETIME_FORMAT = 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'
+
+
+def _datetime_text(column):
+    return func.to_char(column, SQL_DATETIME_FORMAT)
+
+
+def _formatted_datetime(column, label):
+    return _datetime_text(column).label(label)
+
+
+def project_services(query, raw_data=False):
+    """
+    Narrow a `Service` query to the columns used by `serialize_service_rows`, with `data` as JSON text if `raw_data`.
+    """
+    return query.with_entities(
+        Service.id,
+        Service.service_id,
+        cast(Service.data, Text).label('data') if raw_data else Service.data,
+        Service.status,
+        Service.copied_to_following_framework,
+        Service.supplier_id,
+        _formatted_datetime(Service.created_at, 'created_at'),
+        _formatted_datetime(Service.updated_at, 'updated_at'),
+        Supplier.name.label('supplier_name'),
+        Framework.slug.label('framework_slug'),
+        Framework.framework.label('framework_framework'),
+        Framework.name.label('framework_name'),
+        Framework.status.label('framework_status'),
+        Lot.slug.label('lot_slug'),
+        Lot.name.label('lot_name'),
+    ).join(
+        Supplier, Supplier.supplier_id == Service.supplier_id
+    ).join(
+        Framework, Framework.id == Service.framework_id
+    ).join(
+        Lot, Lot.id == Service.lot_id
+    )
+
+
+def serialize_service_rows(rows):
+    """
+    Build `ServiceTableMixin.serialize()` dicts from `project_services` rows - or RawJSON equivalents, for rows with
+    raw `data`.
+    """
+    serialized = []
+    for row in rows:
+        data = {
+            'id': row.service_id,
+            'supplierId': row.supplier_id,
+            'supplierName': row.supplier_name,
+            'frameworkSlug': row.framework_slug,
+            'frameworkFramework': row.framework_framework,
+            'frameworkName': row.framework_name,
+            'frameworkStatus': row.framework_status,
+            'lot': row.lot_slug,  # deprecated, use lotSlug instead
+            'lotSlug': row.lot_slug,
+            'lotName': row.lot_name,
+            'updatedAt': row.updated_at,
+            'createdAt': row.created_at,
+            'status': row.status,
+            'copiedToFollowingFramework': row.copied_to_following_framework,
+            'links': link("self", url_for("main.get_service", service_id=row.service_id)),
+        }
+
+        if isinstance(row.data, string_types):
+            serialized.append(merge_raw_json_object(row.data, data))
+        else:
+            serialized.append(dict(row.data, **data))
+
+    return serialized
+
+
+def project_suppliers(query):
+    """Narrow a `Supplier` query to the columns used by `serialize_supplier_rows`."""
+    return query.with_entities(
+        Supplier.supplier_id,
+        Supplier.name,
+        Supplier.description,
+        Supplier.duns_number,
+        Supplier.companies_house_number,
+        Supplier.registered_name,
+        Supplier.registration_country,
+        Supplier.other_company_registration_number,
+        Supplier.vat_number,
+        Supplier.organisation_size,
+        Supplier.trading_status,
+        Supplier.company_details_confirmed,
+    )
+
+
+def _contact_information_by_supplier_id(supplier_ids):
+    contacts = defaultdict(list)
+    if not supplier_ids:
+        return contacts
+
+    rows = db.session.query(
+        ContactInformation.id,
+        ContactInformation.supplier_id,
+        ContactInformation.contact_name,
+        ContactInformation.phone_number,
+        ContactInformation.email,
+        ContactInformation.address1,
+        ContactInformation.city,
+        ContactInformation.postcode,
+    ).filter(
+        ContactInformation.supplier_id.in_(supplier_ids)
+    ).order_by(ContactInformation.id)
+
+    for row in rows:
+        contacts[row.supplier_id].append(filter_null_value_fields({
+            'id': row.id,
+            'contactName': row.contact_name,
+            'phoneNumber': row.phone_number,
+            'email': row.email,
+            'address1': row.address1,
+            'city': row.city,
+            'postcode': row.postcode,
+            'links': link("self", url_for(
+                "main.update_contact_information", supplier_id=row.supplier_id, contact_id=row.id
+            )),
+        }))
+
+    return contacts
+
+
+def serialize_supplier_rows(rows):
+    """
+    Build `Supplier.serialize()` dicts from `project_suppliers` rows, fetching the contact information for the whole
+    page in one query.
+    """
+    contacts = _contact_information_by_supplier_id([row.supplier_id for row in rows])
+
+    return [
+        filter_null_value_fields({
+            'id': row.supplier_id,
+            'name': row.name,
+            'description': row.description,
+            'dunsNumber': row.duns_number,
+            'companiesHouseNumber': row.companies_house_number,
+            'contactInformation': contacts[row.supplier_id],
+            'links': link("self", url_for("main.get_supplier", supplier_id=row.supplier_id)),
+            'registeredName': row.registered_name,
+            'registrationCountry': row.registration_country,
+            'otherCompanyRegistrationNumber': row.other_company_registration_number,
+            'vatNumber': row.vat_number,
+            'organisationSize': row.organisation_size,
+            'tradingStatus': row.trading_status,
+            'companyDetailsConfirmed': row.company_details_confirmed,
+        })
+        for row in rows
+    ]
+
+
+# `fields` are top level keys of the serialized resources - camelCase names, or keys of their `data`
+FIELD_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_]+$')
+
+
+def get_fields_or_400(request_args):
+    """
+    Parse the comma separated `fields` request argument into a list of field names, always starting with 'id'.
+    Returns None if no fields were asked for.
+    """
+    if not request_args.get('fields'):
+        return None
+
+    fields = ['id']
+    for field in request_args['fields'].split(','):
+        field = field.strip()
+        if not FIELD_NAME_PATTERN.match(field):
+            abort(400, "Invalid field: '{}'".format(field))
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+
+# Each resource's sparse fields are built per request, as some depend on the time or on config. A resource is
+# described by its fields as {name: (expression, model to join for it or None)}, the join conditions for those models,
+# the `data` column any other field is looked up in (or None) and the serialized fields that can't be selected.
+
+def _service_sparse_fields():
+    fields = {
+        'id': (Service.service_id, None),
+        'supplierId': (Service.supplier_id, None),
+        'supplierName': (Supplier.name, Supplier),
+        'frameworkSlug': (Framework.slug, Framework),
+        'frameworkFramework': (Framework.framework, Framework),
+        'frameworkName': (Framework.name, Framework),
+        'frameworkStatus': (Framework.status, Framework),
+        'lot': (Lot.slug, Lot),
+        'lotSlug': (Lot.slug, Lot),
+        'lotName': (Lot.name, Lot),
+        'updatedAt': (_datetime_text(Service.updated_at), None),
+        'createdAt': (_datetime_text(Service.created_at), None),
+        'status': (Service.status, None),
+        'copiedToFollowingFramework': (Service.copied_to_following_framework, None),
+    }
+    joins = {
+        Supplier: Supplier.supplier_id == Service.supplier_id,
+        Framework: Framework.id == Service.framework_id,
+        Lot: Lot.id == Service.lot_id,
+    }
+    return fields, joins, Service.data, {'links'}
+
+
+def _brief_sparse_fields():
+    fields = {
+        'id': (Brief.id, None),
+        'status': (Brief.status, None),
+        'frameworkSlug': (Framework.slug, Framework),
+        'frameworkFramework': (Framework.framework, Framework),
+        'frameworkName': (Framework.name, Framework),
+        'frameworkStatus': (Framework.status, Framework),
+        'isACopy': (Brief.is_a_copy, None),
+        'lot': (Lot.slug, Lot),
+        'lotSlug': (Lot.slug, Lot),
+        'lotName': (Lot.name, Lot),
+        'createdAt': (_datetime_text(Brief.created_at), None),
+        'updatedAt': (_datetime_text(Brief.updated_at), None),
+        'publishedAt': (_datetime_text(Brief.published_at), None),
+        'applicationsClosedAt': (_datetime_text(Brief.applications_closed_at), None),
+        'clarificationQuestionsClosedAt': (_datetime_text(Brief.clarification_questions_closed_at), None),
+        'clarificationQuestionsPublishedBy': (_datetime_text(Brief.clarification_questions_published_by), None),
+        'withdrawnAt': (_datetime_text(Brief.withdrawn_at), None),
+        'unsuccessfulAt': (_datetime_text(Brief.unsuccessful_at), None),
+        'cancelledAt': (_datetime_text(Brief.cancelled_at), None),
+    }
+    joins = {
+        Framework: Framework.id == Brief.framework_id,
+        Lot: Lot.id == Brief._lot_id,
+    }
+    unavailable = {
+        'framework', 'links', 'users', 'clarificationQuestions', 'clarificationQuestionsAreClosed',
+        'awardedBriefResponseId',
+    }
+    return fields, joins, Brief.data, unavailable
+
+
+def _brief_response_sparse_fields():
+    fields = {
+        'id': (BriefResponse.id, None),
+        'briefId': (BriefResponse.brief_id, None),
+        'supplierId': (BriefResponse.supplier_id, None),
+        'supplierName': (Supplier.name, Supplier),
+        'supplierOrganisationSize': (Supplier.organisation_size, Supplier),
+        'createdAt': (_datetime_text(BriefResponse.created_at), None),
+        'submittedAt': (_datetime_text(BriefResponse.submitted_at), None),
+        'awardedAt': (_datetime_text(BriefResponse.awarded_at), None),
+        'status': (BriefResponse.status, None),
+    }
+    joins = {
+        Supplier: Supplier.supplier_id == BriefResponse.supplier_id,
+    }
+    return fields, joins, BriefResponse.data, {'brief', 'links', 'awardDetails'}
+
+
+def _supplier_sparse_fields():
+    fields = {
+        'id': (Supplier.supplier_id, None),
+        'name': (Supplier.name, None),
+        'description': (Supplier.description, None),
+        'dunsNumber': (Supplier.duns_number, None),
+        'companiesHouseNumber': (Supplier.companies_house_number, None),
+        'registeredName': (Supplier.registered_name, None),
+        'registrationCountry': (Supplier.registration_country, None),
+        'otherCompanyRegistrationNumber': (Supplier.other_company_registration_number, None),
+        'vatNumber': (Supplier.vat_number, None),
+        'organisationSize': (Supplier.organisation_size, None),
+        'tradingStatus': (Supplier.trading_status, None),
+        'companyDetailsConfirmed': (Supplier.company_details_confirmed, None),
+    }
+    return fields, {}, None, set()
+
+
+def _user_sparse_fields():
+    fields = {
+        'id': (User.id, None),
+        'emailAddress': (User.email_address, None),
+        'phoneNumber': (User.phone_number, None),
+        'name': (User.name, None),
+        'role': (User.role, None),
+        'active': (User.active, None),
+        'locked': (User.failed_login_count >= current_app.config['DM_FAILED_LOGIN_LIMIT'], None),
+        'createdAt': (_datetime_text(User.created_at), None),
+        'updatedAt': (_datetime_text(User.updated_at), None),
+        'passwordChangedAt': (_datetime_text(User.password_changed_at), None),
+        'loggedInAt': (_datetime_text(func.coalesce(User.logged_in_at, User.created_at)), None),
+        'failedLoginCount': (User.failed_login_count, None),
+        'userResearchOptedIn': (User.user_research_opted_in, None),
+    }
+    return fields, {}, None, set()
+
+
+SPARSE_FIELDS = {
+    'services': _service_sparse_fields,
+    'briefs': _brief_sparse_fields,
+    'briefResponses': _brief_response_sparse_fields,
+    'suppliers': _supplier_sparse_fields,
+    'users': _user_sparse_fields,
+}
+
+
+def _sparse_field_label(position):
+    return 'sparse_field_{}'.format(position)
+
+
+def project_sparse_fields(query, resource, fields, extra_columns=()):
+    """
+    Narrow a query for `resource` (a key of SPARSE_FIELDS) to the columns for `fields`, joining only the tables those
+    need. Fields that aren't columns are looked up in the resource's `data` by Postgres, and are null where a document
+    doesn't have them. Aborts with a 400 for fields the resource can't give.
+
+    `extra_columns` are selected too, under their own names - the columns a keyset paginated query is ordered by, say.
+    The rows are serialized by `sparse_field_serializer(fields)`.
+    """
+    available, joins, data_column, unavailable = SPARSE_FIELDS[resource]()
+
+    columns, joined = [], []
+    for position, field in enumerate(fields):
+        if field in available:
+            expression, join = available[field]
+        elif data_column is not None and field not in unavailable:
+            expression, join = data_column[field], None
+        else:
+            abort(400, "Field '{}' can't be requested for {}".format(field, resource))
+
+        columns.append(expression.label(_sparse_field_label(position)))
+        if join is not None and join not in joined:
+            joined.append(join)
+
+    query = query.with_entities(*(columns + list(extra_columns)))
+    for model in joined:
+        query = query.join(model, joins[model])
+    return query
+
+
+def sparse_field_serializer(fields):
+    """Return a `serializer` (see `app.utils.serialize_results`) for rows from `project_sparse_fields`."""
+    def serialize_sparse_field_rows(rows):
+        return [{field: row[position] for position, field in enumerate(fields)} for row in rows]
+    return serialize_sparse_field_rows
+
+
+def sparse_result_or_404(query, resource, fields):
+    """Serialize `fields` of the single result of `query`, aborting with a 404 if there isn't one."""
+    row = project_sparse_fields(query, resource, fields).first()
+    if row is None:
+        abort(404)
+    return sparse_field_serializer(fields)([row])[0]
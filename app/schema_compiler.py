@@ -0,0 +1,517 @@
+"""
+Compiles JSON schemas into plain Python validation functions.
+
+jsonschema looks up and dispatches on every keyword of every (sub)schema each time an instance is validated. The
+functions built here do that work once per schema instead, so validating a document is just a walk over ready-made
+checks. The errors produced are the same `jsonschema.ValidationError`s - same messages, `validator`,
+`validator_value`, `path`, `schema_path` and `context`, in the same order - as a draft 4 jsonschema validator would
+give, so `translate_json_schema_errors` can't tell the difference.
+
+Only the keywords used by our schemas are supported; `compile_schema` raises `UnsupportedSchema` for anything else
+(including `$ref`s) so that the caller can fall back to jsonschema.
+"""
+import numbers
+import re
+
+from jsonschema import ValidationError, FormatError
+from jsonschema._utils import ensure_list, extras_msg, types_msg, uniq
+
+
+# Keywords which only carry documentation or resolution scope and never produce errors
+IGNORED_KEYWORDS = frozenset(['$schema', 'id', 'title', 'description', 'definitions', 'default',
+                              'exclusiveMinimum', 'exclusiveMaximum'])
+
+TYPE_CHECKS = {
+    'array': lambda instance: isinstance(instance, list),
+    'boolean': lambda instance: isinstance(instance, bool),
+    'integer': lambda instance: isinstance(instance, int) and not isinstance(instance, bool),
+    'null': lambda instance: instance is None,
+    'number': lambda instance: isinstance(instance, numbers.Number) and not isinstance(instance, bool),
+    'object': lambda instance: isinstance(instance, dict),
+    'string': lambda instance: isinstance(instance, str),
+}
+
+_NO_ERRORS = ()
+
+
+class UnsupportedSchema(Exception):
+    pass
+
+
+class CompiledValidator(object):
+    """Drop-in replacement for the parts of the jsonschema validator interface we use"""
+
+    def __init__(self, schema, format_checker=None):
+        self.schema = schema
+        self.format_checker = format_checker
+        self._check = _compile(schema, format_checker)
+
+    def iter_errors(self, instance):
+        return iter(self._check(instance))
+
+    def validate(self, instance):
+        for error in self._check(instance):
+            raise error
+
+    def is_valid(self, instance):
+        return not self._check(instance)
+
+
+def compile_schema(schema, format_checker=None):
+    return CompiledValidator(schema, format_checker=format_checker)
+
+
+def _compile(schema, format_checker):
+    """
+    Return a function which takes an instance and returns a (possibly empty) sequence of errors for `schema`,
+    mirroring `Validator.iter_errors`.
+    """
+    if not isinstance(schema, dict):
+        raise UnsupportedSchema("Schema is not an object: {!r}".format(schema))
+    if '$ref' in schema:
+        raise UnsupportedSchema("$ref is not supported")
+
+    keyword_checks = []
+    for keyword, value in schema.items():
+        if keyword in IGNORED_KEYWORDS:
+            continue
+        compiler = KEYWORD_COMPILERS.get(keyword)
+        if compiler is None:
+            raise UnsupportedSchema("Unsupported keyword {!r}".format(keyword))
+        check = compiler(value, schema, format_checker)
+        if check is not None:
+            keyword_checks.append((keyword, value, check))
+
+    def check_schema(instance):
+        errors = _NO_ERRORS
+        for keyword, value, check in keyword_checks:
+            keyword_errors = check(instance)
+            if keyword_errors:
+                for error in keyword_errors:
+                    error._set(validator=keyword, validator_value=value, instance=instance, schema=schema)
+                    error.schema_path.appendleft(keyword)
+                if errors is _NO_ERRORS:
+                    errors = []
+                errors.extend(keyword_errors)
+        return errors
+
+    return check_schema
+
+
+def _descended(errors, path=None, schema_path=None):
+    for error in errors:
+        if path is not None:
+            error.path.appendleft(path)
+        if schema_path is not None:
+            error.schema_path.appendleft(schema_path)
+    return errors
+
+
+def _compile_type(value, schema, format_checker):
+    types = ensure_list(value)
+    try:
+        checks = [TYPE_CHECKS[type_name] for type_name in types]
+    except (KeyError, TypeError):
+        raise UnsupportedSchema("Unsupported type {!r}".format(value))
+
+    def check(instance):
+        for type_check in checks:
+            if type_check(instance):
+                return _NO_ERRORS
+        return [ValidationError(types_msg(instance, types))]
+    return check
+
+
+def _compile_properties(value, schema, format_checker):
+    property_checks = [(name, _compile(subschema, format_checker)) for name, subschema in value.items()]
+
+    def check(instance):
+        if not isinstance(instance, dict):
+            return _NO_ERRORS
+        errors = _NO_ERRORS
+        for name, property_check in property_checks:
+            if name in instance:
+                property_errors = property_check(instance[name])
+                if property_errors:
+                    if errors is _NO_ERRORS:
+                        errors = []
+                    errors.extend(_descended(property_errors, path=name, schema_path=name))
+        return errors
+    return check
+
+
+def _compile_pattern_properties(value, schema, format_checker):
+    pattern_checks = [
+        (pattern, re.compile(pattern), _compile(subschema, format_checker))
+        for pattern, subschema in value.items()
+    ]
+
+    def check(instance):
+        if not isinstance(instance, dict):
+            return _NO_ERRORS
+        errors = []
+        for pattern, regex, pattern_check in pattern_checks:
+            for name, item in instance.items():
+                if regex.search(name):
+                    errors.extend(_descended(pattern_check(item), path=name, schema_path=pattern))
+        return errors
+    return check
+
+
+def _compile_additional_properties(value, schema, format_checker):
+    properties = schema.get('properties', {})
+    patterns = '|'.join(schema.get('patternProperties', {}))
+    regex = re.compile(patterns) if patterns else None
+
+    def find_additional_properties(instance):
+        for name in instance:
+            if name not in properties:
+                if regex is not None and regex.search(name):
+                    continue
+                yield name
+
+    if isinstance(value, dict):
+        extra_check = _compile(value, format_checker)
+
+        def check(instance):
+            if not isinstance(instance, dict):
+                return _NO_ERRORS
+            errors = []
+            for extra in set(find_additional_properties(instance)):
+                errors.extend(_descended(extra_check(instance[extra]), path=extra))
+            return errors
+        return check
+
+    if not value:
+        def check(instance):
+            if not isinstance(instance, dict):
+                return _NO_ERRORS
+            extras = set(find_additional_properties(instance))
+            if extras:
+                return [ValidationError(
+                    "Additional properties are not allowed (%s %s unexpected)" % extras_msg(extras)
+                )]
+            return _NO_ERRORS
+        return check
+
+    return None
+
+
+def _compile_required(value, schema, format_checker):
+    def check(instance):
+        if not isinstance(instance, dict):
+            return _NO_ERRORS
+        return [ValidationError("%r is a required property" % name) for name in value if name not in instance]
+    return check
+
+
+def _compile_min_properties(value, schema, format_checker):
+    def check(instance):
+        if isinstance(instance, dict) and len(instance) < value:
+            return [ValidationError("%r does not have enough properties" % (instance,))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_max_properties(value, schema, format_checker):
+    def check(instance):
+        if isinstance(instance, dict) and len(instance) > value:
+            return [ValidationError("%r has too many properties" % (instance,))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_dependencies(value, schema, format_checker):
+    dependency_checks = []
+    for name, dependency in value.items():
+        if isinstance(dependency, dict):
+            dependency_checks.append((name, _compile(dependency, format_checker), None))
+        else:
+            dependency_checks.append((name, None, ensure_list(dependency)))
+
+    def check(instance):
+        if not isinstance(instance, dict):
+            return _NO_ERRORS
+        errors = []
+        for name, dependency_check, dependency_names in dependency_checks:
+            if name not in instance:
+                continue
+            if dependency_check is not None:
+                errors.extend(_descended(dependency_check(instance), schema_path=name))
+            else:
+                for dependency_name in dependency_names:
+                    if dependency_name not in instance:
+                        errors.append(ValidationError("%r is a dependency of %r" % (dependency_name, name)))
+        return errors
+    return check
+
+
+def _compile_items(value, schema, format_checker):
+    if isinstance(value, dict):
+        item_check = _compile(value, format_checker)
+
+        def check(instance):
+            if not isinstance(instance, list):
+                return _NO_ERRORS
+            errors = _NO_ERRORS
+            for index, item in enumerate(instance):
+                item_errors = item_check(item)
+                if item_errors:
+                    if errors is _NO_ERRORS:
+                        errors = []
+                    errors.extend(_descended(item_errors, path=index))
+            return errors
+        return check
+
+    item_checks = [_compile(subschema, format_checker) for subschema in value]
+
+    def check(instance):
+        if not isinstance(instance, list):
+            return _NO_ERRORS
+        errors = []
+        for (index, item), item_check in zip(enumerate(instance), item_checks):
+            errors.extend(_descended(item_check(item), path=index, schema_path=index))
+        return errors
+    return check
+
+
+def _compile_additional_items(value, schema, format_checker):
+    if isinstance(schema.get('items', {}), dict):
+        return None
+    len_items = len(schema.get('items', []))
+
+    if isinstance(value, dict):
+        item_check = _compile(value, format_checker)
+
+        def check(instance):
+            if not isinstance(instance, list):
+                return _NO_ERRORS
+            errors = []
+            for index, item in enumerate(instance[len_items:], start=len_items):
+                errors.extend(_descended(item_check(item), path=index))
+            return errors
+        return check
+
+    if not value:
+        def check(instance):
+            if isinstance(instance, list) and len(instance) > len_items:
+                return [ValidationError(
+                    "Additional items are not allowed (%s %s unexpected)" % extras_msg(instance[len_items:])
+                )]
+            return _NO_ERRORS
+        return check
+
+    return None
+
+
+def _compile_min_items(value, schema, format_checker):
+    def check(instance):
+        if isinstance(instance, list) and len(instance) < value:
+            return [ValidationError("%r is too short" % (instance,))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_max_items(value, schema, format_checker):
+    def check(instance):
+        if isinstance(instance, list) and len(instance) > value:
+            return [ValidationError("%r is too long" % (instance,))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_unique_items(value, schema, format_checker):
+    if not value:
+        return None
+
+    def check(instance):
+        if isinstance(instance, list) and not uniq(instance):
+            return [ValidationError("%r has non-unique elements" % (instance,))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_pattern(value, schema, format_checker):
+    regex = re.compile(value)
+
+    def check(instance):
+        if isinstance(instance, str) and not regex.search(instance):
+            return [ValidationError("%r does not match %r" % (instance, value))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_min_length(value, schema, format_checker):
+    def check(instance):
+        if isinstance(instance, str) and len(instance) < value:
+            return [ValidationError("%r is too short" % (instance,))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_max_length(value, schema, format_checker):
+    def check(instance):
+        if isinstance(instance, str) and len(instance) > value:
+            return [ValidationError("%r is too long" % (instance,))]
+        return _NO_ERRORS
+    return check
+
+
+def _is_number(instance):
+    return isinstance(instance, numbers.Number) and not isinstance(instance, bool)
+
+
+def _compile_minimum(value, schema, format_checker):
+    if schema.get('exclusiveMinimum', False):
+        failed, cmp = (lambda instance: instance <= value), 'less than or equal to'
+    else:
+        failed, cmp = (lambda instance: instance < value), 'less than'
+
+    def check(instance):
+        if _is_number(instance) and failed(instance):
+            return [ValidationError("%r is %s the minimum of %r" % (instance, cmp, value))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_maximum(value, schema, format_checker):
+    if schema.get('exclusiveMaximum', False):
+        failed, cmp = (lambda instance: instance >= value), 'greater than or equal to'
+    else:
+        failed, cmp = (lambda instance: instance > value), 'greater than'
+
+    def check(instance):
+        if _is_number(instance) and failed(instance):
+            return [ValidationError("%r is %s the maximum of %r" % (instance, cmp, value))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_multiple_of(value, schema, format_checker):
+    def check(instance):
+        if not _is_number(instance):
+            return _NO_ERRORS
+        if isinstance(value, float):
+            quotient = instance / value
+            failed = int(quotient) != quotient
+        else:
+            failed = instance % value
+        if failed:
+            return [ValidationError("%r is not a multiple of %r" % (instance, value))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_enum(value, schema, format_checker):
+    def check(instance):
+        if instance not in value:
+            return [ValidationError("%r is not one of %r" % (instance, value))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_format(value, schema, format_checker):
+    if format_checker is None:
+        return None
+
+    def check(instance):
+        try:
+            format_checker.check(instance, value)
+        except FormatError as error:
+            return [ValidationError(error.message, cause=error.cause)]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_all_of(value, schema, format_checker):
+    subschema_checks = [_compile(subschema, format_checker) for subschema in value]
+
+    def check(instance):
+        errors = []
+        for index, subschema_check in enumerate(subschema_checks):
+            errors.extend(_descended(subschema_check(instance), schema_path=index))
+        return errors
+    return check
+
+
+def _compile_any_of(value, schema, format_checker):
+    subschema_checks = [_compile(subschema, format_checker) for subschema in value]
+
+    def check(instance):
+        all_errors = []
+        for index, subschema_check in enumerate(subschema_checks):
+            subschema_errors = subschema_check(instance)
+            if not subschema_errors:
+                return _NO_ERRORS
+            all_errors.extend(_descended(subschema_errors, schema_path=index))
+        return [ValidationError(
+            "%r is not valid under any of the given schemas" % (instance,), context=all_errors,
+        )]
+    return check
+
+
+def _compile_one_of(value, schema, format_checker):
+    subschema_checks = [_compile(subschema, format_checker) for subschema in value]
+
+    def check(instance):
+        all_errors = []
+        for index, subschema_check in enumerate(subschema_checks):
+            subschema_errors = subschema_check(instance)
+            if not subschema_errors:
+                first_valid = value[index]
+                break
+            all_errors.extend(_descended(subschema_errors, schema_path=index))
+        else:
+            return [ValidationError(
+                "%r is not valid under any of the given schemas" % (instance,), context=all_errors,
+            )]
+
+        more_valid = [
+            value[other_index] for other_index in range(index + 1, len(value))
+            if not subschema_checks[other_index](instance)
+        ]
+        if more_valid:
+            more_valid.append(first_valid)
+            reprs = ", ".join(repr(subschema) for subschema in more_valid)
+            return [ValidationError("%r is valid under each of %s" % (instance, reprs))]
+        return _NO_ERRORS
+    return check
+
+
+def _compile_not(value, schema, format_checker):
+    not_check = _compile(value, format_checker)
+
+    def check(instance):
+        if not not_check(instance):
+            return [ValidationError("%r is not allowed for %r" % (value, instance))]
+        return _NO_ERRORS
+    return check
+
+
+KEYWORD_COMPILERS = {
+    'additionalItems': _compile_additional_items,
+    'additionalProperties': _compile_additional_properties,
+    'allOf': _compile_all_of,
+    'anyOf': _compile_any_of,
+    'dependencies': _compile_dependencies,
+    'enum': _compile_enum,
+    'format': _compile_format,
+    'items': _compile_items,
+    'maxItems': _compile_max_items,
+    'maxLength': _compile_max_length,
+    'maxProperties': _compile_max_properties,
+    'maximum': _compile_maximum,
+    'minItems': _compile_min_items,
+    'minLength': _compile_min_length,
+    'minProperties': _compile_min_properties,
+    'minimum': _compile_minimum,
+    'multipleOf': _compile_multiple_of,
+    'not': _compile_not,
+    'oneOf': _compile_one_of,
+    'pattern': _compile_pattern,
+    'patternProperties': _compile_pattern_properties,
+    'properties': _compile_properties,
+    'required': _compile_required,
+    'type': _compile_type,
+    'uniqueItems': _compile_unique_items,
+}
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import time
+from collections.abc import Mapping
+
+from jsonschema.validators import validator_for
+
+
+def schema_name_from_path(schema_path):
+    return os.path.splitext(os.path.basename(schema_path))[0]
+
+
+def load_schema(schema_path):
+    """Parse a JSON schema file and check that it is itself a valid schema"""
+    with open(schema_path) as f:
+        schema = json.load(f)
+    validator_for(schema).check_schema(schema)
+    return schema
+
+
+def _source_fingerprint(schema_path):
+    # The file's contents, not its mtime - a checkout or image build rewrites mtimes, which would make every bundle
+    # entry look out of date after a deploy
+    with open(schema_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class SchemaStore(Mapping):
+    """
+    A read-only mapping of schema name to JSON schema which only loads (and checks) a schema the first time it is
+    asked for, rather than parsing every schema file when the module is imported.
+
+    If a bundle written by `write_bundle` is loaded with `use_bundle`, schemas are taken from it without being checked
+    again - as long as their source file hasn't changed since the bundle was written.
+    """
+
+    def __init__(self, schema_paths):
+        self._schema_paths = {schema_name_from_path(path): path for path in schema_paths}
+        self._schemas = {}
+        self.load_seconds = 0.0
+
+    def __getitem__(self, schema_name):
+        if schema_name not in self._schemas:
+            schema_path = self._schema_paths[schema_name]
+            start = time.perf_counter()
+            self._schemas[schema_name] = load_schema(schema_path)
+            self.load_seconds += time.perf_counter() - start
+        return self._schemas[schema_name]
+
+    def __iter__(self):
+        return iter(self._schema_paths)
+
+    def __len__(self):
+        return len(self._schema_paths)
+
+    @property
+    def loaded_count(self):
+        return len(self._schemas)
+
+    def load_all(self):
+        """Load every schema that hasn't been loaded yet. Returns the number of schemas loaded."""
+        not_loaded = [schema_name for schema_name in self if schema_name not in self._schemas]
+        for schema_name in not_loaded:
+            self[schema_name]
+        return len(not_loaded)
+
+    def write_bundle(self, bundle_path):
+        """Check every schema and write them all to a single JSON file which can be loaded with `use_bundle`"""
+        self.load_all()
+        bundle = {
+            schema_name: {
+                'source': _source_fingerprint(self._schema_paths[schema_name]),
+                'schema': self._schemas[schema_name],
+            }
+            for schema_name in self
+        }
+        with open(bundle_path, 'w') as f:
+            json.dump(bundle, f)
+        return len(bundle)
+
+    def use_bundle(self, bundle_path):
+        """
+        Take any schemas that have not already been loaded from a pre-verified bundle. Entries whose source file has
+        been modified since the bundle was written are ignored and will be loaded from the file as usual. Returns the
+        number of schemas taken from the bundle.
+        """
+        start = time.perf_counter()
+        with open(bundle_path) as f:
+            bundle = json.load(f)
+
+        used = 0
+        for schema_name, entry in bundle.items():
+            schema_path = self._schema_paths.get(schema_name)
+            if schema_path is None or schema_name in self._schemas:
+                continue
+            if entry['source'] != _source_fingerprint(schema_path):
+                continue
+            self._schemas[schema_name] = entry['schema']
+            used += 1
+
+        self.load_seconds += time.perf_counter() - start
+        return used
@@ -1,11 +1,12 @@
 from flask import current_app, abort
 from sqlalchemy.exc import IntegrityError, DataError
 
+from .framework_utils import get_framework_by_slug, get_frameworks
 from .utils import get_json_from_request, index_object, json_has_matching_id, json_has_required_keys
 from .validation import get_validation_errors
 from . import search_api_client, dmapiclient
 from . import db
-from .models import ArchivedService, AuditEvent, Framework, Service, Supplier, ValidationError
+from .models import ArchivedService, AuditEvent, Service, Supplier, ValidationError
 
 
 def validate_and_return_service_request(service_id):
@@ -18,9 +19,7 @@ def validate_and_return_service_request(service_id):
 def validate_and_return_lot(json_payload):
     json_has_required_keys(json_payload, ['frameworkSlug', 'lot'])
 
-    framework = Framework.query.filter(
-        Framework.slug == json_payload['frameworkSlug']
-    ).first()
+    framework = get_framework_by_slug(json_payload['frameworkSlug'])
 
     if not framework:
         abort(400, "Framework '{}' does not exist".format(json_payload['frameworkSlug']))
@@ -64,25 +63,30 @@ def update_and_validate_service(service, service_payload):
 
 
 def _get_validator_name(service):
-    if service.framework.slug in ['g-cloud-4', 'g-cloud-5']:
-        return 'services-{}'.format(service.framework.slug)
+    return get_service_validator_name(service.framework.slug, service.lot.slug)
+
+
+def get_service_validator_name(framework_slug, lot_slug):
+    if framework_slug in ['g-cloud-4', 'g-cloud-5']:
+        return 'services-{}'.format(framework_slug)
     else:
-        return 'services-{}-{}'.format(service.framework.slug, service.lot.slug)
+        return 'services-{}-{}'.format(framework_slug, lot_slug)
 
 
-def validate_service_data(service, enforce_required=True, required_fields=None):
+def validate_service_data(service, enforce_required=True, required_fields=None, touched_fields=None):
     errs = get_service_validation_errors(
-        service, enforce_required, required_fields)
+        service, enforce_required, required_fields, touched_fields)
 
     if errs:
         abort(400, errs)
 
 
-def get_service_validation_errors(service, enforce_required=True, required_fields=None):
+def get_service_validation_errors(service, enforce_required=True, required_fields=None, touched_fields=None):
     return get_validation_errors(
         _get_validator_name(service), service.data,
         enforce_required=enforce_required,
-        required_fields=required_fields
+        required_fields=required_fields,
+        touched_fields=touched_fields
     )
 
 
@@ -172,10 +176,13 @@ def create_service_from_draft(draft, status):
 
 
 def filter_services(framework_slugs=None, statuses=None, lot_slug=None, location=None, role=None):
+    # Framework and lot slugs (and live frameworks) are looked up here, from the framework cache - which is checked
+    # against the latest framework change on each request - so the query only compares the services' own indexed ids
     if framework_slugs:
-        services = Service.query.has_frameworks(*framework_slugs)
+        frameworks = [framework for framework in get_frameworks() if framework.slug in framework_slugs]
     else:
-        services = Service.query.framework_is_live()
+        frameworks = [framework for framework in get_frameworks() if framework.status == 'live']
+    services = Service.query.in_frameworks(*(framework.id for framework in frameworks))
 
     if statuses:
         services = services.has_statuses(*statuses)
@@ -197,6 +204,8 @@ def filter_services(framework_slugs=None, statuses=None, lot_slug=None, location
         services = services.data_key_contains_value(location_key, location)
 
     if lot_slug:
-        services = services.in_lot(lot_slug)
+        services = services.in_lots(*{
+            lot.id for framework in frameworks for lot in framework.lots if lot.slug == lot_slug
+        })
 
     return services
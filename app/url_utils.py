@@ -1,5 +1,11 @@
+import re
+from functools import lru_cache
 from urllib.parse import urlsplit, urlunsplit
 
+from flask import current_app, has_request_context, request
+from flask import url_for as base_url_for
+from werkzeug.routing import BuildError
+
 
 def force_relative_url(base_url, url):
     """
@@ -22,3 +28,80 @@ def force_relative_url(base_url, url):
         sanitised_url = sanitised_url[len(base_path):]
 
     return sanitised_url
+
+
+# Link templates are keyed on the URL root as well as the endpoint, so each Host header a request arrives with gets its
+# own templates. The cache is bounded so a stream of made-up hosts can't grow it indefinitely.
+LINK_TEMPLATE_CACHE_SIZE = 1024
+
+# Values that can be put into a template as they are: they're never changed by werkzeug's URL quoting
+_PLAIN_URL_VALUE = re.compile(r'^[A-Za-z0-9_.~-]+$')
+_TEMPLATE_INT = 7301590264837215000
+
+
+def _template_value(position, is_int):
+    return _TEMPLATE_INT + position if is_int else 'dmlinkvalue{}x'.format(position)
+
+
+@lru_cache(maxsize=LINK_TEMPLATE_CACHE_SIZE)
+def _link_template(endpoint, arg_names, int_args, external, url_root):
+    """
+    Build the URL for `endpoint` once with placeholder values and return it as a format string with a positional
+    field for each argument, or None if that can't be done for this endpoint (the placeholders don't each come through
+    exactly once, or a string is passed for an int converter) and `flask.url_for` should be used instead.
+
+    `url_root` isn't used directly - the URL adapter for the current context has the same root - it's part of the
+    cache key so links for one host are never returned for another.
+    """
+    placeholders = [str(_template_value(i, is_int)) for i, is_int in enumerate(int_args)]
+    try:
+        url = base_url_for(
+            endpoint, _external=external,
+            **{name: _template_value(i, is_int) for i, (name, is_int) in enumerate(zip(arg_names, int_args))}
+        )
+    except (BuildError, ValueError):
+        return None
+
+    template = url.replace('{', '{{').replace('}', '}}')
+    for position, placeholder in enumerate(placeholders):
+        if template.count(placeholder) != 1:
+            return None
+        template = template.replace(placeholder, '{%d}' % position)
+    return template
+
+
+def _is_plain_value(value):
+    if isinstance(value, int):
+        return not isinstance(value, bool)
+    return isinstance(value, str) and _PLAIN_URL_VALUE.match(value) is not None
+
+
+def _url_root():
+    if has_request_context():
+        return request.url_root
+    config = current_app.config
+    return '{}://{}{}'.format(config['PREFERRED_URL_SCHEME'], config['SERVER_NAME'], config['APPLICATION_ROOT'] or '')
+
+
+def template_url_for(endpoint, _external=False, **values):
+    """
+    Equivalent to `flask.url_for`, but fills a template cached per endpoint and host in instead of having werkzeug
+    build each URL. Links built for every row of a list response are the main users.
+
+    Only plain values (ints, and strings that don't need quoting) go through templates; anything else, including
+    the `_anchor`, `_method` and `_scheme` arguments, is handed to `flask.url_for`.
+    """
+    if any(name.startswith('_') for name in values) or not all(map(_is_plain_value, values.values())):
+        return base_url_for(endpoint, _external=_external, **values)
+
+    if endpoint.startswith('.') and has_request_context() and request.blueprint is not None:
+        endpoint = request.blueprint + endpoint
+
+    # Keep the order the values were given in, as any that end up in the query string are written in that order
+    arg_names = tuple(values)
+    template = _link_template(
+        endpoint, arg_names, tuple(isinstance(values[name], int) for name in arg_names), _external, _url_root()
+    )
+    if template is None:
+        return base_url_for(endpoint, _external=_external, **values)
+    return template.format(*(values[name] for name in arg_names))
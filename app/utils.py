@@ -1,10 +1,21 @@
+import base64
+import binascii
+import hashlib
+import json
 import random
+from datetime import datetime
+from itertools import chain, islice
 
-from flask import url_for as base_url_for
-from flask import abort, current_app, request, jsonify
+from flask import abort, current_app, request, stream_with_context
 from six import iteritems, string_types
-from werkzeug.exceptions import BadRequest
-
+from sqlalchemy import tuple_, literal
+from sqlalchemy.types import BigInteger, Integer, SmallInteger
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from werkzeug.http import is_resource_modified
+
+from .json_utils import decode, encode, jsonify
+from .url_utils import template_url_for
 from .validation import validate_updater_json_or_400
 from . import search_api_client, dmapiclient
 
@@ -33,9 +44,13 @@ def link(rel, href):
         return {rel: href}
 
 
-def url_for(*args, **kwargs):
-    kwargs.setdefault('_external', True)
-    return base_url_for(*args, **kwargs)
+def url_for(endpoint, **values):
+    """
+    `flask.url_for` for the links in API responses: absolute unless DM_API_RELATIVE_LINKS is set, and filled in from
+    cached link templates (see `app.url_utils.template_url_for`).
+    """
+    values.setdefault('_external', not current_app.config['DM_API_RELATIVE_LINKS'])
+    return template_url_for(endpoint, **values)
 
 
 def get_valid_page_or_1():
@@ -68,6 +83,51 @@ def pagination_links(pagination, endpoint, args):
     return links
 
 
+CURSOR_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+def encode_cursor(values):
+    """Encode the sort key values of the last result on a page as an opaque cursor for the next page"""
+    values = [
+        {'datetime': value.strftime(CURSOR_DATETIME_FORMAT)} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor_value(value, column):
+    # Values have to be of the column's type (and in its range), or Postgres would fail the query with a DataError
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.strptime(value['datetime'], CURSOR_DATETIME_FORMAT)
+    if not isinstance(value, python_type) or (isinstance(value, bool) and python_type is not bool):
+        raise ValueError
+    if isinstance(column.type, Integer) and not isinstance(value, bool):
+        bits = 63 if isinstance(column.type, BigInteger) else 15 if isinstance(column.type, SmallInteger) else 31
+        if not -2 ** bits <= value < 2 ** bits:
+            raise ValueError
+    if isinstance(value, string_types) and '\x00' in value:
+        raise ValueError
+    return value
+
+
+def decode_cursor(cursor, columns):
+    """
+    Decode a cursor made by `encode_cursor` back into values for the sort key `columns`, aborting with a 400 if it's
+    bad - including if a value isn't of its column's type
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [_decode_cursor_value(value, column) for value, column in zip(values, columns)]
+    except (ValueError, TypeError, KeyError, UnicodeError, binascii.Error):
+        abort(400, "Invalid cursor argument")
+
+
 def result_meta(total_count):
     return {"total": total_count}
 
@@ -77,42 +137,216 @@ def single_result_response(result_name, result, serialize_kwargs=None):
     return jsonify(**{result_name: result.serialize(**(serialize_kwargs if serialize_kwargs else {}))})
 
 
-def list_result_response(result_name, results_query, serialize_kwargs=None):
+def resource_etag(*values):
+    """
+    Make a strong ETag for a representation from the `values` it depends on - its id and `updated_at`, say, and
+    anything else in it that can change without `updated_at` changing.
+    """
+    return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+
+def conditional_response(etag, last_modified, make_response):
+    """
+    Return a 304 Not Modified response if the request's If-None-Match (or, without one, If-Modified-Since) header
+    shows the client already has this representation, without calling `make_response` to serialize it. Otherwise
+    return the view response `make_response()` gives. Either way the ETag and Last-Modified headers are set.
+    """
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = current_app.make_response(make_response())
+    else:
+        response = current_app.response_class(status=304)
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def serialize_results(results, serialize_kwargs=None, serializer=None):
+    """
+    Serialize a list of results with their `serialize` method, or with `serializer` - a function taking the whole list
+    and returning the serialized list, for queries that return plain rows (see `app.projections`).
+    """
+    if serializer is not None:
+        return serializer(results)
+    return [result.serialize(**(serialize_kwargs if serialize_kwargs else {})) for result in results]
+
+
+def list_result_response(result_name, results_query, serialize_kwargs=None, serializer=None):
     """
     Return a standardised JSON response for a SQLAlchemy result query e.g. a query that will retrieve closed briefs.
     The query should not be executed before being passed in as a argument. Results will be returned in a list and use
-    the results `serialize` method for presentation.
+    the results `serialize` method (or `serializer`, see `serialize_results`) for presentation.
     """
-    serialized_results = [
-        result.serialize(**(serialize_kwargs if serialize_kwargs else {})) for result in results_query
-    ]
+    serialized_results = serialize_results(list(results_query), serialize_kwargs, serializer)
     meta = result_meta(len(serialized_results))
     return jsonify(meta=meta, **{result_name: serialized_results})
 
 
-def paginated_result_response(result_name, results_query, page, per_page, endpoint, request_args, serialize_kwargs={}):
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+
+def streamed_list_result_response(result_name, results_query, serialize_kwargs=None, serializer=None):
+    """
+    Return the same JSON as `list_result_response`, but fetch the results through a server-side cursor in batches of
+    DM_API_STREAM_BATCH_SIZE and write the response out a batch at a time, so memory use and time to first byte don't
+    grow with the number of results. `meta` comes after the results as the total isn't known until the end.
+
+    The query mustn't eager load any collections with joined loads (see `Query.yield_per`). The first batch is fetched
+    and serialized before the response is returned, so errors in the query itself still get an error response.
+    """
+    batch_size = current_app.config['DM_API_STREAM_BATCH_SIZE']
+    results = iter(results_query.yield_per(batch_size))
+
+    def serialized_batches():
+        batch = list(islice(results, batch_size))
+        while batch:
+            yield serialize_results(batch, serialize_kwargs, serializer)
+            batch = list(islice(results, batch_size)) if len(batch) == batch_size else []
+
+    batches = serialized_batches()
+    first_batch = next(batches, [])
+
+    def generate():
+        yield b'{' + encode(result_name) + b': ['
+        total = 0
+        for batch in chain([first_batch], batches):
+            if batch:
+                yield (b',' if total else b'') + b','.join(encode(result) for result in batch)
+            total += len(batch)
+        yield b'], "meta": ' + encode(result_meta(total)) + b'}'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
+def get_count_mode_or_400(request_args, default='exact'):
+    count = request_args.get('count', default)
+    if count not in COUNT_MODES:
+        abort(400, "Invalid count argument")
+    return count
+
+
+class _ExplainJSON(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` for a statement, compiled (and its parameters processed) like the statement would be"""
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_ExplainJSON)
+def _compile_explain_json(element, compiler, **kw):
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
+def estimate_query_count(query):
+    """Return the query planner's estimate of the number of rows `query` would return, without running it"""
+    plan = query.session.connection().execute(_ExplainJSON(query.order_by(None).statement)).scalar()
+    if isinstance(plan, string_types):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def counted_result_meta(count, results_query):
+    """
+    Result meta for the `count` mode: 'exact' counts the results, 'estimate' asks the query planner instead (and says
+    so in the meta) and 'none' leaves the total out altogether.
+    """
+    if count == 'exact':
+        return result_meta(results_query.order_by(None).count())
+    if count == 'estimate':
+        return dict(result_meta(estimate_query_count(results_query)), totalIsApproximate=True)
+    return {}
+
+
+def paginated_result_response(result_name, results_query, page, per_page, endpoint, request_args, serialize_kwargs={},
+                              cursor_columns=None, cursor_descending=False, serializer=None):
     """
     Return a standardised JSON response for a page of serialized results for a SQLAlchemy result query e.g. the third
     page of results for a query that will retrieve closed briefs. The query should not be executed before being passed
     in as a argument so we can manipulate the query object (i.e. to do the pagination). Results will be returned in a
-    list and use the results `serialize` method for presentation.
+    list and use the results `serialize` method (or `serializer`, see `serialize_results`) for presentation.
+
+    The `count` request argument controls `meta.total`: 'exact' (the default) counts every result, 'estimate' uses
+    the query planner's estimate and 'none' skips the count. Without an exact count there is no `last` link.
+
+    If the endpoint passes `cursor_columns` - the columns the query is ordered by, all in the same direction and
+    ending in a unique one - a `cursor` request argument switches to keyset pagination (see
+    `keyset_paginated_result_response`). An empty `cursor` starts from the beginning.
     """
-    pagination = results_query.paginate(page=page, per_page=per_page)
-    meta = result_meta(pagination.total)
-    serialized_results = [
-        result.serialize(**(serialize_kwargs if serialize_kwargs else {})) for result in pagination.items
-    ]
-    links = pagination_links(pagination, endpoint, request_args)
+    if cursor_columns is not None and request_args.get('cursor') is not None:
+        return keyset_paginated_result_response(
+            result_name, results_query, request_args['cursor'], per_page, endpoint, request_args, serialize_kwargs,
+            cursor_columns, cursor_descending, count=get_count_mode_or_400(request_args, default='none'),
+            serializer=serializer,
+        )
+
+    count = get_count_mode_or_400(request_args)
+    if count == 'exact':
+        pagination = results_query.paginate(page=page, per_page=per_page)
+        meta = result_meta(pagination.total)
+        items = pagination.items
+        links = pagination_links(pagination, endpoint, request_args)
+    else:
+        items, links = _uncounted_page(results_query, page, per_page, endpoint, request_args)
+        meta = counted_result_meta(count, results_query)
+
+    serialized_results = serialize_results(items, serialize_kwargs, serializer)
     return jsonify(meta=meta, links=links, **{result_name: serialized_results})
 
 
+def _uncounted_page(results_query, page, per_page, endpoint, args):
+    """Fetch a page of results (and one more, to tell whether there's a next page) without counting them all"""
+    if page < 1:
+        abort(404)
+    items = results_query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    if page > 1 and not items:
+        abort(404)
+
+    links = {'self': url_for(endpoint, **args)}
+    if page > 1:
+        links['prev'] = url_for(endpoint, **dict(list(args.items()) + [('page', page - 1)]))
+    if len(items) > per_page:
+        links['next'] = url_for(endpoint, **dict(list(args.items()) + [('page', page + 1)]))
+    return items[:per_page], links
+
+
+def keyset_paginated_result_response(result_name, results_query, cursor, per_page, endpoint, request_args,
+                                     serialize_kwargs, cursor_columns, cursor_descending=False, count='none',
+                                     serializer=None):
+    """
+    Return a page of results following on from the row identified by `cursor`, with a `next` link carrying the cursor
+    for the page after. Unlike page numbers this doesn't need an OFFSET (or a count of the whole result set), so deep
+    pages cost the same as the first one. A total is only included if asked for with `count`.
+    """
+    meta = counted_result_meta(count, results_query)
+
+    if cursor:
+        values = decode_cursor(cursor, cursor_columns)
+        key = tuple_(*cursor_columns)
+        after = tuple_(*(literal(value, type_=column.type) for column, value in zip(cursor_columns, values)))
+        results_query = results_query.filter(key < after if cursor_descending else key > after)
+
+    results = results_query.limit(per_page + 1).all()
+    has_next = len(results) > per_page
+    results = results[:per_page]
+
+    links = {'self': url_for(endpoint, **request_args)}
+    if has_next:
+        next_cursor = encode_cursor([getattr(results[-1], column.key) for column in cursor_columns])
+        links['next'] = url_for(endpoint, **dict(list(request_args.items()) + [('cursor', next_cursor)]))
+
+    serialized_results = serialize_results(results, serialize_kwargs, serializer)
+    if meta:
+        return jsonify(meta=meta, links=links, **{result_name: serialized_results})
+    return jsonify(links=links, **{result_name: serialized_results})
+
+
 def get_json_from_request():
     if request.content_type not in ['application/json',
                                     'application/json; charset=UTF-8']:
         abort(400, "Unexpected Content-Type, expecting 'application/json'")
     try:
-        data = request.get_json()
-    except BadRequest:
+        data = decode(request.get_data())
+    except ValueError:
         data = None
     if data is None:
         abort(400, "Invalid JSON; must be a valid JSON object")
@@ -1,8 +1,7 @@
-import json
 import re
-import os
 import copy
 from decimal import Decimal
+from functools import lru_cache
 
 from flask import abort, current_app
 import glob
@@ -11,44 +10,215 @@ from jsonschema.validators import validator_for
 from datetime import datetime
 from dmutils.formats import DATE_FORMAT
 
+from .schema_compiler import compile_schema, UnsupportedSchema
+from .schema_store import SchemaStore
+
 MINIMUM_SERVICE_ID_LENGTH = 10
 MAXIMUM_SERVICE_ID_LENGTH = 20
 
+# Upper bound on the number of ready-built validators kept around in each cache. Each combination of schema, enforce
+# mode and set of required page questions gets its own full validator, so this needs to comfortably cover every page
+# of every schema; cut-down validators are kept for each group of related fields (see `get_incremental_validator`).
+VALIDATOR_CACHE_SIZE = 1024
+
 SCHEMA_PATHS = glob.glob('./json_schemas/*.json')
 FORMAT_CHECKER = FormatChecker()
 
+# Schemas are loaded and checked the first time they are used (see SchemaStore)
+_SCHEMAS = SchemaStore(SCHEMA_PATHS)
 
-def load_schemas(schema_paths):
-    loaded_schemas = {}
-    for schema_path in schema_paths:
-        schema_name = os.path.splitext(os.path.basename(schema_path))[0]
+VALIDATION_ENGINES = ('jsonschema', 'compiled')
+_validation_engine = 'jsonschema'
 
-        with open(schema_path) as f:
-            schema = json.load(f)
-            validator = validator_for(schema)
-            validator.check_schema(schema)
-            loaded_schemas[schema_name] = schema
-    return loaded_schemas
 
-
-_SCHEMAS = load_schemas(SCHEMA_PATHS)
+def set_validation_engine(engine):
+    """
+    Choose how validators are built: 'jsonschema' uses jsonschema's own validators, 'compiled' compiles each schema
+    into plain Python functions (see schema_compiler), falling back to jsonschema for any schema it can't handle.
+    """
+    global _validation_engine
+    if engine not in VALIDATION_ENGINES:
+        raise ValueError("Unknown validation engine {!r}".format(engine))
+    if engine != _validation_engine:
+        _validation_engine = engine
+        _get_cached_validator.cache_clear()
+        _get_cached_field_group_validator.cache_clear()
 
 
 def get_validator(schema_name, enforce_required=True, required_fields=None):
-    if required_fields is None:
-        required_fields = []
+    """
+    Return a validator instance for the named schema. Validators are built once and cached, keyed by the schema name,
+    the enforce mode and the (unordered) set of required fields, since building one - and, when not enforcing required
+    fields, deep-copying the whole schema - is expensive for the larger schemas.
+    """
     if enforce_required:
-        schema = _SCHEMAS[schema_name]
+        # required_fields are ignored when enforcing all of the schema's required fields
+        required_fields = frozenset()
     else:
-        schema = copy.deepcopy(_SCHEMAS[schema_name])
-        schema['required'] = [
-            field for field in schema.get('required', [])
-            if field in required_fields
-        ]
-        schema.pop('anyOf', None)
+        # Only the schema's own required fields change the validator, so other names don't get their own entries
+        required_fields = frozenset(required_fields or []) & frozenset(_SCHEMAS[schema_name].get('required', []))
+    return _get_cached_validator(schema_name, enforce_required, required_fields)
+
+
+def _schema_for(schema_name, enforce_required, required_fields):
+    if enforce_required:
+        return _SCHEMAS[schema_name]
+    schema = copy.deepcopy(_SCHEMAS[schema_name])
+    schema['required'] = [
+        field for field in schema.get('required', [])
+        if field in required_fields
+    ]
+    schema.pop('anyOf', None)
+    return schema
+
+
+def _build_validator(schema):
+    if _validation_engine == 'compiled':
+        try:
+            return compile_schema(schema, format_checker=FORMAT_CHECKER)
+        except UnsupportedSchema:
+            pass
     return validator_for(schema)(schema, format_checker=FORMAT_CHECKER)
 
 
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def _get_cached_validator(schema_name, enforce_required, required_fields):
+    return _build_validator(_schema_for(schema_name, enforce_required, required_fields))
+
+
+class IncrementalValidator(object):
+    """
+    Validates a document with several validators in turn, each seeing only the fields it's for (or, if its fields are
+    None, the whole document). See `get_incremental_validator`.
+    """
+    def __init__(self, parts):
+        self.parts = parts
+
+    def iter_errors(self, instance):
+        for validator, fields in self.parts:
+            if fields is not None:
+                instance_part = {key: value for key, value in instance.items() if key in fields}
+            else:
+                instance_part = instance
+            for error in validator.iter_errors(instance_part):
+                yield error
+
+
+def get_incremental_validator(schema_name, required_fields, touched_fields):
+    """
+    Return a validator for just the parts of the named schema that apply to `touched_fields` (the answers submitted
+    with a page) along with the full set of fields it needs to see. That set also includes any fields tied to the
+    touched ones by a cross-field rule - `dependencies`, top-level `allOf` branches and min/max price pairs - so that
+    validating those fields gives the same errors as validating the whole document with `enforce_required=False`
+    would for them. Required fields are only checked amongst `required_fields`, which count as touched.
+
+    The validator is put together from cached validators for each group of related fields (see `_field_groups`), so
+    the cache only grows with the schemas' structure, not with the sets of fields clients send.
+    """
+    schema = _SCHEMAS[schema_name]
+    field_groups = _field_groups(schema_name)
+    touched_fields = frozenset(touched_fields) | frozenset(required_fields or [])
+    required_fields = frozenset(required_fields or []) & frozenset(schema.get('required', []))
+
+    groups = {field_groups[field] for field in touched_fields if field in field_groups}
+    unknown_fields = touched_fields - set(field_groups)
+    parts = [(_get_cached_field_group_validator(schema_name, group), group) for group in groups]
+    if unknown_fields:
+        parts.append((_get_cached_field_group_validator(schema_name, frozenset()), unknown_fields))
+    if required_fields:
+        parts.append((validator_for(schema)({'required': sorted(required_fields)}), None))
+
+    return IncrementalValidator(parts), touched_fields.union(*groups)
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def _field_groups(schema_name):
+    """
+    Split the named schema's properties into groups that have to be validated together - fields tied by
+    `dependencies`, top-level `allOf` branches or min/max price pairs - as a dict of field name to its group
+    """
+    schema = _SCHEMAS[schema_name]
+    related_groups = [
+        {field} | set(dependency if isinstance(dependency, list) else _schema_property_names(dependency))
+        for field, dependency in schema.get('dependencies', {}).items()
+    ] + [
+        # a branch that doesn't name any fields applies to the whole document
+        _schema_property_names(subschema) or set(schema.get('properties', {}))
+        for subschema in schema.get('allOf', [])
+    ] + [
+        {field} | set(_price_pair(field)) for field in schema.get('properties', {})
+    ]
+    # Merge any groups that overlap, as the rules can chain together
+    groups = []
+    for related in related_groups:
+        overlapping = [group for group in groups if group & related]
+        groups = [group for group in groups if not group & related]
+        groups.append(set(related).union(*overlapping))
+
+    return {field: frozenset(group) for group in groups for field in group}
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def _get_cached_field_group_validator(schema_name, fields):
+    """
+    A validator for the named schema cut down to `fields` (one of its `_field_groups`), without checking required
+    fields. An empty `fields` gives one which only rejects fields the schema doesn't have.
+    """
+    source = _SCHEMAS[schema_name]
+    schema = {
+        key: value for key, value in source.items()
+        # `required` and `anyOf` are left out as they would be without enforce_required, and `minProperties` is only
+        # meaningful for the document as a whole
+        if key not in ('properties', 'required', 'dependencies', 'allOf', 'anyOf', 'minProperties')
+    }
+    properties = source.get('properties', {})
+    schema['properties'] = {field: subschema for field, subschema in properties.items() if field in fields}
+    if 'dependencies' in source:
+        schema['dependencies'] = {
+            field: dependency for field, dependency in source['dependencies'].items() if field in fields
+        }
+    if 'allOf' in source:
+        schema['allOf'] = [
+            subschema for subschema in source['allOf']
+            if (_schema_property_names(subschema) or set(properties)) & fields
+        ]
+
+    return _build_validator(copy.deepcopy(schema))
+
+
+def _schema_property_names(schema):
+    """Top-level property names a (sub)schema refers to, including through combinators"""
+    names = set(schema.get('properties', {})) | set(schema.get('required', []))
+    for field, dependency in schema.get('dependencies', {}).items():
+        names.add(field)
+        names.update(dependency if isinstance(dependency, list) else _schema_property_names(dependency))
+    for keyword in ('allOf', 'anyOf', 'oneOf'):
+        for subschema in schema.get(keyword, []):
+            names.update(_schema_property_names(subschema))
+    if 'not' in schema:
+        names.update(_schema_property_names(schema['not']))
+    return names
+
+
+def _price_pair(field):
+    """The other half of a min/max price question, as compared by `min_price_less_than_max_price`"""
+    for suffix, other_suffix in (('PriceMin', 'PriceMax'), ('PriceMax', 'PriceMin'),
+                                 ('priceMin', 'priceMax'), ('priceMax', 'priceMin')):
+        if field.endswith(suffix):
+            return [field[:-len(suffix)] + other_suffix]
+    return []
+
+
+def warm_validator_cache(schema_names=None):
+    """
+    Build and cache the validators for `schema_names` (all known schemas by default) in both enforce modes. Note that
+    this loads every schema it is given, so with no bundle in use it gives up the saving from loading them lazily.
+    """
+    for schema_name in (_SCHEMAS.keys() if schema_names is None else schema_names):
+        get_validator(schema_name)
+        get_validator(schema_name, enforce_required=False)
+
+
 def validate_updater_json_or_400(submitted_json):
     try:
         get_validator('services-update').validate(submitted_json)
@@ -105,9 +275,18 @@ def validates_against_schema(validator_name, submitted_json):
 
 def get_validation_errors(validator_name, json_data,
                           enforce_required=True,
-                          required_fields=None):
-    validator = get_validator(validator_name, enforce_required,
-                              required_fields)
+                          required_fields=None,
+                          touched_fields=None):
+    """
+    If `touched_fields` is given and required fields aren't being enforced, only those fields (and any related to
+    them, see `get_incremental_validator`) are validated - so saving one page doesn't validate the whole document.
+    """
+    if touched_fields is not None and not enforce_required:
+        validator, fields = get_incremental_validator(validator_name, required_fields, touched_fields)
+        json_data = {key: value for key, value in json_data.items() if key in fields}
+    else:
+        validator = get_validator(validator_name, enforce_required,
+                                  required_fields)
     errors = validator.iter_errors(json_data)
 
     return translate_json_schema_errors(errors, json_data)
@@ -350,7 +529,19 @@ def is_approved_buyer_domain(existing_buyer_domains, new_domain):
     :param new_domain: string
     :return: boolean
     """
-    return any(new_domain == d.domain_name or new_domain.endswith('.' + d.domain_name) for d in existing_buyer_domains)
+    return domain_has_approved_suffix({d.domain_name for d in existing_buyer_domains}, new_domain)
+
+
+def domain_has_approved_suffix(approved_domain_names, domain):
+    """
+    Check a domain is one of, or a subdomain of one of, a set of approved domains, by looking up each of its suffixes
+    in turn (`a.b.gov.uk`, `b.gov.uk`, `gov.uk` then `uk`) rather than comparing it with every approved domain.
+    :param approved_domain_names: set of strings
+    :param domain: string
+    :return: boolean
+    """
+    labels = domain.split('.')
+    return any('.'.join(labels[i:]) in approved_domain_names for i in range(len(labels)))
 
 
 def admin_email_address_has_approved_domain(email_address):
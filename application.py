@@ -2,12 +2,19 @@
 
 from __future__ import print_function
 
+import json
 import os
+import sys
+import time
 
 from dmutils import init_manager
 from flask.ext.migrate import Migrate, MigrateCommand
 
 from app import create_app, db
+from app.draft_utils import validate_drafts_for_framework
+from app.models import Framework, SupplierServiceCount
+from app.schema_store import SchemaStore
+from app.validation import SCHEMA_PATHS
 
 
 application = create_app(os.getenv('DM_ENVIRONMENT') or 'development')
@@ -17,5 +24,60 @@ migrate = Migrate(application, db)
 manager.add_command('db', MigrateCommand)
 
 
+@manager.command
+def bundle_schemas(bundle_path):
+    """Check every JSON schema and write them to a pre-verified bundle (see DM_API_SCHEMA_BUNDLE_PATH)"""
+    count = SchemaStore(SCHEMA_PATHS).write_bundle(bundle_path)
+    print("Wrote {} schemas to {}".format(count, bundle_path))
+
+
+@manager.command
+def schema_load_report(bundle_path=None):
+    """Compare the time taken to load every JSON schema from files and (optionally) from a bundle"""
+    start = time.perf_counter()
+    SchemaStore(SCHEMA_PATHS)
+    print("{:<30} {:.3f}s".format("lazy (nothing loaded)", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    count = SchemaStore(SCHEMA_PATHS).load_all()
+    print("{:<30} {:.3f}s ({} schemas)".format("files, checked", time.perf_counter() - start, count))
+
+    if bundle_path:
+        start = time.perf_counter()
+        count = SchemaStore(SCHEMA_PATHS).use_bundle(bundle_path)
+        print("{:<30} {:.3f}s ({} schemas)".format("pre-verified bundle", time.perf_counter() - start, count))
+
+
+@manager.command
+def validate_framework_drafts(framework_slug, processes=None, batch_size=500, dry_run=False):
+    """
+    Validate every completed draft service on a (closed) framework, marking each one 'submitted' or 'failed', and print
+    a JSON summary of the results
+    """
+    framework = Framework.query.filter(Framework.slug == framework_slug).first()
+    if framework is None:
+        print("No framework with slug '{}'".format(framework_slug), file=sys.stderr)
+        sys.exit(1)
+    if framework.status == 'open':
+        print("Framework '{}' is still open".format(framework_slug), file=sys.stderr)
+        sys.exit(1)
+
+    summary = validate_drafts_for_framework(
+        framework,
+        processes=int(processes) if processes else None,
+        batch_size=int(batch_size),
+        dry_run=dry_run,
+    )
+    print(json.dumps(summary, indent=2, sort_keys=True))
+
+
+@manager.command
+def rebuild_supplier_service_counts():
+    """Recount every supplier's services and draft services by framework and status (see SupplierServiceCount)"""
+    count = SupplierServiceCount.rebuild()
+    db.session.commit()
+    print("Rebuilt {} supplier service counts".format(count))
+
+
 if __name__ == '__main__':
     manager.run()
@@ -29,6 +29,8 @@ class Config:
     DM_API_BRIEF_RESPONSES_PAGE_SIZE = 100
     DM_API_BUYER_DOMAINS_PAGE_SIZE = 100
     DM_API_PROJECTS_PAGE_SIZE = 100
+    # Rows fetched (and written out) at a time by unpaginated list responses, e.g. /services?supplier_id=
+    DM_API_STREAM_BATCH_SIZE = 500
 
     DM_ALLOWED_ADMIN_DOMAINS = ['digital.cabinet-office.gov.uk', 'crowncommercial.gov.uk', 'user.marketplace.team',
                                 'notifications.service.gov.uk']
@@ -40,6 +42,35 @@ class Config:
 
     DM_FAILED_LOGIN_LIMIT = 5
 
+    # Build the JSON schema validators when the app is created rather than on first use (taking the schemas from
+    # DM_API_SCHEMA_BUNDLE_PATH, if it's set, so they aren't checked again)
+    DM_API_WARM_VALIDATOR_CACHE = False
+    # Pre-verified schema bundle written by `application.py bundle_schemas`. Without one, schemas are loaded lazily.
+    DM_API_SCHEMA_BUNDLE_PATH = None
+    # 'jsonschema', or 'compiled' to validate with schemas compiled into Python functions (see app/schema_compiler.py)
+    DM_API_VALIDATION_ENGINE = 'jsonschema'
+    # 'stdlib', or 'orjson' to encode and decode request and response JSON with orjson (if orjson 3.9+ is installed)
+    DM_API_JSON_BACKEND = 'stdlib'
+    # Write JSON columns (service data, declarations) into responses as they're stored, without decoding them
+    DM_API_RAW_JSON_PASSTHROUGH = False
+    # Give the links in responses as paths ('/services/1') rather than absolute URLs
+    DM_API_RELATIVE_LINKS = False
+    # Content-Encodings responses can be compressed with, in order of preference ('br' needs the brotli package)
+    DM_API_COMPRESSION_ENCODINGS = ['gzip']
+    # Responses smaller than this many bytes aren't worth compressing
+    DM_API_COMPRESSION_MIN_SIZE = 1024
+    # zlib compression level (1-9) for gzip responses, and quality (0-11) for brotli responses
+    DM_API_GZIP_LEVEL = 3
+    DM_API_BROTLI_QUALITY = 4
+    # Most seconds each process caches frameworks and lots for; changes made through the API are read again straight
+    # away (see app/framework_utils.py). 0 to always query them
+    DM_API_FRAMEWORK_CACHE_TTL = 60
+    # Most seconds each process caches buyer email domain names for; domains added or removed by any process are read
+    # again straight away (see app/models/buyer_domains.py). 0 to always query them
+    DM_API_BUYER_DOMAINS_CACHE_TTL = 60
+    # Seconds /frameworks/<slug>/stats can be out of date by (see app/framework_utils.py); 0 to always recount them
+    DM_API_FRAMEWORK_STATS_TTL = 60
+
     VCAP_SERVICES = None
 
     DM_FRAMEWORK_TO_ES_INDEX = {
@@ -69,6 +100,10 @@ class Test(Config):
     DM_API_SUPPLIERS_PAGE_SIZE = 5
     DM_API_BRIEFS_PAGE_SIZE = 5
     DM_API_BRIEF_RESPONSES_PAGE_SIZE = 5
+    # Tests change frameworks, buyer email domains and services directly in the database
+    DM_API_FRAMEWORK_CACHE_TTL = 0
+    DM_API_BUYER_DOMAINS_CACHE_TTL = 0
+    DM_API_FRAMEWORK_STATS_TTL = 0
 
     DM_API_PROJECTS_PAGE_SIZE = 5
 
@@ -88,6 +123,7 @@ class Live(Config):
     DEBUG = False
     DM_HTTP_PROTO = 'https'
     DM_LOG_PATH = '/var/log/digitalmarketplace/application.log'
+    DM_API_WARM_VALIDATOR_CACHE = True
 
 
 class Preview(Live):
@@ -0,0 +1,57 @@
+"""Store briefs' applications closed, clarification questions closed and clarification questions published by dates
+
+Revision ID: 1210
+Revises: 1200
+Create Date: 2018-06-04 10:12:31.527841
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from dmutils.dates import get_publishing_dates
+
+
+# revision identifiers, used by Alembic.
+revision = '1210'
+down_revision = '1200'
+
+DEADLINE_COLUMNS = {
+    'applications_closed_at': 'closing_date',
+    'clarification_questions_closed_at': 'questions_close',
+    'clarification_questions_published_by': 'answers_close',
+}
+
+briefs = sa.Table(
+    'briefs',
+    sa.MetaData(),
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('data', postgresql.JSON),
+    sa.Column('published_at', sa.DateTime),
+    *(sa.Column(column, sa.DateTime) for column in DEADLINE_COLUMNS)
+)
+
+
+def upgrade():
+    for column in DEADLINE_COLUMNS:
+        op.add_column('briefs', sa.Column(column, sa.DateTime(), nullable=True))
+        op.create_index(op.f('ix_briefs_{}'.format(column)), 'briefs', [column], unique=False)
+
+    # The dates are worked out in Python (the clarification question deadlines count working days), as the app does
+    conn = op.get_bind()
+    published_briefs = conn.execute(
+        sa.select([briefs.c.id, briefs.c.data, briefs.c.published_at]).where(briefs.c.published_at.isnot(None))
+    ).fetchall()
+    for brief_id, data, published_at in published_briefs:
+        dates = get_publishing_dates({
+            'publishedAt': published_at.replace(hour=23, minute=59, second=59, microsecond=0),
+            'requirementsLength': (data or {}).get('requirementsLength'),
+        })
+        conn.execute(briefs.update().where(briefs.c.id == brief_id).values(**{
+            column: dates[key] for column, key in DEADLINE_COLUMNS.items()
+        }))
+
+
+def downgrade():
+    for column in DEADLINE_COLUMNS:
+        op.drop_index(op.f('ix_briefs_{}'.format(column)), table_name='briefs')
+        op.drop_column('briefs', column)
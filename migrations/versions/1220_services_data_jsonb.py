@@ -0,0 +1,32 @@
+"""Store services' and draft services' data as JSONB, with a GIN index on services' data
+
+Revision ID: 1220
+Revises: 1210
+Create Date: 2018-06-11 14:03:52.114306
+
+"""
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '1220'
+down_revision = '1210'
+
+
+def upgrade():
+    for table in ('services', 'draft_services'):
+        op.alter_column(
+            table, 'data',
+            type_=postgresql.JSONB(), postgresql_using='data::jsonb', existing_nullable=False,
+        )
+    op.create_index('ix_services_data', 'services', ['data'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_services_data', table_name='services')
+    for table in ('services', 'draft_services'):
+        op.alter_column(
+            table, 'data',
+            type_=postgresql.JSON(), postgresql_using='data::json', existing_nullable=False,
+        )
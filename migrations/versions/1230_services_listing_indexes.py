@@ -0,0 +1,39 @@
+"""Indexes for listing (published) services by framework and status, and a supplier's services by name
+
+Revision ID: 1230
+Revises: 1220
+Create Date: 2018-06-18 09:47:05.630127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1230'
+down_revision = '1220'
+
+
+def upgrade():
+    op.create_index(
+        'ix_services_framework_id_status_id', 'services', ['framework_id', 'status', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_services_published_framework_id_id',
+        'services',
+        ['framework_id', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'published'"),
+    )
+    op.create_index(
+        'ix_services_supplier_id_service_name',
+        'services',
+        ['supplier_id', 'framework_id', 'lot_id', sa.text("(data ->> 'serviceName')")],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_services_supplier_id_service_name', table_name='services')
+    op.drop_index('ix_services_published_framework_id_id', table_name='services')
+    op.drop_index('ix_services_framework_id_status_id', table_name='services')
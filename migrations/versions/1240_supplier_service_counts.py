@@ -0,0 +1,83 @@
+"""Count each supplier's services and draft services by framework and status, kept up to date by triggers
+
+Revision ID: 1240
+Revises: 1230
+Create Date: 2018-06-25 11:20:43.918246
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1240'
+down_revision = '1230'
+
+COUNTED_TABLES = ('services', 'draft_services')
+
+
+def upgrade():
+    op.create_table(
+        'supplier_service_counts',
+        sa.Column('supplier_id', sa.BigInteger(), nullable=False),
+        sa.Column('framework_id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['framework_id'], ['frameworks.id'], ),
+        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.supplier_id'], ),
+        sa.PrimaryKeyConstraint('supplier_id', 'framework_id', 'table_name', 'status')
+    )
+
+    # Decrements only update (so a row is never created below 0); increments insert the row if it isn't there yet
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_supplier_services() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE supplier_service_counts SET count = count - 1
+                WHERE supplier_id = OLD.supplier_id AND framework_id = OLD.framework_id
+                    AND table_name = TG_TABLE_NAME AND status = OLD.status;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO supplier_service_counts (supplier_id, framework_id, table_name, status, count)
+                VALUES (NEW.supplier_id, NEW.framework_id, TG_TABLE_NAME, NEW.status, 1)
+                ON CONFLICT (supplier_id, framework_id, table_name, status)
+                DO UPDATE SET count = supplier_service_counts.count + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in COUNTED_TABLES:
+        op.execute("""
+            CREATE TRIGGER {0}_counts AFTER INSERT OR DELETE ON {0}
+            FOR EACH ROW EXECUTE PROCEDURE count_supplier_services()
+        """.format(table))
+        # Most updates only change a service's data, which doesn't need to touch (and lock) the counts
+        op.execute("""
+            CREATE TRIGGER {0}_counts_update AFTER UPDATE OF supplier_id, framework_id, status ON {0}
+            FOR EACH ROW WHEN (
+                OLD.supplier_id IS DISTINCT FROM NEW.supplier_id
+                OR OLD.framework_id IS DISTINCT FROM NEW.framework_id
+                OR OLD.status IS DISTINCT FROM NEW.status
+            )
+            EXECUTE PROCEDURE count_supplier_services()
+        """.format(table))
+
+    op.execute("LOCK TABLE services, draft_services IN SHARE MODE")
+    op.execute("""
+        INSERT INTO supplier_service_counts (supplier_id, framework_id, table_name, status, count)
+        {}
+    """.format(" UNION ALL ".join(
+        "SELECT supplier_id, framework_id, '{0}', status, count(*) FROM {0} "
+        "GROUP BY supplier_id, framework_id, status".format(table)
+        for table in COUNTED_TABLES
+    )))
+
+
+def downgrade():
+    for table in COUNTED_TABLES:
+        op.execute("DROP TRIGGER {0}_counts_update ON {0}".format(table))
+        op.execute("DROP TRIGGER {0}_counts ON {0}".format(table))
+    op.execute("DROP FUNCTION count_supplier_services()")
+    op.drop_table('supplier_service_counts')
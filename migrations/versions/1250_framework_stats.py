@@ -0,0 +1,30 @@
+"""Keep each framework's stats, as last counted, in framework_stats
+
+Revision ID: 1250
+Revises: 1240
+Create Date: 2018-07-02 15:32:08.204719
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '1250'
+down_revision = '1240'
+
+
+def upgrade():
+    op.create_table(
+        'framework_stats',
+        sa.Column('framework_id', sa.Integer(), nullable=False),
+        sa.Column('stats', postgresql.JSONB(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['framework_id'], ['frameworks.id'], ),
+        sa.PrimaryKeyConstraint('framework_id')
+    )
+
+
+def downgrade():
+    op.drop_table('framework_stats')
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Compare the CPU time and bytes saved by each response compression setting
+
+Compresses a saved response (for example the output of /users/export/<framework_slug> or
+/frameworks/<slug>/interest) with each gzip level, and each brotli quality if brotli is installed, and reports the
+compressed size, the time to compress it and the estimated time to transfer it at the given bandwidth.
+
+Usage:
+    benchmark_compression.py <response-file> [--repeat=<n>] [--mbps=<mbps>]
+
+Options:
+    --repeat=<n>    Times to compress the response with each setting [default: 10]
+    --mbps=<mbps>   Bandwidth to the client, in megabits per second [default: 100]
+"""
+from __future__ import print_function
+import gzip
+import timeit
+
+from docopt import docopt
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVELS = (1, 3, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 9, 11)
+
+
+def settings():
+    for level in GZIP_LEVELS:
+        yield 'gzip {}'.format(level), lambda data, level=level: gzip.compress(data, compresslevel=level)
+    if brotli is not None:
+        for quality in BROTLI_QUALITIES:
+            yield 'br {}'.format(quality), lambda data, quality=quality: brotli.compress(data, quality=quality)
+
+
+def transfer_ms(size, mbps):
+    return size * 8 / (mbps * 1000000.0) * 1000
+
+
+def benchmark(data, repeat, mbps):
+    print("{:<10} {:>12} {:>7} {:>14} {:>14} {:>10}".format(
+        'encoding', 'bytes', 'ratio', 'compress ms', 'transfer ms', 'total ms'
+    ))
+    print("{:<10} {:>12} {:>7.2f} {:>14.2f} {:>14.2f} {:>10.2f}".format(
+        'identity', len(data), 1, 0, transfer_ms(len(data), mbps), transfer_ms(len(data), mbps)
+    ))
+    for name, compress in settings():
+        size = len(compress(data))
+        seconds = min(timeit.repeat(lambda: compress(data), number=1, repeat=repeat))
+        print("{:<10} {:>12} {:>7.2f} {:>14.2f} {:>14.2f} {:>10.2f}".format(
+            name, size, len(data) / float(size), seconds * 1000, transfer_ms(size, mbps),
+            seconds * 1000 + transfer_ms(size, mbps),
+        ))
+    if brotli is None:
+        print("(brotli is not installed)")
+
+
+if __name__ == "__main__":
+    arguments = docopt(__doc__)
+
+    with open(arguments['<response-file>'], 'rb') as response_file:
+        benchmark(response_file.read(), int(arguments['--repeat']), float(arguments['--mbps']))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Compare serializing list pages from model instances with serializing them from column projections
+
+Runs each query against the configured database and reports the time per page and the peak memory allocated while
+building the page, for the ORM `serialize()` path and the `app.projections` path. Also checks they give the same JSON.
+
+Usage:
+    benchmark_list_serialization.py [--config=<config>] [--page-size=<n>] [--repeat=<n>]
+
+Options:
+    --config=<config>   App config to use [default: development]
+    --page-size=<n>     Rows per page [default: 100]
+    --repeat=<n>        Times to build each page [default: 20]
+"""
+from __future__ import print_function
+import json
+import sys
+import timeit
+import tracemalloc
+
+from docopt import docopt
+
+from app import create_app, db
+from app.models import Service, Supplier
+from app.projections import project_services, project_suppliers, serialize_service_rows, serialize_supplier_rows
+
+
+def _orm_page(query, page_size):
+    return [result.serialize() for result in query.limit(page_size).all()]
+
+
+def _projected_page(project, serializer):
+    def build_page(query, page_size):
+        return serializer(project(query).limit(page_size).all())
+    return build_page
+
+
+def _measure(build_page, query, page_size, repeat):
+    db.session.expire_all()
+    seconds = min(timeit.repeat(lambda: build_page(query, page_size), number=1, repeat=repeat))
+
+    tracemalloc.start()
+    build_page(query, page_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds, peak
+
+
+def benchmark(name, query, project, serializer, page_size, repeat):
+    orm, projected = _orm_page, _projected_page(project, serializer)
+    if json.dumps(orm(query, page_size), sort_keys=True) != json.dumps(projected(query, page_size), sort_keys=True):
+        print("{}: projected output differs from serialize()".format(name))
+        return False
+
+    for label, build_page in (('serialize()', orm), ('projection', projected)):
+        seconds, peak = _measure(build_page, query, page_size, repeat)
+        print("{:<10} {:<12} {:8.2f}ms/page {:8.1f}KiB peak".format(name, label, seconds * 1000, peak / 1024.0))
+    return True
+
+
+if __name__ == "__main__":
+    arguments = docopt(__doc__)
+    page_size, repeat = int(arguments['--page-size']), int(arguments['--repeat'])
+
+    app = create_app(arguments['--config'])
+    with app.app_context(), app.test_request_context():
+        ok = all([
+            benchmark('services', Service.query.order_by(Service.id),
+                      project_services, serialize_service_rows, page_size, repeat),
+            benchmark('suppliers', Supplier.query.order_by(Supplier.name, Supplier.supplier_id),
+                      project_suppliers, serialize_supplier_rows, page_size, repeat),
+        ])
+    sys.exit(0 if ok else 1)
@@ -864,6 +864,93 @@ class TestAuditEvents(BaseTestAuditEvents):
         assert data['auditEvents'][0]['user'] == '5'
         assert data['auditEvents'][1]['user'] == '6'
 
+    def test_audit_events_can_be_walked_with_a_cursor(self):
+        self.add_audit_events(7)
+
+        response = self.client.get('/audit-events?cursor=')
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert [event['user'] for event in data['auditEvents']] == ['0', '1', '2', '3', '4']
+        assert 'page=' not in data['links']['next']
+        assert 'total' not in data.get('meta', {})
+
+        response = self.client.get(data['links']['next'])
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert [event['user'] for event in data['auditEvents']] == ['5', '6']
+        assert 'next' not in data['links']
+
+    def test_audit_events_can_be_walked_with_a_cursor_latest_first(self):
+        self.add_audit_events(7)
+
+        response = self.client.get('/audit-events?latest_first=true&per_page=4&cursor=')
+        data = json.loads(response.get_data())
+        users = [event['user'] for event in data['auditEvents']]
+        response = self.client.get(data['links']['next'])
+        users += [event['user'] for event in json.loads(response.get_data())['auditEvents']]
+
+        assert users == ['6', '5', '4', '3', '2', '1', '0']
+
+    def test_audit_events_cursor_pages_can_include_a_total(self):
+        self.add_audit_events(7)
+
+        response = self.client.get('/audit-events?cursor=&count=exact')
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert data['meta'] == {'total': 7}
+
+    def test_audit_events_without_a_count(self):
+        self.add_audit_events(7)
+
+        response = self.client.get('/audit-events?count=none')
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert data['meta'] == {}
+        assert len(data['auditEvents']) == 5
+        assert 'page=2' in data['links']['next']
+        assert 'last' not in data['links']
+
+        response = self.client.get('/audit-events?count=none&page=2')
+        data = json.loads(response.get_data())
+
+        assert [event['user'] for event in data['auditEvents']] == ['5', '6']
+        assert 'page=1' in data['links']['prev']
+        assert 'next' not in data['links']
+
+    def test_audit_events_with_an_estimated_count(self):
+        self.add_audit_events(7)
+
+        response = self.client.get('/audit-events?count=estimate')
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert data['meta']['totalIsApproximate'] is True
+        assert isinstance(data['meta']['total'], int)
+        assert len(data['auditEvents']) == 5
+
+    def test_uncounted_page_out_of_range_is_404(self):
+        self.add_audit_events(7)
+
+        response = self.client.get('/audit-events?count=none&page=3')
+
+        assert response.status_code == 404
+
+    def test_should_reject_invalid_count(self):
+        self.add_audit_event()
+        response = self.client.get('/audit-events?count=lots')
+
+        assert response.status_code == 400
+
+    def test_should_reject_invalid_cursor(self):
+        self.add_audit_event()
+        response = self.client.get('/audit-events?cursor=not-a-cursor')
+
+        assert response.status_code == 400
+
     def test_paginated_audit_with_custom_page_size(self):
         self.add_audit_events(12)
         response = self.client.get('/audit-events?per_page=10')
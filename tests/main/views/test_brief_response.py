@@ -678,6 +678,18 @@ class TestGetBriefResponse(BaseBriefResponseTest):
 
         assert res.status_code == 404
 
+    def test_get_brief_response_with_fields(self):
+        brief_response_id = self.setup_dummy_brief_response()
+
+        res = self.client.get('/brief-responses/{}?fields=briefId,status,supplierName'.format(brief_response_id))
+
+        assert res.status_code == 200
+        assert json.loads(res.get_data(as_text=True)) == {
+            'briefResponses': {
+                'id': brief_response_id, 'briefId': self.brief_id, 'status': 'submitted', 'supplierName': 'Supplier 0',
+            },
+        }
+
 
 class TestListBriefResponses(BaseBriefResponseTest):
     def test_list_empty_brief_responses(self):
@@ -884,3 +896,15 @@ class TestListBriefResponses(BaseBriefResponseTest):
         assert res.status_code == 200
         assert len(data['briefResponses']) == 1
         assert data['briefResponses'][0]['awardedAt'] == yesterday.strftime(DATETIME_FORMAT)
+
+    @pytest.mark.parametrize('parameters', ({}, {'supplier_id': 0}))
+    def test_list_brief_responses_with_fields(self, parameters):
+        brief_response_ids = [self.setup_dummy_brief_response() for i in range(2)]
+
+        res = self.list_brief_responses(fields='status,submittedAt', **parameters)
+
+        assert res.status_code == 200
+        assert json.loads(res.get_data(as_text=True))['briefResponses'] == [
+            {'id': brief_response_id, 'status': 'submitted', 'submittedAt': '2016-01-02T00:00:00.000000Z'}
+            for brief_response_id in brief_response_ids
+        ]
@@ -10,7 +10,7 @@ from tests.bases import BaseApplicationTest
 
 from dmapiclient.audit import AuditTypes
 from app import db
-from app.models import Framework, BriefResponse, Brief, Lot
+from app.models import Framework, BriefClarificationQuestion, BriefResponse, Brief, Lot
 
 
 class FrameworkSetupAndTeardown(BaseApplicationTest, FixtureMixin):
@@ -471,6 +471,64 @@ class TestGetBrief(FrameworkSetupAndTeardown):
 
         assert res.status_code == 404
 
+    def test_get_brief_with_fields(self):
+        self.setup_dummy_briefs(1, title="I need a Developer", status='live')
+
+        res = self.client.get('/briefs/1?fields=title,status,lotSlug,applicationsClosedAt')
+
+        assert res.status_code == 200
+        assert json.loads(res.get_data(as_text=True)) == {
+            'briefs': {
+                'id': 1,
+                'title': 'I need a Developer',
+                'status': 'live',
+                'lotSlug': 'digital-specialists',
+                'applicationsClosedAt': mock.ANY,
+            },
+        }
+
+    def test_not_modified_if_etag_matches(self):
+        self.setup_dummy_briefs(1, status='live')
+        etag = self.client.get('/briefs/1').headers['ETag']
+
+        res = self.client.get('/briefs/1', headers={'If-None-Match': etag})
+
+        assert res.status_code == 304
+        assert res.get_data() == b''
+
+    def test_etag_changes_when_the_brief_closes(self):
+        self.setup_dummy_briefs(1, status='live')
+        etag = self.client.get('/briefs/1').headers['ETag']
+
+        with freeze_time(datetime.utcnow() + timedelta(days=20)):
+            res = self.client.get('/briefs/1', headers={'If-None-Match': etag})
+
+        assert res.status_code == 200
+        assert json.loads(res.get_data(as_text=True))['briefs']['status'] == 'closed'
+
+    def test_etag_changes_when_a_clarification_question_is_added(self):
+        self.setup_dummy_briefs(1, status='live')
+        etag = self.client.get('/briefs/1').headers['ETag']
+        db.session.add(BriefClarificationQuestion(brief=Brief.query.get(1), question="Why?", answer="Because"))
+        db.session.commit()
+
+        res = self.client.get('/briefs/1', headers={'If-None-Match': etag})
+
+        assert res.status_code == 200
+        assert len(json.loads(res.get_data(as_text=True))['briefs']['clarificationQuestions']) == 1
+
+    def test_get_brief_deadlines_with_fields(self):
+        self.setup_dummy_briefs(1, status='live')
+        deadlines = ['applicationsClosedAt', 'clarificationQuestionsClosedAt', 'clarificationQuestionsPublishedBy']
+        brief = json.loads(self.client.get('/briefs/1').get_data(as_text=True))['briefs']
+
+        res = self.client.get('/briefs/1?fields={}'.format(','.join(deadlines)))
+
+        assert res.status_code == 200
+        assert json.loads(res.get_data(as_text=True))['briefs'] == dict(
+            {'id': 1}, **{deadline: brief[deadline] for deadline in deadlines}
+        )
+
 
 class TestListBrief(FrameworkSetupAndTeardown):
     def test_list_briefs(self):
@@ -501,6 +559,19 @@ class TestListBrief(FrameworkSetupAndTeardown):
         assert res.status_code == 200
         assert len(data['briefs']) == 3
 
+    def test_list_briefs_by_user_streams_briefs_in_batches(self):
+        self.setup_dummy_briefs(5, user_id=1)
+        self.app.config['DM_API_STREAM_BATCH_SIZE'] = 2
+
+        res = self.client.get('/briefs?user_id=1&with_users=true', buffered=True)
+        data = json.loads(res.get_data(as_text=True))
+
+        assert res.status_code == 200
+        assert res.is_streamed
+        assert [brief['id'] for brief in data['briefs']] == [1, 2, 3, 4, 5]
+        assert all(brief['users'][0]['id'] == 1 for brief in data['briefs'])
+        assert data['meta'] == {'total': 5}
+
     def test_list_briefs_by_status(self):
         self.setup_dummy_briefs(3, status='live')
         self.setup_dummy_briefs(2, status='draft', brief_start=4)
@@ -986,6 +1057,34 @@ class TestUpdateBriefStatus(FrameworkSetupAndTeardown):
             'briefStatus': new_status,
         }
 
+    def test_list_briefs_with_fields(self):
+        self.setup_dummy_briefs(2, title="I need a Developer", status='draft')
+
+        res = self.client.get('/briefs?fields=title,status,publishedAt')
+        data = json.loads(res.get_data(as_text=True))
+
+        assert res.status_code == 200
+        assert data['briefs'] == [
+            {'id': 1, 'title': 'I need a Developer', 'status': 'draft', 'publishedAt': None},
+            {'id': 2, 'title': 'I need a Developer', 'status': 'draft', 'publishedAt': None},
+        ]
+
+    def test_list_briefs_by_user_with_fields(self):
+        self.setup_dummy_briefs(2, user_id=1)
+
+        res = self.client.get('/briefs?user_id=1&fields=frameworkSlug')
+
+        assert res.status_code == 200
+        assert json.loads(res.get_data(as_text=True))['briefs'] == [
+            {'id': 1, 'frameworkSlug': 'digital-outcomes-and-specialists'},
+            {'id': 2, 'frameworkSlug': 'digital-outcomes-and-specialists'},
+        ]
+
+    def test_list_briefs_with_fields_that_cant_be_selected(self):
+        res = self.client.get('/briefs?fields=users')
+
+        assert res.status_code == 400
+
 
 class TestDeleteBrief(FrameworkSetupAndTeardown):
     def test_can_delete_a_draft_brief(self):
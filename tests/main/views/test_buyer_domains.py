@@ -5,6 +5,9 @@ import pytest
 from tests.bases import BaseApplicationTest
 from app import db
 from app.models import BuyerEmailDomain, AuditEvent
+from app.models.buyer_domains import (
+    approved_buyer_domain_names, invalidate_buyer_domain_cache, is_approved_buyer_email_address
+)
 
 
 class TestCreateBuyerEmailDomain(BaseApplicationTest):
@@ -152,6 +155,46 @@ class TestCreateBuyerEmailDomain(BaseApplicationTest):
         assert res.status_code == 409
         assert data['error'] == "Domain name {} has already been approved".format(new_domain)
 
+    def test_created_buyer_email_domain_is_approved_straight_away_when_domains_are_cached(self):
+        self.app.config['DM_API_BUYER_DOMAINS_CACHE_TTL'] = 60
+        try:
+            assert not is_approved_buyer_email_address('someone@example.com')
+
+            res = self.client.post(
+                '/buyer-email-domains',
+                data=json.dumps({
+                    'buyerEmailDomains': {'domainName': "example.com"},
+                    'updated_by': 'example user'
+                }),
+                content_type='application/json'
+            )
+            assert res.status_code == 201
+
+            assert is_approved_buyer_email_address('someone@example.com')
+            res = self.client.get('/users/check-buyer-email?email_address=someone@example.com')
+            assert json.loads(res.get_data(as_text=True)) == {'valid': True}
+        finally:
+            invalidate_buyer_domain_cache()
+
+    def test_create_buyer_email_domain_checks_domains_added_since_they_were_cached(self):
+        self.app.config['DM_API_BUYER_DOMAINS_CACHE_TTL'] = 60
+        try:
+            approved_buyer_domain_names()
+            db.session.add(BuyerEmailDomain(domain_name='example.com'))
+            db.session.commit()
+
+            res = self.client.post(
+                '/buyer-email-domains',
+                data=json.dumps({
+                    'buyerEmailDomains': {'domainName': "sub.example.com"},
+                    'updated_by': 'example user'
+                }),
+                content_type='application/json'
+            )
+            assert res.status_code == 409
+        finally:
+            invalidate_buyer_domain_cache()
+
 
 class TestListBuyerEmailDomains(BaseApplicationTest):
     def setup(self):
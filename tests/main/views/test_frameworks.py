@@ -7,7 +7,7 @@ import pytest
 from sqlalchemy.exc import IntegrityError
 
 from tests.bases import BaseApplicationTest, JSONUpdateTestMixin
-from app.models import db, Framework, SupplierFramework, DraftService, User, FrameworkLot
+from app.models import db, Framework, FrameworkStats, SupplierFramework, DraftService, User, FrameworkLot
 from app.models.main import ContactInformation, Supplier
 from tests.helpers import FixtureMixin
 
@@ -251,6 +251,22 @@ class TestGetFramework(BaseApplicationTest):
 
         assert response.status_code == 404
 
+    def test_a_single_framework_has_validators(self):
+        response = self.client.get('/frameworks/g-cloud-7')
+
+        assert response.status_code == 200
+        assert response.headers['ETag']
+        assert response.headers['Cache-Control'] == 'no-cache'
+
+    def test_not_modified_if_etag_matches(self):
+        etag = self.client.get('/frameworks/g-cloud-7').headers['ETag']
+
+        response = self.client.get('/frameworks/g-cloud-7', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.get_data() == b''
+        assert response.headers['ETag'] == etag
+
 
 class TestUpdateFramework(BaseApplicationTest, JSONUpdateTestMixin, FixtureMixin):
     endpoint = '/frameworks/example'
@@ -472,6 +488,15 @@ class TestUpdateFramework(BaseApplicationTest, JSONUpdateTestMixin, FixtureMixin
             assert response.status_code == 400
             assert "Could not commit" in json.loads(response.get_data())["error"]
 
+    def test_update_changes_the_framework_etag(self, open_example_framework):
+        etag = self.client.get('/frameworks/example-framework').headers['ETag']
+
+        assert self.post_framework_update({'status': 'pending'}).status_code == 200
+
+        response = self.client.get('/frameworks/example-framework', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
 
 class TestUpdateFrameworkPending(BaseApplicationTest):
     EXPECTED_FRAMEWORK_DECLARATION_SUPPLIER_INFO = {
@@ -717,7 +742,9 @@ class TestFrameworkStats(BaseApplicationTest, FixtureMixin):
         self.setup_framework_data('digital-outcomes-and-specialists')
 
         response = self.client.get('/frameworks/g-cloud-7/stats')
-        assert json.loads(response.get_data()) == {
+        data = json.loads(response.get_data())
+        assert data.pop('refreshed_at')
+        assert data == {
             u'services': [
                 {u'count': 1, u'status': u'not-submitted',
                  u'declaration_made': False, u'lot': u'iaas'},
@@ -769,7 +796,9 @@ class TestFrameworkStats(BaseApplicationTest, FixtureMixin):
     def test_stats_are_for_g_cloud_7_only(self):
         self.setup_data('g-cloud-6')
         response = self.client.get('/frameworks/g-cloud-7/stats')
-        assert json.loads(response.get_data()) == {
+        data = json.loads(response.get_data())
+        assert data.pop('refreshed_at')
+        assert data == {
             u'interested_suppliers': [],
             u'services': [],
             u'supplier_users': [
@@ -797,6 +826,33 @@ class TestFrameworkStats(BaseApplicationTest, FixtureMixin):
 
         assert response.status_code == 200
 
+    def test_stats_are_counted_at_most_once_per_ttl(self):
+        self.app.config['DM_API_FRAMEWORK_STATS_TTL'] = 60
+        self.setup_data('g-cloud-7')
+        framework = Framework.query.filter(Framework.slug == 'g-cloud-7').first()
+
+        first = json.loads(self.client.get('/frameworks/g-cloud-7/stats').get_data())
+        self.create_drafts(framework.id, [(1, 1)])
+        second = json.loads(self.client.get('/frameworks/g-cloud-7/stats').get_data())
+
+        assert second == first
+        assert FrameworkStats.query.get(framework.id).stats['services'] == first['services']
+
+    def test_stale_stats_are_recounted(self):
+        self.app.config['DM_API_FRAMEWORK_STATS_TTL'] = 60
+        self.setup_data('g-cloud-7')
+        framework = Framework.query.filter(Framework.slug == 'g-cloud-7').first()
+
+        with freeze_time('2018-07-02 10:00:00'):
+            first = json.loads(self.client.get('/frameworks/g-cloud-7/stats').get_data())
+        self.create_drafts(framework.id, [(1, 1)])
+        with freeze_time('2018-07-02 10:01:01'):
+            second = json.loads(self.client.get('/frameworks/g-cloud-7/stats').get_data())
+
+        assert first['refreshed_at'] == '2018-07-02T10:00:00.000000Z'
+        assert second['refreshed_at'] == '2018-07-02T10:01:01.000000Z'
+        assert sum(row['count'] for row in second['services']) == sum(row['count'] for row in first['services']) + 1
+
 
 class TestGetFrameworkSuppliers(BaseApplicationTest, FixtureMixin):
     def setup(self):
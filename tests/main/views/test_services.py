@@ -7,6 +7,7 @@ from app.models import Service, Supplier, ContactInformation, Framework, \
 import mock
 import pytest
 from app import db, create_app
+from app.utils import encode_cursor
 from tests.helpers import TEST_SUPPLIERS_COUNT, FixtureMixin, load_example_listing
 from tests.bases import BaseApplicationTest, JSONUpdateTestMixin, WSGIApplicationWithEnvironment
 from sqlalchemy.exc import IntegrityError
@@ -296,6 +297,33 @@ class TestListServices(BaseApplicationTest, FixtureMixin):
         prev_link = data['links']['prev']
         assert 'page=1' in prev_link
 
+    def test_list_services_can_be_walked_with_a_cursor(self):
+        self.setup_dummy_services_including_unpublished(7)
+
+        response = self.client.get('/services?cursor=')
+        data = json.loads(response.get_data())
+        first_page_ids = [service['id'] for service in data['services']]
+
+        assert response.status_code == 200
+        assert len(first_page_ids) == 5
+        assert 'cursor=' in data['links']['next']
+
+        response = self.client.get(data['links']['next'])
+        data = json.loads(response.get_data())
+        second_page_ids = [service['id'] for service in data['services']]
+
+        assert response.status_code == 200
+        assert len(second_page_ids) == 4
+        assert len(set(first_page_ids + second_page_ids)) == 9
+        assert 'next' not in data['links']
+
+    @pytest.mark.parametrize('values', (['x'], [['x']], [{'datetime': '2017-01-02T03:04:05.000006'}], [2 ** 31]))
+    def test_list_services_cursor_of_the_wrong_type_is_rejected(self, values):
+        response = self.client.get('/services', query_string={'cursor': encode_cursor(values)})
+
+        assert response.status_code == 400
+        assert json.loads(response.get_data())['error'] == 'Invalid cursor argument'
+
     def test_paginated_list_services_page_out_of_range(self):
         self.setup_dummy_services_including_unpublished(10)
 
@@ -357,6 +385,19 @@ class TestListServices(BaseApplicationTest, FixtureMixin):
         assert response.status_code == 200
         assert list(filter(lambda s: s['supplierId'] == 1, data['services'])) == data['services']
 
+    def test_supplier_id_filter_streams_services_in_batches(self):
+        self.setup_dummy_services_including_unpublished(21)
+        self.app.config['DM_API_STREAM_BATCH_SIZE'] = 2
+
+        response = self.client.get('/services?supplier_id=1', buffered=True)
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert len(data['services']) == 7
+        assert len(set(service['id'] for service in data['services'])) == 7
+        assert data['meta'] == {'total': 7}
+
     def test_supplier_id_with_no_services_filter(self):
         self.setup_dummy_services_including_unpublished(15)
 
@@ -408,6 +449,18 @@ class TestListServices(BaseApplicationTest, FixtureMixin):
         assert response.status_code == 200
         assert len(data['services']) == 2
 
+    def test_estimated_count_of_services_filtered_by_location_and_role(self):
+        self.setup_services()
+        response = self.client.get(
+            '/services?lot=digital-specialists&location=London&role=agileCoach&count=estimate'
+        )
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert data['meta']['totalIsApproximate'] is True
+        assert isinstance(data['meta']['total'], int)
+        assert len(data['services']) == 1
+
     def test_cannot_filter_services_by_location_without_lot(self):
         self.setup_services()
         response = self.client.get('/services?location=Wales')
@@ -429,6 +482,54 @@ class TestListServices(BaseApplicationTest, FixtureMixin):
         assert response.status_code == 400
         assert data['error'] == 'Role must be specified for Digital Specialists'
 
+    def test_list_services_with_fields(self):
+        self.setup_services()
+
+        response = self.client.get('/services?fields=lotSlug,status,agileCoachLocations,supplierName')
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert data['services'] == [
+            {
+                'id': '10000000001', 'lotSlug': 'digital-outcomes', 'status': 'published',
+                'agileCoachLocations': None, 'supplierName': 'Supplier 0',
+            },
+            {
+                'id': '10000000002', 'lotSlug': 'digital-specialists', 'status': 'published',
+                'agileCoachLocations': ["London", "Offsite", "Scotland", "Wales"], 'supplierName': 'Supplier 0',
+            },
+            {
+                'id': '10000000003', 'lotSlug': 'digital-specialists', 'status': 'published',
+                'agileCoachLocations': ["Wales"], 'supplierName': 'Supplier 0',
+            },
+        ]
+        assert data['meta'] == {'total': 3}
+
+    def test_list_services_with_fields_by_supplier(self):
+        self.setup_services()
+
+        response = self.client.get('/services?supplier_id=0&fields=createdAt')
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert [set(service) for service in data['services']] == [{'id', 'createdAt'}] * 3
+
+    def test_list_services_with_fields_and_cursor(self):
+        self.setup_services()
+
+        response = self.client.get('/services?fields=status&cursor=')
+
+        assert response.status_code == 200
+        assert [service['id'] for service in json.loads(response.get_data())['services']] == [
+            '10000000001', '10000000002', '10000000003',
+        ]
+
+    @pytest.mark.parametrize('fields', ('links', 'service name', 'data->>1'))
+    def test_list_services_with_invalid_fields(self, fields):
+        response = self.client.get('/services', query_string={'fields': fields})
+
+        assert response.status_code == 400
+
 
 class TestPostService(BaseApplicationTest, JSONUpdateTestMixin, FixtureMixin):
     endpoint = '/services/{self.service_id}'
@@ -1625,6 +1726,54 @@ class TestGetService(BaseApplicationTest):
         assert 'createdAt' in data['serviceMadeUnavailableAuditEvent']
         assert data['serviceMadeUnavailableAuditEvent']['data']['update']['status'] == 'expired'
 
+    def test_get_service_with_fields(self):
+        response = self.client.get('/services/123-published-456?fields=foo,frameworkSlug,updatedAt')
+
+        assert response.status_code == 200
+        assert json.loads(response.get_data()) == {
+            'services': {
+                'id': '123-published-456',
+                'foo': 'bar',
+                'frameworkSlug': Framework.query.get(1).slug,
+                'updatedAt': mock.ANY,
+            },
+        }
+
+    def test_get_missing_service_with_fields(self):
+        response = self.client.get('/services/1234567890123456?fields=foo')
+
+        assert response.status_code == 404
+
+    def test_not_modified_if_etag_matches(self):
+        response = self.client.get('/services/123-published-456')
+        etag = response.headers['ETag']
+
+        assert response.headers['Last-Modified']
+        response = self.client.get('/services/123-published-456', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.get_data() == b''
+
+    def test_etag_changes_when_the_service_is_updated(self):
+        etag = self.client.get('/services/123-published-456').headers['ETag']
+        service = Service.query.filter(Service.service_id == '123-published-456').one()
+        service.status = 'enabled'
+        db.session.commit()
+
+        response = self.client.get('/services/123-published-456', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert json.loads(response.get_data())['services']['status'] == 'enabled'
+
+    def test_etag_changes_when_the_supplier_is_renamed(self):
+        etag = self.client.get('/services/123-published-456').headers['ETag']
+        Supplier.query.filter(Supplier.supplier_id == 1).update({'name': 'Supplier One'})
+        db.session.commit()
+
+        response = self.client.get('/services/123-published-456', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert json.loads(response.get_data())['services']['supplierName'] == 'Supplier One'
+
 
 class TestRevertServiceBase(BaseApplicationTest, FixtureMixin):
 
@@ -5,6 +5,7 @@ from freezegun import freeze_time
 import pytest
 
 from app import db
+from app.utils import encode_cursor
 from app.models import Supplier, ContactInformation, AuditEvent, \
     SupplierFramework, Framework, FrameworkAgreement, DraftService, Service
 from tests.bases import BaseApplicationTest, JSONTestMixin, JSONUpdateTestMixin
@@ -64,6 +65,23 @@ class TestGetSupplier(BaseApplicationTest, FixtureMixin):
             u'G-Cloud 6': 5
         }
 
+    def test_get_supplier_with_fields(self):
+        response = self.client.get('/suppliers/{}?fields=name,dunsNumber'.format(self.supplier_id))
+
+        assert response.status_code == 200
+        assert json.loads(response.get_data()) == {
+            'suppliers': {
+                'id': self.supplier_id,
+                'name': self.supplier['name'],
+                'dunsNumber': self.supplier['dunsNumber'],
+            },
+        }
+
+    def test_get_supplier_with_fields_that_arent_columns(self):
+        response = self.client.get('/suppliers/{}?fields=contactInformation'.format(self.supplier_id))
+
+        assert response.status_code == 400
+
 
 class TestListSuppliers(BaseApplicationTest, FixtureMixin):
     def setup(self):
@@ -142,6 +160,22 @@ class TestListSuppliers(BaseApplicationTest, FixtureMixin):
 
         assert response.status_code == 404
 
+    @pytest.mark.parametrize('cursor', ({}, {'cursor': ''}))
+    def test_list_suppliers_with_fields(self, cursor):
+        response = self.client.get('/suppliers', query_string=dict(cursor, fields='name'))
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 200
+        assert data['suppliers'][:2] == [{'id': 0, 'name': 'Supplier 0'}, {'id': 1, 'name': 'Supplier 1'}]
+
+    @pytest.mark.parametrize('values', ([1, 1], ['Supplier 1', 'x'], ['Supplier 1', 2 ** 64]))
+    def test_cursor_with_values_of_the_wrong_type_is_rejected(self, values):
+        response = self.client.get('/suppliers', query_string={'cursor': encode_cursor(values)})
+        data = json.loads(response.get_data())
+
+        assert response.status_code == 400
+        assert data['error'] == 'Invalid cursor argument'
+
 
 class TestListSuppliersOnFramework(BaseApplicationTest, FixtureMixin):
 
@@ -864,6 +898,24 @@ class TestSetSupplierDeclarations(BaseApplicationTest, FixtureMixin, JSONUpdateT
             .find_by_supplier_and_framework(0, 'test-open').first()
         assert supplier_framework.declaration['question'] == 'answer2'
 
+    @pytest.mark.parametrize('raw_json_passthrough', (False, True))
+    def test_declarations_are_returned_with_or_without_raw_json_passthrough(self, raw_json_passthrough):
+        self.app.config['DM_API_RAW_JSON_PASSTHROUGH'] = raw_json_passthrough
+        declaration = {'status': 'complete', 'nested': {'question': [u'answ\u00e9r', 2]}}
+        db.session.add(SupplierFramework(supplier_id=0, framework_id=100, declaration=declaration))
+        db.session.add(SupplierFramework(supplier_id=0, framework_id=1, declaration=None))
+        db.session.commit()
+
+        single = json.loads(self.client.get('/suppliers/0/frameworks/test-open').get_data(as_text=True))
+        per_supplier = json.loads(self.client.get('/suppliers/0/frameworks').get_data(as_text=True))
+        per_framework = json.loads(self.client.get('/frameworks/test-open/suppliers').get_data(as_text=True))
+
+        assert single['frameworkInterest']['declaration'] == declaration
+        assert {
+            interest['frameworkSlug']: interest['declaration'] for interest in per_supplier['frameworkInterest']
+        } == {'test-open': declaration, Framework.query.get(1).slug: None}
+        assert per_framework['supplierFrameworks'][0]['declaration'] == declaration
+
 
 class TestPostSupplier(BaseApplicationTest, JSONTestMixin):
     method = "post"
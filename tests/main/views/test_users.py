@@ -1252,6 +1252,39 @@ class TestUsersGet(BaseUserTest, FixtureMixin):
         assert response.status_code == 400
         assert "Invalid user role: incorrect" in data
 
+    def test_get_user_by_id_with_fields(self):
+        response = self.client.get("/users/{}?fields=emailAddress,locked".format(self.users[0]["id"]))
+
+        assert response.status_code == 200
+        assert json.loads(response.get_data()) == {
+            'users': {'id': self.users[0]['id'], 'emailAddress': 'j@examplecompany.biz', 'locked': False},
+        }
+
+    @pytest.mark.parametrize('query_string', ('', '&email_address=j@examplecompany.biz'))
+    def test_list_users_with_fields(self, query_string):
+        response = self.client.get("/users?fields=name,role" + query_string)
+
+        assert response.status_code == 200
+        assert json.loads(response.get_data())['users'][0] == {
+            'id': self.users[0]['id'], 'name': 'John Example', 'role': 'supplier',
+        }
+
+    def test_not_modified_if_etag_matches(self):
+        etag = self.client.get("/users/{}".format(self.users[0]["id"])).headers['ETag']
+
+        response = self.client.get("/users/{}".format(self.users[0]["id"]), headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+
+    def test_etag_changes_when_the_user_is_locked(self):
+        etag = self.client.get("/users/{}".format(self.users[0]["id"])).headers['ETag']
+        self.app.config['DM_FAILED_LOGIN_LIMIT'] = 0
+
+        response = self.client.get("/users/{}".format(self.users[0]["id"]), headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert json.loads(response.get_data())['users']['locked'] is True
+
 
 class TestUsersExport(BaseUserTest, FixtureMixin):
     framework_slug = None
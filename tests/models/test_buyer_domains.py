@@ -1,6 +1,9 @@
 from app import db
-from app.models.buyer_domains import BuyerEmailDomain
+from app.models.buyer_domains import (
+    approved_buyer_domain_names, BuyerEmailDomain, invalidate_buyer_domain_cache, is_approved_buyer_email_address
+)
 from tests.bases import BaseApplicationTest
+from tests.models.test_main import captured_statements
 
 
 class TestBuyerEmailDomains(BaseApplicationTest):
@@ -18,3 +21,78 @@ class TestBuyerEmailDomains(BaseApplicationTest):
         buyer_domain = BuyerEmailDomain(domain_name="superkalifragilisticexpialidocious.org.uk")
 
         assert buyer_domain.serialize().keys() == {'id', 'domainName'}
+
+
+class TestApprovedBuyerDomainNames(BaseApplicationTest):
+    def setup(self):
+        super(TestApprovedBuyerDomainNames, self).setup()
+        self.app.config['DM_API_BUYER_DOMAINS_CACHE_TTL'] = 60
+        invalidate_buyer_domain_cache()
+        db.session.add(BuyerEmailDomain(domain_name='cool.gov'))
+        db.session.commit()
+
+    def teardown(self):
+        invalidate_buyer_domain_cache()
+        super(TestApprovedBuyerDomainNames, self).teardown()
+
+    def test_domain_names_are_only_queried_once(self):
+        with self.app.app_context(), self.app.test_request_context():
+            assert 'cool.gov' in approved_buyer_domain_names()
+
+            with captured_statements() as statements:
+                assert is_approved_buyer_email_address('hurray@very.cool.gov')
+                assert not is_approved_buyer_email_address('hurray@notcool.gov')
+
+        assert statements == []
+
+    def test_domain_names_are_checked_once_per_request(self):
+        with self.app.app_context(), self.app.test_request_context():
+            approved_buyer_domain_names()
+
+        with self.app.app_context(), self.app.test_request_context():
+            with captured_statements() as statements:
+                assert is_approved_buyer_email_address('hurray@cool.gov')
+
+        assert len(statements) == 1
+
+    def test_invalidating_the_cache_reads_new_domains(self):
+        with self.app.app_context(), self.app.test_request_context():
+            approved_buyer_domain_names()
+            db.session.add(BuyerEmailDomain(domain_name='warm.gov'))
+            db.session.commit()
+
+            assert not is_approved_buyer_email_address('hurray@warm.gov')
+            invalidate_buyer_domain_cache()
+            assert is_approved_buyer_email_address('hurray@warm.gov')
+
+    def test_a_domain_added_by_another_process_is_read(self):
+        with self.app.app_context(), self.app.test_request_context():
+            approved_buyer_domain_names()
+
+        # as create_buyer_email_domain would in another process, which can't invalidate this process's cache
+        db.session.add(BuyerEmailDomain(domain_name='warm.gov'))
+        db.session.commit()
+
+        with self.app.app_context(), self.app.test_request_context():
+            assert is_approved_buyer_email_address('hurray@warm.gov')
+
+    def test_a_domain_removed_by_another_process_is_no_longer_approved(self):
+        db.session.add(BuyerEmailDomain(domain_name='warm.gov'))
+        db.session.commit()
+        with self.app.app_context(), self.app.test_request_context():
+            assert is_approved_buyer_email_address('hurray@cool.gov')
+
+        BuyerEmailDomain.query.filter(BuyerEmailDomain.domain_name == 'cool.gov').delete()
+        db.session.commit()
+
+        with self.app.app_context(), self.app.test_request_context():
+            assert not is_approved_buyer_email_address('hurray@cool.gov')
+
+    def test_cache_is_not_used_if_ttl_is_zero(self):
+        self.app.config['DM_API_BUYER_DOMAINS_CACHE_TTL'] = 0
+        approved_buyer_domain_names()
+
+        with captured_statements() as statements:
+            assert is_approved_buyer_email_address('hurray@cool.gov')
+
+        assert len(statements) == 1
@@ -1,11 +1,17 @@
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 import mock
 import pytest
 from freezegun import freeze_time
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import IntegrityError
+from dmutils.dates import get_publishing_dates
 
 from app import db
+from app.models.main import _publishing_dates
+from app.service_utils import filter_services
 from app.models import (
     User, Lot, Framework, Service,
     Supplier, SupplierFramework, FrameworkAgreement,
@@ -13,8 +19,11 @@ from app.models import (
     ValidationError,
     BriefClarificationQuestion,
     DraftService,
+    ArchivedService,
     FrameworkLot,
-    ContactInformation
+    ContactInformation,
+    SupplierServiceCount,
+    UserResolver,
 )
 from tests.bases import BaseApplicationTest
 from tests.helpers import FixtureMixin
@@ -414,6 +423,20 @@ class TestBriefs(BaseApplicationTest, FixtureMixin):
         assert brief.clarification_questions[0].question == "How?"
         assert brief.clarification_questions[1].question == "When"
 
+    def test_publishing_dates_are_shared_by_briefs_published_on_the_same_day(self):
+        _publishing_dates.cache_clear()
+        briefs = [
+            Brief(data={'requirementsLength': '1 week'}, framework=self.framework, lot=self.lot,
+                  published_at=datetime(2016, 3, 3, hour)) for hour in (9, 12, 17)
+        ]
+        with mock.patch('app.models.main.get_publishing_dates', wraps=get_publishing_dates) as get_dates:
+            for brief in briefs:
+                assert brief.applications_closed_at == datetime(2016, 3, 10, 23, 59, 59)
+                assert brief.clarification_questions_closed_at == datetime(2016, 3, 7, 23, 59, 59)
+                assert brief.clarification_questions_published_by == datetime(2016, 3, 9, 23, 59, 59)
+
+        assert get_dates.call_count == 1
+
 
 class TestBriefStatuses(BaseApplicationTest, FixtureMixin):
     def setup(self):
@@ -786,6 +809,70 @@ class TestBriefQueries(BaseApplicationTest, FixtureMixin):
             Brief.query.has_datetime_field_between('published_at', start_datetime=start_date, end_datetime=end_date)
         assert str(e.value) == 'Datetime object required'
 
+    def test_deadlines_are_stored_when_a_brief_is_published(self):
+        brief = Brief(data={'requirementsLength': '1 week'}, framework=self.framework, lot=self.lot)
+        db.session.add(brief)
+        db.session.commit()
+
+        assert Brief.query.filter(Brief.applications_closed_at.isnot(None)).count() == 0
+
+        brief.published_at = datetime(2016, 3, 3, 12, 30, 1, 2)
+        db.session.commit()
+
+        assert db.session.query(
+            Brief.applications_closed_at,
+            Brief.clarification_questions_closed_at,
+            Brief.clarification_questions_published_by,
+        ).one() == (
+            datetime(2016, 3, 10, 23, 59, 59), datetime(2016, 3, 7, 23, 59, 59), datetime(2016, 3, 9, 23, 59, 59)
+        )
+
+    def test_stored_deadlines_follow_the_requirements_length(self):
+        brief = Brief(data={}, framework=self.framework, lot=self.lot, published_at=datetime(2016, 3, 3, 12))
+        db.session.add(brief)
+        db.session.commit()
+
+        brief.data = {'requirementsLength': '1 week'}
+        db.session.commit()
+
+        assert Brief.query.filter(Brief.applications_closed_at == datetime(2016, 3, 10, 23, 59, 59)).count() == 1
+
+    def test_has_statuses_matches_the_status_of_each_brief(self):
+        self.setup_dummy_suppliers(1)
+        briefs = {
+            'draft': Brief(data={}, framework=self.framework, lot=self.lot),
+            'live': Brief(data={}, framework=self.framework, lot=self.lot, published_at=datetime.utcnow()),
+            'withdrawn': Brief(
+                data={}, framework=self.framework, lot=self.lot,
+                published_at=datetime.utcnow() - timedelta(days=1), withdrawn_at=datetime.utcnow()
+            ),
+            'closed': Brief(data={}, framework=self.framework, lot=self.lot, published_at=datetime(2000, 1, 1)),
+            'cancelled': Brief(
+                data={}, framework=self.framework, lot=self.lot, published_at=datetime(2000, 1, 1),
+                cancelled_at=datetime(2000, 2, 2)
+            ),
+            'unsuccessful': Brief(
+                data={}, framework=self.framework, lot=self.lot, published_at=datetime(2000, 1, 1),
+                unsuccessful_at=datetime(2000, 2, 2)
+            ),
+            'awarded': Brief(data={}, framework=self.framework, lot=self.lot, published_at=datetime(2000, 1, 1)),
+        }
+        brief_response = BriefResponse(
+            brief=briefs['awarded'], data={}, supplier_id=0, submitted_at=datetime(2000, 2, 1),
+            award_details={'pending': True}
+        )
+        db.session.add_all(list(briefs.values()) + [brief_response])
+        db.session.commit()
+        brief_response.awarded_at = datetime(2001, 1, 1)
+        db.session.commit()
+
+        for status, brief in briefs.items():
+            assert [b.id for b in Brief.query.has_statuses(status)] == [brief.id]
+            assert Brief.query.filter(Brief.status == status).one().id == brief.id
+        assert Brief.query.has_statuses('live', 'closed').count() == 2
+        assert Brief.query.has_statuses('invalid').count() == 0
+        assert Brief.query.has_statuses().count() == 0
+
 
 class TestAwardedBriefs(BaseApplicationTest, FixtureMixin):
     def setup(self):
@@ -1657,6 +1744,15 @@ class TestServices(BaseApplicationTest, FixtureMixin):
         services = Service.query.data_key_contains_value('key1', 'bar1')
         assert services.count() == 0
 
+    def test_data_filters_use_operators_a_gin_index_can_answer(self):
+        has_key = str(Service.query.data_has_key('key1').statement.compile(dialect=postgresql.dialect()))
+        contains = str(
+            Service.query.data_key_contains_value('key1', 'foo1').statement.compile(dialect=postgresql.dialect())
+        )
+
+        assert 'services.data ? ' in has_key
+        assert 'services.data @> ' in contains
+
     def test_service_status(self):
         service = Service(status='enabled')
 
@@ -1697,6 +1793,49 @@ class TestServices(BaseApplicationTest, FixtureMixin):
         assert service.data == {'foo': 'bar', 'serviceName': 'Service 1000000000'}
 
 
+class TestServiceListingPlans(BaseApplicationTest, FixtureMixin):
+    def setup(self):
+        super(TestServiceListingPlans, self).setup()
+        self.setup_dummy_suppliers(3)
+        self.setup_dummy_services(20, supplier_id=1)
+        self.setup_dummy_services(20, supplier_id=2, start_id=20)
+        db.session.execute('ANALYZE services')
+        self.framework_slug = Framework.query.get(1).slug
+
+    def test_published_services_on_a_framework_use_the_partial_index(self):
+        services = filter_services(framework_slugs=[self.framework_slug], statuses=['published'])
+
+        plan = explained_plan(services.with_entities(Service.id))
+
+        assert 'ix_services_published_framework_id_id' in plan
+        assert 'Seq Scan' not in plan
+
+    def test_services_with_other_statuses_use_the_framework_and_status_index(self):
+        services = filter_services(framework_slugs=[self.framework_slug], statuses=['enabled', 'disabled'])
+
+        plan = explained_plan(services.with_entities(Service.id))
+
+        assert 'ix_services_framework_id_status_id' in plan
+        assert 'Seq Scan' not in plan
+
+    def test_a_suppliers_services_are_read_in_order_from_the_service_name_index(self):
+        services = Service.query.filter(Service.supplier_id == 1).default_order()
+
+        plan = explained_plan(services.with_entities(Service.id))
+
+        assert 'ix_services_supplier_id_service_name' in plan
+        assert 'Sort' not in plan
+
+    def test_frameworks_and_lots_are_filtered_by_id(self):
+        services = filter_services(framework_slugs=[self.framework_slug], lot_slug=Lot.query.get(1).slug)
+
+        sql = str(services.statement.compile(dialect=postgresql.dialect()))
+
+        assert 'FROM frameworks' not in sql
+        assert 'FROM lots' not in sql
+        assert services.count() == 40
+
+
 class TestDraftService(BaseApplicationTest, FixtureMixin):
     def setup(self):
         super().setup()
@@ -1793,6 +1932,93 @@ class TestDraftService(BaseApplicationTest, FixtureMixin):
         assert draft_service.status == service.status
 
 
+def explained_plan(query):
+    """Postgres's plan for `query`, with sequential scans discouraged so small test tables still use indexes."""
+    compiled = query.statement.compile(dialect=postgresql.dialect())
+    connection = db.session.connection()
+    connection.execute('SET LOCAL enable_seqscan = off')
+    return '\n'.join(row[0] for row in connection.execute('EXPLAIN ' + str(compiled), compiled.params))
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.mark.parametrize('model', (Service, DraftService, ArchivedService))
+class TestServiceLoadingProfiles(BaseApplicationTest, FixtureMixin):
+    def setup(self):
+        super().setup()
+        self.setup_dummy_suppliers(1)
+        db.session.add(ContactInformation(supplier_id=0, contact_name=u'Second contact', email=u'2@contact.com'))
+        db.session.commit()
+
+    def _query(self, model):
+        self.setup_dummy_service(service_id='1000000000', supplier_id=0, model=model)
+        db.session.remove()
+        return model.query.filter(model.service_id == '1000000000')
+
+    def test_default_loading_joins_in_contacts_and_lots(self, model):
+        query = self._query(model)
+
+        with captured_statements() as statements:
+            query.first()
+
+        assert len(statements) == 1
+        assert 'contact_information' in statements[0]
+        assert 'framework_lots' in statements[0]
+
+    def test_list_profile_only_joins_supplier_framework_and_lot(self, model):
+        query = self._query(model).options(*model.loading_options('list'))
+
+        with captured_statements() as statements:
+            service = query.first()
+            with self.app.test_request_context():
+                service.serialize()
+
+        assert len(statements) == 1
+        assert 'JOIN suppliers' in statements[0]
+        assert 'JOIN frameworks' in statements[0]
+        assert 'JOIN lots' in statements[0]
+        assert 'contact_information' not in statements[0]
+        assert 'framework_lots' not in statements[0]
+        assert service.supplier.contact_information == []
+
+    @pytest.mark.parametrize('profile', ('single', 'write'))
+    def test_single_and_write_profiles_load_collections_when_used(self, model, profile):
+        query = self._query(model).options(*model.loading_options(profile))
+
+        with captured_statements() as statements:
+            service = query.first()
+            with self.app.test_request_context():
+                service.serialize()
+
+        assert len(statements) == 1
+        assert 'contact_information' not in statements[0]
+        assert 'framework_lots' not in statements[0]
+
+        with captured_statements() as statements:
+            assert len(service.supplier.contact_information) == 2
+            assert service.framework.lots
+
+        assert len(statements) == 2
+        assert 'FROM contact_information' in statements[0]
+        assert 'framework_lots' in statements[1]
+
+    def test_unknown_profile(self, model):
+        with pytest.raises(KeyError):
+            model.loading_options('everything')
+
+
 class TestSupplierFrameworks(BaseApplicationTest, FixtureMixin):
     def test_nulls_are_stripped_from_declaration(self):
         supplier_framework = SupplierFramework()
@@ -1854,6 +2080,155 @@ class TestSupplierFrameworks(BaseApplicationTest, FixtureMixin):
             db.session.commit()
 
 
+class TestSupplierServiceCounts(BaseApplicationTest, FixtureMixin):
+    def setup(self):
+        super(TestSupplierServiceCounts, self).setup()
+        self.setup_dummy_suppliers(2)
+        self.setup_dummy_services(3, supplier_id=1)
+        self.setup_dummy_service('2000000010', supplier_id=1, status='not-submitted', model=DraftService)
+        self.setup_dummy_service('2000000011', supplier_id=1, status='published', model=DraftService)
+
+    def _counts(self, supplier_id=1):
+        return {
+            (row.framework_id, row.table_name, row.status): row.count
+            for row in SupplierServiceCount.query.filter(SupplierServiceCount.supplier_id == supplier_id)
+        }
+
+    def test_services_and_drafts_are_counted_when_created(self):
+        assert self._counts() == {
+            (1, 'services', 'published'): 3,
+            (1, 'draft_services', 'not-submitted'): 1,
+            (1, 'draft_services', 'published'): 1,
+        }
+        assert self._counts(supplier_id=0) == {}
+
+    def test_counts_follow_status_changes_and_deletes(self):
+        services = Service.query.filter(Service.supplier_id == 1).order_by(Service.id).all()
+        services[0].status = 'disabled'
+        db.session.delete(services[1])
+        DraftService.query.filter(DraftService.status == 'not-submitted').update({'status': 'submitted'})
+        db.session.commit()
+
+        assert self._counts() == {
+            (1, 'services', 'published'): 1,
+            (1, 'services', 'disabled'): 1,
+            (1, 'draft_services', 'not-submitted'): 0,
+            (1, 'draft_services', 'submitted'): 1,
+            (1, 'draft_services', 'published'): 1,
+        }
+
+    def test_counts_follow_a_service_moving_supplier(self):
+        Service.query.filter(Service.supplier_id == 1).limit(1).one().supplier_id = 0
+        db.session.commit()
+
+        assert self._counts()[(1, 'services', 'published')] == 2
+        assert self._counts(supplier_id=0) == {(1, 'services', 'published'): 1}
+
+    def test_supplier_framework_service_counts_are_read_from_the_counts(self):
+        with captured_statements() as statements:
+            counts = SupplierFramework.get_service_counts(1)
+
+        assert len(statements) == 1
+        assert 'supplier_service_counts' in statements[0]
+        # a draft count takes precedence over a service count with the same status
+        assert counts == {(1, 'published'): 1, (1, 'not-submitted'): 1}
+
+    def test_rebuild_recounts_everything(self):
+        expected = self._counts()
+        SupplierServiceCount.query.update({'count': 42})
+        db.session.add(SupplierServiceCount(supplier_id=0, framework_id=1, table_name='services', status='x', count=1))
+        db.session.commit()
+
+        assert SupplierServiceCount.rebuild() == 3
+        db.session.commit()
+
+        assert self._counts() == expected
+        assert self._counts(supplier_id=0) == {}
+
+
+class TestSupplierFrameworkUsers(BaseApplicationTest, FixtureMixin):
+    def setup(self):
+        super(TestSupplierFrameworkUsers, self).setup()
+        self.setup_dummy_suppliers(1)
+        for user_id in (1, 2, 3, 4):
+            self.setup_dummy_user(id=user_id)
+        db.session.add(SupplierFramework(
+            supplier_id=0,
+            framework_id=1,
+            agreed_variations={
+                '1': {'agreedUserId': 1, 'agreedAt': '2017-01-01T00:00:00.000000Z'},
+                '2': {'agreedUserId': 2, 'agreedAt': '2017-01-01T00:00:00.000000Z'},
+            },
+        ))
+        db.session.add(FrameworkAgreement(
+            supplier_id=0,
+            framework_id=1,
+            signed_agreement_details={'uploaderUserId': 3},
+            signed_agreement_returned_at=datetime(2017, 1, 2),
+            countersigned_agreement_details={'approvedByUserId': 4},
+            countersigned_agreement_returned_at=datetime(2017, 1, 3),
+        ))
+        db.session.commit()
+
+    def test_users_are_looked_up_in_one_query(self):
+        supplier_framework = SupplierFramework.query.filter(SupplierFramework.supplier_id == 0).first()
+
+        with captured_statements() as statements:
+            serialized = supplier_framework.serialize(with_users=True)
+
+        assert len([statement for statement in statements if 'FROM users' in statement]) == 1
+        assert serialized['agreedVariations']['1']['agreedUserEmail'] == 'test+1@digital.gov.uk'
+        assert serialized['agreedVariations']['2']['agreedUserEmail'] == 'test+2@digital.gov.uk'
+        assert serialized['agreementDetails']['uploaderUserEmail'] == 'test+3@digital.gov.uk'
+        assert serialized['countersignedDetails']['approvedByUserEmail'] == 'test+4@digital.gov.uk'
+        assert serialized['countersignedDetails']['approvedByUserName'] == 'my name'
+
+    def test_users_are_not_looked_up_without_with_users(self):
+        supplier_framework = SupplierFramework.query.filter(SupplierFramework.supplier_id == 0).first()
+
+        with captured_statements() as statements:
+            serialized = supplier_framework.serialize()
+
+        assert not [statement for statement in statements if 'FROM users' in statement]
+        assert 'agreedUserEmail' not in serialized['agreedVariations']['1']
+
+
+class TestUserResolver(BaseApplicationTest, FixtureMixin):
+    def setup(self):
+        super(TestUserResolver, self).setup()
+        for user_id in (1, 2):
+            self.setup_dummy_user(id=user_id)
+
+    def test_fetch_looks_up_ids_and_email_addresses_in_one_query(self):
+        users = UserResolver()
+
+        with captured_statements() as statements:
+            users.fetch(user_ids=[1, '2', 99, None], email_addresses=['test+1@digital.gov.uk', 'nobody@example.com'])
+            assert users.by_id(1).email_address == 'test+1@digital.gov.uk'
+            assert users.by_id('2').name == 'my name'
+            assert users.by_id(99) is None
+            assert users.by_email_address('test+1@digital.gov.uk').id == 1
+            assert users.by_email_address('nobody@example.com') is None
+
+        assert len(statements) == 1
+
+    def test_users_are_only_looked_up_once(self):
+        users = UserResolver()
+        users.by_id(1)
+
+        with captured_statements() as statements:
+            users.fetch(user_ids=[1, 2])
+            users.by_id(2)
+
+        assert len(statements) == 1
+
+    def test_resolver_is_shared_within_a_request(self):
+        with self.app.test_request_context():
+            assert UserResolver.for_request() is UserResolver.for_request()
+
+        assert UserResolver.for_request() is not UserResolver.for_request()
+
+
 class TestLot(BaseApplicationTest):
     def test_lot_data_is_serialized(self):
         self.framework = Framework.query.filter(Framework.slug == 'digital-outcomes-and-specialists').first()
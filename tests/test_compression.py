@@ -0,0 +1,125 @@
+import gzip
+import json
+import zlib
+
+import pytest
+from flask import Flask, Response, stream_with_context
+
+from app import compression
+from app.compression import compress_response
+
+PAYLOAD = {'services': [{'id': i, 'serviceName': 'Service {}'.format(i)} for i in range(200)]}
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(
+        DM_API_COMPRESSION_ENCODINGS=['gzip'],
+        DM_API_COMPRESSION_MIN_SIZE=1024,
+        DM_API_GZIP_LEVEL=6,
+        DM_API_BROTLI_QUALITY=4,
+    )
+
+    @app.route('/large')
+    def large():
+        response = Response(json.dumps(PAYLOAD), mimetype='application/json')
+        response.set_etag('abc')
+        return response
+
+    @app.route('/small')
+    def small():
+        return Response(json.dumps({'id': 1}), mimetype='application/json')
+
+    @app.route('/streamed')
+    def streamed():
+        chunks = [b'{"services": ['] + [json.dumps(service).encode('utf-8') + b',' for service in PAYLOAD['services']]
+        return Response(stream_with_context(iter(chunks + [b'null]}'])), mimetype='application/json')
+
+    @app.route('/not-json')
+    def not_json():
+        return Response(b'\x00' * 2048, mimetype='application/octet-stream')
+
+    app.after_request(compress_response)
+    return app
+
+
+def test_large_responses_are_gzipped(app):
+    response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert int(response.headers['Content-Length']) == len(response.get_data()) < len(json.dumps(PAYLOAD))
+    assert json.loads(gzip.decompress(response.get_data()).decode('utf-8')) == PAYLOAD
+
+
+def test_compressed_responses_have_weak_etags(app):
+    response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['ETag'] == 'W/"abc"'
+
+
+def test_responses_are_not_compressed_without_accept_encoding(app):
+    response = app.test_client().get('/large')
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.headers['ETag'] == '"abc"'
+    assert json.loads(response.get_data(as_text=True)) == PAYLOAD
+
+
+def test_responses_are_not_compressed_if_gzip_is_refused(app):
+    response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+
+    assert 'Content-Encoding' not in response.headers
+
+
+@pytest.mark.parametrize('path', ('/small', '/not-json'))
+def test_small_and_binary_responses_are_not_compressed(app, path):
+    response = app.test_client().get(path, headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert 'Vary' not in response.headers
+
+
+def test_compression_can_be_turned_off(app):
+    app.config['DM_API_COMPRESSION_ENCODINGS'] = []
+
+    response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_streamed_responses_are_compressed_as_they_are_written(app):
+    response = app.test_client().get('/streamed', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.get_data()).decode('utf-8'))['services'][:-1] == PAYLOAD['services']
+
+
+def test_streamed_chunks_can_be_decompressed_as_they_arrive(app):
+    with app.test_request_context():
+        chunks = compression._compressed_chunks(iter([b'{"a": ', b'1}']), 'gzip', 6)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        assert decompressor.decompress(next(chunks)) == b'{"a": '
+        assert decompressor.decompress(next(chunks)) == b'1}'
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli is not installed")
+def test_brotli_is_preferred_if_configured(app):
+    app.config['DM_API_COMPRESSION_ENCODINGS'] = ['br', 'gzip']
+
+    response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(compression.brotli.decompress(response.get_data()).decode('utf-8')) == PAYLOAD
+
+
+def test_brotli_is_skipped_if_not_installed(app, monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    app.config['DM_API_COMPRESSION_ENCODINGS'] = ['br', 'gzip']
+
+    response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
@@ -0,0 +1,66 @@
+from app import db
+from app.draft_utils import validate_drafts_for_framework
+from app.models import DraftService, Framework, Lot
+from tests.bases import BaseApplicationTest
+from tests.helpers import FixtureMixin, load_example_listing
+from tests.test_validation import drop_api_exported_fields_so_that_api_import_will_validate
+
+
+class TestValidateDraftsForFramework(BaseApplicationTest, FixtureMixin):
+    def setup(self):
+        super().setup()
+        self.setup_dummy_suppliers(1)
+        self.framework = Framework.query.filter(Framework.slug == 'g-cloud-7').first()
+        self.valid_data = drop_api_exported_fields_so_that_api_import_will_validate(load_example_listing("G7-SCS"))
+
+    def _create_draft(self, data, status='submitted'):
+        draft = DraftService(
+            framework=self.framework,
+            lot=Lot.query.filter(Lot.slug == 'scs').first(),
+            supplier_id=0,
+            data=data,
+            status=status,
+        )
+        db.session.add(draft)
+        db.session.commit()
+        return draft.id
+
+    def _statuses(self):
+        return {draft.id: draft.status for draft in DraftService.query.all()}
+
+    def test_drafts_are_marked_submitted_or_failed(self):
+        valid_id = self._create_draft(self.valid_data)
+        invalid_id = self._create_draft(dict(self.valid_data, serviceName=''))
+        previously_failed_id = self._create_draft(self.valid_data, status='failed')
+        not_submitted_id = self._create_draft({}, status='not-submitted')
+
+        summary = validate_drafts_for_framework(self.framework, processes=1, batch_size=2)
+
+        assert self._statuses() == {
+            valid_id: 'submitted',
+            invalid_id: 'failed',
+            previously_failed_id: 'submitted',
+            not_submitted_id: 'not-submitted',
+        }
+        assert summary['submitted'] == 2
+        assert summary['failed'] == 1
+        assert summary['lots'] == {'scs': {'submitted': 2, 'failed': 1}}
+        assert summary['failedQuestions'] == {'serviceName': 1}
+        assert summary['failedDraftIds'] == [invalid_id]
+
+    def test_dry_run_does_not_change_statuses(self):
+        invalid_id = self._create_draft(dict(self.valid_data, serviceName=''))
+
+        summary = validate_drafts_for_framework(self.framework, processes=1, dry_run=True)
+
+        assert self._statuses() == {invalid_id: 'submitted'}
+        assert summary['failedDraftIds'] == [invalid_id]
+
+    def test_drafts_can_be_validated_in_a_process_pool(self):
+        valid_id = self._create_draft(self.valid_data)
+        invalid_id = self._create_draft(dict(self.valid_data, serviceName=''))
+
+        summary = validate_drafts_for_framework(self.framework, processes=2)
+
+        assert self._statuses() == {valid_id: 'submitted', invalid_id: 'failed'}
+        assert summary['failedDraftIds'] == [invalid_id]
@@ -0,0 +1,165 @@
+import json
+
+import pytest
+from dmapiclient.audit import AuditTypes
+
+from app import db
+from app.framework_utils import (
+    get_framework_by_slug, get_framework_by_slug_or_404, get_frameworks, invalidate_framework_cache
+)
+from app.models import AuditEvent, Framework, Service
+from app.service_utils import filter_services
+from tests.bases import BaseApplicationTest
+from tests.helpers import FixtureMixin
+from tests.models.test_main import captured_statements
+
+
+class TestGetFrameworkBySlug(BaseApplicationTest):
+    def setup(self):
+        super(TestGetFrameworkBySlug, self).setup()
+        self.app.config['DM_API_FRAMEWORK_CACHE_TTL'] = 60
+        invalidate_framework_cache()
+
+    def teardown(self):
+        invalidate_framework_cache()
+        super(TestGetFrameworkBySlug, self).teardown()
+
+    def test_frameworks_are_only_queried_once(self):
+        with self.app.test_request_context():
+            expected = Framework.query.filter(Framework.slug == 'g-cloud-6').first().serialize()
+            db.session.remove()
+            get_framework_by_slug('g-cloud-6')
+            db.session.remove()
+
+            with captured_statements() as statements:
+                framework = get_framework_by_slug('g-cloud-6')
+                assert framework.serialize() == expected
+                assert framework.get_lot('scs').slug == 'scs'
+
+        assert statements == []
+
+    def test_cached_framework_is_in_the_session(self):
+        with self.app.test_request_context():
+            framework = get_framework_by_slug('g-cloud-6')
+
+            assert framework in db.session
+            assert framework is Framework.query.filter(Framework.slug == 'g-cloud-6').first()
+
+    def test_unknown_slug_is_looked_up_in_the_database(self):
+        with self.app.test_request_context():
+            get_framework_by_slug('g-cloud-6')
+
+            with captured_statements() as statements:
+                assert get_framework_by_slug('not-a-framework') is None
+
+        assert len(statements) == 1
+
+    def test_unknown_slug_404s(self):
+        from werkzeug.exceptions import NotFound
+
+        with self.app.test_request_context():
+            with pytest.raises(NotFound):
+                get_framework_by_slug_or_404('not-a-framework')
+
+    def test_cache_expires(self):
+        with self.app.test_request_context():
+            get_framework_by_slug('g-cloud-6')
+            self.app.config['DM_API_FRAMEWORK_CACHE_TTL'] = 0.000001
+
+            with captured_statements() as statements:
+                get_framework_by_slug('g-cloud-6')
+
+        assert len(statements) > 0
+
+    def test_cache_is_not_used_if_ttl_is_zero(self):
+        self.app.config['DM_API_FRAMEWORK_CACHE_TTL'] = 0
+        with self.app.test_request_context():
+            get_framework_by_slug('g-cloud-6')
+            db.session.remove()
+
+            with captured_statements() as statements:
+                assert get_framework_by_slug('g-cloud-6').slug == 'g-cloud-6'
+
+        assert len(statements) == 1
+
+    def test_updating_a_framework_invalidates_the_cache(self):
+        with self.app.test_request_context():
+            was_open = get_framework_by_slug('g-cloud-6').clarification_questions_open
+
+        response = self.client.post(
+            '/frameworks/g-cloud-6',
+            data=json.dumps({'frameworks': {'clarificationQuestionsOpen': not was_open}, 'updated_by': 'example user'}),
+            content_type='application/json',
+        )
+        assert response.status_code == 200
+
+        with self.app.test_request_context():
+            assert get_framework_by_slug('g-cloud-6').clarification_questions_open is (not was_open)
+
+        Framework.query.filter(Framework.slug == 'g-cloud-6').update({'clarification_questions_open': was_open})
+        db.session.commit()
+
+    def test_a_framework_changed_by_another_process_is_read_again(self):
+        with self.app.app_context(), self.app.test_request_context():
+            framework = get_framework_by_slug('g-cloud-6')
+            was_open = framework.clarification_questions_open
+
+        # as update_framework would in another process, which can't invalidate this process's cache
+        Framework.query.filter(Framework.slug == 'g-cloud-6').update({'clarification_questions_open': not was_open})
+        db.session.add(AuditEvent(
+            audit_type=AuditTypes.framework_update,
+            db_object=Framework.query.filter(Framework.slug == 'g-cloud-6').first(),
+            user='example user',
+            data={},
+        ))
+        db.session.commit()
+
+        with self.app.app_context(), self.app.test_request_context():
+            assert get_framework_by_slug('g-cloud-6').clarification_questions_open is (not was_open)
+
+            with captured_statements() as statements:
+                get_framework_by_slug('g-cloud-6')
+
+        assert statements == []
+
+        Framework.query.filter(Framework.slug == 'g-cloud-6').update({'clarification_questions_open': was_open})
+        db.session.commit()
+
+
+class TestGetFrameworks(BaseApplicationTest, FixtureMixin):
+    def setup(self):
+        super(TestGetFrameworks, self).setup()
+        self.app.config['DM_API_FRAMEWORK_CACHE_TTL'] = 60
+        invalidate_framework_cache()
+
+    def teardown(self):
+        invalidate_framework_cache()
+        super(TestGetFrameworks, self).teardown()
+
+    def _change_status_in_another_process(self, framework_id, status):
+        # as update_framework would in another process, which can't invalidate this process's cache
+        framework = Framework.query.get(framework_id)
+        framework.status = status
+        db.session.add(AuditEvent(
+            audit_type=AuditTypes.framework_update, db_object=framework, user='example user', data={},
+        ))
+        db.session.commit()
+
+    def test_live_services_follow_a_framework_status_changed_by_another_process(self):
+        self.setup_dummy_suppliers(1)
+        self.setup_dummy_service('2000000001', supplier_id=0, framework_id=1)
+        was_status = Framework.query.get(1).status
+        self._change_status_in_another_process(1, 'live')
+
+        with self.app.app_context(), self.app.test_request_context():
+            assert {framework.id: framework.status for framework in get_frameworks()}[1] == 'live'
+            assert filter_services().filter(Service.service_id == '2000000001').count() == 1
+
+        self._change_status_in_another_process(1, 'expired')
+
+        with self.app.app_context(), self.app.test_request_context():
+            assert {framework.id: framework.status for framework in get_frameworks()}[1] == 'expired'
+            assert filter_services().filter(Service.service_id == '2000000001').count() == 0
+
+        Framework.query.filter(Framework.id == 1).update({'status': was_status})
+        db.session.commit()
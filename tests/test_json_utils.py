@@ -0,0 +1,136 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import mock
+import pytest
+from flask import Flask
+
+from app import json_utils
+from app.json_utils import decode, encode, json_default, jsonify, merge_raw_json_object, RawJSON, set_json_backend
+
+backends = pytest.mark.parametrize('backend', (
+    'stdlib',
+    pytest.param('orjson', marks=pytest.mark.skipif(
+        not hasattr(json_utils.orjson, 'Fragment'), reason="orjson 3.9+ is not installed"
+    )),
+))
+
+
+@pytest.fixture(autouse=True)
+def reset_json_backend():
+    yield
+    set_json_backend('stdlib')
+
+
+DOCUMENT = {
+    'serviceName': u'Cloud hösting',
+    'createdAt': datetime(2017, 1, 2, 3, 4, 5, 6),
+    'startDate': date(2017, 1, 2),
+    'price': Decimal('1.50'),
+    'count': Decimal('3'),
+    'nested': [{'b': 1, 'a': None}],
+}
+
+ENCODED_DOCUMENT = {
+    'serviceName': u'Cloud hösting',
+    'createdAt': '2017-01-02T03:04:05.000006Z',
+    'startDate': '2017-01-02',
+    'price': 1.5,
+    'count': 3,
+    'nested': [{'b': 1, 'a': None}],
+}
+
+
+def test_json_default_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        json_default(object())
+
+
+@backends
+def test_encode(backend):
+    set_json_backend(backend)
+
+    encoded = encode(DOCUMENT)
+
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded.decode('utf-8')) == ENCODED_DOCUMENT
+    assert encoded.index(b'"count"') < encoded.index(b'"createdAt"')
+
+
+@backends
+def test_encode_with_indent(backend):
+    set_json_backend(backend)
+
+    assert encode({'a': [1]}, indent=2) == b'{\n  "a": [\n    1\n  ]\n}'
+
+
+@backends
+def test_raw_json_is_written_as_it_is(backend):
+    set_json_backend(backend)
+    raw = RawJSON(b'{"b": [1, "\\u00f6"], "a": {}}')
+
+    assert encode(raw) == b'{"b": [1, "\\u00f6"], "a": {}}'
+    assert encode({'z': raw, 'y': [raw, RawJSON(b'null')]}) == (
+        b'{"y":[{"b": [1, "\\u00f6"], "a": {}},null],"z":{"b": [1, "\\u00f6"], "a": {}}}'
+        if backend == 'orjson' else
+        b'{"y": [{"b": [1, "\\u00f6"], "a": {}}, null], "z": {"b": [1, "\\u00f6"], "a": {}}}'
+    )
+
+
+def test_strings_like_raw_json_placeholders_are_left_alone():
+    assert json.loads(encode({'a': RawJSON('1'), 'b': u'\x00raw:0'}).decode('utf-8')) == {'a': 1, 'b': u'\x00raw:0'}
+
+
+@pytest.mark.parametrize('raw, extra, expected', (
+    (' {"a": 1} ', {'b': 2}, {'a': 1, 'b': 2}),
+    ('{}', {'b': 2}, {'b': 2}),
+    ('{"a": 1}', {}, {'a': 1}),
+    ('{"a": 1, "b": 1}', {'b': 2}, {'a': 1, 'b': 2}),
+))
+def test_merge_raw_json_object(raw, extra, expected):
+    assert json.loads(merge_raw_json_object(raw, extra).json.decode('utf-8')) == expected
+
+
+def test_merge_raw_json_object_rejects_other_json():
+    with pytest.raises(ValueError):
+        merge_raw_json_object('[1]', {'a': 1})
+
+
+@backends
+def test_decode(backend):
+    set_json_backend(backend)
+
+    assert decode(b'{"a": [1, "\\u00f6"]}') == {'a': [1, u'ö']}
+    assert decode(u'{"a": null}') == {'a': None}
+    with pytest.raises(ValueError):
+        decode(b'{"a": ')
+
+
+@backends
+def test_jsonify(backend):
+    set_json_backend(backend)
+    app = Flask(__name__)
+
+    with app.test_request_context():
+        response = jsonify({'b': DOCUMENT['createdAt']}, a=1)
+
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data(as_text=True)) == {'a': 1, 'b': '2017-01-02T03:04:05.000006Z'}
+
+
+def test_orjson_falls_back_to_stdlib_if_not_installed(monkeypatch):
+    monkeypatch.setattr(json_utils, 'orjson', None)
+
+    assert set_json_backend('orjson') == 'stdlib'
+
+
+def test_orjson_without_fragment_is_not_used(monkeypatch):
+    monkeypatch.setattr(json_utils, 'orjson', mock.Mock(spec=['dumps', 'loads']))
+
+    assert set_json_backend('orjson') == 'stdlib'
+
+
+def test_unknown_json_backend_is_rejected():
+    with pytest.raises(ValueError):
+        set_json_backend('fastest')
@@ -0,0 +1,62 @@
+import json
+
+from app.json_utils import encode, RawJSON
+from app.models import Service, Supplier
+from app.projections import project_services, project_suppliers, serialize_service_rows, serialize_supplier_rows
+from app.service_utils import filter_services
+from tests.bases import BaseApplicationTest
+from tests.helpers import FixtureMixin
+
+
+def _as_json(serialized):
+    return json.dumps(serialized, sort_keys=True)
+
+
+class TestProjections(BaseApplicationTest, FixtureMixin):
+    def setup(self):
+        super(TestProjections, self).setup()
+        self.setup_dummy_services_including_unpublished(7)
+
+    def test_service_rows_serialize_identically_to_services(self):
+        query = Service.query.order_by(Service.id)
+
+        with self.app.test_request_context():
+            expected = [service.serialize() for service in query]
+            actual = serialize_service_rows(project_services(query).all())
+
+        assert len(actual) == 9
+        assert _as_json(actual) == _as_json(expected)
+
+    def test_service_rows_with_raw_data_serialize_to_the_same_json(self):
+        query = Service.query.order_by(Service.id)
+
+        with self.app.test_request_context():
+            expected = [service.serialize() for service in query]
+            actual = serialize_service_rows(project_services(query, raw_data=True).all())
+
+        assert all(isinstance(service, RawJSON) for service in actual)
+        assert json.loads(encode(actual).decode('utf-8')) == json.loads(_as_json(expected))
+
+    def test_service_projection_keeps_filters_and_ordering(self):
+        query = filter_services(statuses=['published']).default_order().filter(Service.supplier_id == 1)
+
+        with self.app.test_request_context():
+            expected = [service.serialize() for service in query]
+            actual = serialize_service_rows(project_services(query).all())
+
+        assert [service['id'] for service in actual] == [service['id'] for service in expected]
+        assert _as_json(actual) == _as_json(expected)
+
+    def test_supplier_rows_serialize_identically_to_suppliers(self):
+        query = Supplier.query.order_by(Supplier.name, Supplier.supplier_id)
+
+        with self.app.test_request_context():
+            expected = [supplier.serialize() for supplier in query]
+            actual = serialize_supplier_rows(project_suppliers(query).all())
+
+        assert len(actual) == len(expected) > 0
+        assert _as_json(actual) == _as_json(expected)
+
+    def test_serializing_no_supplier_rows(self):
+        with self.app.test_request_context():
+            assert serialize_supplier_rows([]) == []
@@ -0,0 +1,143 @@
+"""
+Conformance tests for the compiled validators: for each schema they must produce exactly the same errors (and so the
+same translated error map) as the jsonschema validator they replace.
+"""
+import pytest
+from jsonschema.validators import validator_for
+
+from app.schema_compiler import compile_schema, UnsupportedSchema
+from app.validation import _SCHEMAS, FORMAT_CHECKER, get_validator, set_validation_engine, \
+    translate_json_schema_errors
+from tests.helpers import load_example_listing
+from tests.test_validation import drop_api_exported_fields_so_that_api_import_will_validate
+
+
+# Values which between them break most of the keywords used in our schemas
+BAD_VALUES = [
+    None, True, False, 0, -1, 1.5, 10 ** 12, "", "a", "1.5", "not-an-email", "word " * 600,
+    [], [""], ["a", "a"], [{}], [None, "a"], [{"assurance": None, "value": None}],
+    {}, {"value": None}, {"assurance": "Service provider assertion"},
+]
+
+EXAMPLE_LISTINGS = [
+    ("G4", "services-g-cloud-4"),
+    ("G5", "services-g-cloud-5"),
+    ("G6-PaaS", "services-g-cloud-6-paas"),
+    ("G6-IaaS", "services-g-cloud-6-iaas"),
+    ("G6-SaaS", "services-g-cloud-6-saas"),
+    ("G6-SCS", "services-g-cloud-6-scs"),
+    ("G7-SCS", "services-g-cloud-7-scs"),
+    ("DOS-digital-specialist", "services-digital-outcomes-and-specialists-digital-specialists"),
+]
+
+
+def _error_signature(error):
+    return (
+        error.message,
+        error.validator,
+        error.validator_value,
+        list(error.path),
+        list(error.schema_path),
+        error.instance,
+        [_error_signature(context) for context in error.context],
+    )
+
+
+def _assert_conforms(schema, compiled, instance):
+    reference = validator_for(schema)(schema, format_checker=FORMAT_CHECKER)
+
+    expected = list(reference.iter_errors(instance))
+    actual = list(compiled.iter_errors(instance))
+
+    assert [_error_signature(e) for e in actual] == [_error_signature(e) for e in expected]
+    assert compiled.is_valid(instance) is reference.is_valid(instance)
+    if isinstance(instance, dict):
+        assert _translated(actual, instance) == _translated(expected, instance)
+
+
+def _translated(errors, instance):
+    # Some nonsensical answers trip up translate_json_schema_errors itself; it just needs to trip up the same way
+    try:
+        return translate_json_schema_errors(errors, instance)
+    except Exception as e:
+        return type(e)
+
+
+def _compilable_schema_names():
+    names = []
+    for schema_name in sorted(_SCHEMAS):
+        try:
+            compile_schema(_SCHEMAS[schema_name])
+        except UnsupportedSchema:
+            continue
+        names.append(schema_name)
+    return names
+
+
+@pytest.fixture(autouse=True)
+def reset_validation_engine():
+    yield
+    set_validation_engine('jsonschema')
+
+
+def test_service_brief_and_brief_response_schemas_can_all_be_compiled():
+    for schema_name in _SCHEMAS:
+        if schema_name.startswith(('services-', 'briefs-', 'brief-responses-')):
+            compile_schema(_SCHEMAS[schema_name])
+
+
+def test_schemas_with_refs_are_not_compiled():
+    with pytest.raises(UnsupportedSchema):
+        compile_schema(_SCHEMAS['suppliers'])
+
+
+@pytest.mark.parametrize('schema_name', _compilable_schema_names())
+def test_compiled_validator_errors_match_jsonschema_for_bad_answers(schema_name):
+    schema = _SCHEMAS[schema_name]
+    compiled = compile_schema(schema, format_checker=FORMAT_CHECKER)
+
+    _assert_conforms(schema, compiled, {})
+    _assert_conforms(schema, compiled, [])
+    for value in BAD_VALUES:
+        # the same bad answer to every question at once
+        _assert_conforms(schema, compiled, {property_name: value for property_name in schema.get('properties', {})})
+
+
+@pytest.mark.parametrize('listing_name, schema_name', EXAMPLE_LISTINGS)
+def test_compiled_validator_errors_match_jsonschema_for_example_listings(listing_name, schema_name):
+    schema = _SCHEMAS[schema_name]
+    compiled = compile_schema(schema, format_checker=FORMAT_CHECKER)
+    data = drop_api_exported_fields_so_that_api_import_will_validate(load_example_listing(listing_name))
+
+    _assert_conforms(schema, compiled, data)
+    for key in data:
+        without_key = dict(data)
+        without_key.pop(key)
+        _assert_conforms(schema, compiled, without_key)
+        for value in (None, "", []):
+            _assert_conforms(schema, compiled, dict(data, **{key: value}))
+
+
+def test_get_validator_uses_compiled_validators_when_enabled():
+    set_validation_engine('compiled')
+
+    assert type(get_validator('services-g-cloud-7-scs')).__name__ == 'CompiledValidator'
+    assert type(get_validator('services-g-cloud-7-scs', False, ['serviceName'])).__name__ == 'CompiledValidator'
+    # suppliers uses a $ref, so falls back to jsonschema
+    assert type(get_validator('suppliers')).__name__ != 'CompiledValidator'
+
+
+def test_page_validation_matches_jsonschema_when_not_enforcing_required():
+    data = {'serviceName': '', 'serviceSummary': 'word ' * 600}
+
+    set_validation_engine('jsonschema')
+    expected = list(get_validator('services-g-cloud-7-scs', False, ['serviceName']).iter_errors(data))
+    set_validation_engine('compiled')
+    actual = list(get_validator('services-g-cloud-7-scs', False, ['serviceName']).iter_errors(data))
+
+    assert [_error_signature(e) for e in actual] == [_error_signature(e) for e in expected]
+
+
+def test_unknown_validation_engine_is_rejected():
+    with pytest.raises(ValueError):
+        set_validation_engine('fastest')
@@ -0,0 +1,87 @@
+import json
+import os
+
+import mock
+import pytest
+from jsonschema import SchemaError
+
+from app.schema_store import SchemaStore
+
+
+@pytest.fixture
+def schema_paths(tmpdir):
+    paths = []
+    for name, schema in (
+        ('first', {'type': 'object', 'required': ['a']}),
+        ('second', {'type': 'object', 'required': ['b']}),
+    ):
+        path = tmpdir.join('{}.json'.format(name))
+        path.write(json.dumps(schema))
+        paths.append(str(path))
+    return paths
+
+
+class TestSchemaStore(object):
+    def test_nothing_is_loaded_up_front(self, schema_paths):
+        store = SchemaStore(schema_paths)
+
+        assert store.loaded_count == 0
+        assert sorted(store) == ['first', 'second']
+        assert len(store) == 2
+
+    def test_schemas_are_loaded_on_first_use(self, schema_paths):
+        store = SchemaStore(schema_paths)
+
+        assert store['first'] == {'type': 'object', 'required': ['a']}
+        assert store.loaded_count == 1
+        assert store['first'] is store['first']
+
+    def test_unknown_schema_raises_key_error(self, schema_paths):
+        with pytest.raises(KeyError):
+            SchemaStore(schema_paths)['third']
+
+    def test_invalid_schema_is_rejected_when_loaded(self, tmpdir):
+        path = tmpdir.join('invalid.json')
+        path.write(json.dumps({'type': 'not-a-type'}))
+        store = SchemaStore([str(path)])
+
+        with pytest.raises(SchemaError):
+            store['invalid']
+
+    def test_load_all(self, schema_paths):
+        store = SchemaStore(schema_paths)
+        store['first']
+
+        assert store.load_all() == 1
+        assert store.loaded_count == 2
+
+    def test_schemas_are_not_checked_again_when_loaded_from_bundle(self, schema_paths, tmpdir):
+        bundle_path = str(tmpdir.join('bundle.json'))
+        assert SchemaStore(schema_paths).write_bundle(bundle_path) == 2
+
+        store = SchemaStore(schema_paths)
+        with mock.patch('app.schema_store.validator_for') as validator_for:
+            assert store.use_bundle(bundle_path) == 2
+            assert store['second'] == {'type': 'object', 'required': ['b']}
+
+        assert store.loaded_count == 2
+        assert validator_for.called is False
+
+    def test_bundle_entries_for_modified_files_are_ignored(self, schema_paths, tmpdir):
+        bundle_path = str(tmpdir.join('bundle.json'))
+        SchemaStore(schema_paths).write_bundle(bundle_path)
+        with open(schema_paths[0], 'w') as f:
+            json.dump({'type': 'object', 'required': ['a', 'aa']}, f)
+
+        store = SchemaStore(schema_paths)
+
+        assert store.use_bundle(bundle_path) == 1
+        assert store['first'] == {'type': 'object', 'required': ['a', 'aa']}
+
+    def test_bundle_entries_are_used_after_files_are_touched(self, schema_paths, tmpdir):
+        bundle_path = str(tmpdir.join('bundle.json'))
+        SchemaStore(schema_paths).write_bundle(bundle_path)
+        for schema_path in schema_paths:
+            os.utime(schema_path, (0, 0))
+
+        assert SchemaStore(schema_paths).use_bundle(bundle_path) == 2
@@ -1,4 +1,12 @@
-from app.url_utils import force_relative_url
+import json
+
+import pytest
+from flask import url_for as flask_url_for
+
+from app.url_utils import force_relative_url, template_url_for
+from app.utils import url_for
+from tests.bases import BaseApplicationTest
+from tests.helpers import FixtureMixin
 
 
 class TestForceRelativeURL(object):
@@ -22,3 +30,56 @@ class TestForceRelativeURL(object):
         # No way to be sure that removing "mismatch" is correct - so we must not (if this ever happened we
         # probably did something wrong).
         assert result == "/mismatch/plus/path?woo"
+
+
+class TestTemplateURLFor(BaseApplicationTest):
+    @pytest.mark.parametrize('external', (True, False))
+    @pytest.mark.parametrize('endpoint, values', (
+        ('main.get_service', {'service_id': '1234567890123456'}),
+        ('main.get_service', {'service_id': 1234567890123456}),
+        ('main.get_brief', {'brief_id': 1}),
+        ('main.get_brief', {'brief_id': '1'}),
+        ('main.update_contact_information', {'supplier_id': 1, 'contact_id': 2}),
+        ('main.list_services', {'page': 2, 'framework': 'g-cloud-9'}),
+        ('main.list_services', {'framework': 'g-cloud-9', 'page': 2}),
+        ('main.list_services', {'framework': 'g-cloud-8,g-cloud-9', 'page': 2}),
+        ('main.get_service', {'service_id': 'needs/quoting'}),
+        ('.get_service', {'service_id': '1'}),
+        ('main.list_services', {'_anchor': 'top'}),
+    ))
+    def test_same_as_flask_url_for(self, endpoint, values, external):
+        with self.app.test_request_context('/services'):
+            assert template_url_for(endpoint, _external=external, **values) == \
+                flask_url_for(endpoint, _external=external, **values)
+
+    def test_same_as_flask_url_for_outside_requests(self):
+        assert template_url_for('main.get_service', _external=True, service_id='1') == \
+            flask_url_for('main.get_service', _external=True, service_id='1')
+
+    def test_templates_are_filled_in_for_later_links(self):
+        with self.app.test_request_context('/'):
+            assert template_url_for('main.get_brief', _external=True, brief_id=1) == 'http://127.0.0.1:5000/briefs/1'
+            assert template_url_for('main.get_brief', _external=True, brief_id=2) == 'http://127.0.0.1:5000/briefs/2'
+
+
+class TestURLFor(BaseApplicationTest, FixtureMixin):
+    def test_links_are_absolute_by_default(self):
+        with self.app.test_request_context('/'):
+            assert url_for('main.get_service', service_id='123') == 'http://127.0.0.1:5000/services/123'
+
+    def test_relative_links(self):
+        self.app.config['DM_API_RELATIVE_LINKS'] = True
+
+        with self.app.test_request_context('/'):
+            assert url_for('main.get_service', service_id='123') == '/services/123'
+            assert url_for('main.get_service', service_id='123', _external=True) == \
+                'http://127.0.0.1:5000/services/123'
+
+    def test_relative_links_in_responses(self):
+        self.setup_dummy_suppliers(1)
+        self.app.config['DM_API_RELATIVE_LINKS'] = True
+
+        response = self.client.get('/suppliers/0')
+
+        assert response.status_code == 200
+        assert json.loads(response.get_data())['suppliers']['links']['self'] == '/suppliers/0'
@@ -1,4 +1,7 @@
 import json
+import string
+from datetime import datetime
+
 import mock
 import pytest
 
@@ -7,7 +10,10 @@ from flask import current_app
 from werkzeug.exceptions import BadRequest, HTTPException
 
 from app.utils import (
+    conditional_response,
+    decode_cursor,
     display_list,
+    encode_cursor,
     index_object,
     json_has_keys,
     json_has_matching_id,
@@ -17,9 +23,11 @@ from app.utils import (
     list_result_response,
     paginated_result_response,
     purge_nulls_from_data,
+    resource_etag,
     single_result_response,
     strip_whitespace_from_data,
 )
+from app.models import AuditEvent, Service, Supplier
 from tests.bases import BaseApplicationTest
 
 
@@ -231,6 +239,96 @@ class TestResultResponses(BaseApplicationTest):
             result.serialize.assert_has_calls(calls)
 
 
+class TestConditionalResponse(BaseApplicationTest):
+    last_modified = datetime(2017, 1, 2, 3, 4, 5)
+
+    def _response(self, **headers):
+        make_response = mock.Mock(return_value=(current_app.response_class('{}'), 200))
+        with self.app.test_request_context('/', headers=headers):
+            response = conditional_response(resource_etag(1, self.last_modified), self.last_modified, make_response)
+        return response, make_response
+
+    def test_response_has_validators(self):
+        response, make_response = self._response()
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] == '"{}"'.format(resource_etag(1, self.last_modified))
+        assert response.headers['Last-Modified'] == 'Mon, 02 Jan 2017 03:04:05 GMT'
+        make_response.assert_called_once_with()
+
+    def test_not_modified_if_etag_matches(self):
+        etag = '"{}"'.format(resource_etag(1, self.last_modified))
+
+        response, make_response = self._response(**{'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert make_response.called is False
+
+    def test_modified_if_etag_does_not_match(self):
+        response, make_response = self._response(**{
+            'If-None-Match': '"{}"'.format(resource_etag(2, self.last_modified)),
+            'If-Modified-Since': 'Mon, 02 Jan 2017 03:04:05 GMT',
+        })
+
+        assert response.status_code == 200
+
+    def test_not_modified_since(self):
+        response, make_response = self._response(**{'If-Modified-Since': 'Mon, 02 Jan 2017 03:04:05 GMT'})
+
+        assert response.status_code == 304
+
+    def test_modified_since(self):
+        response, make_response = self._response(**{'If-Modified-Since': 'Mon, 02 Jan 2017 03:04:04 GMT'})
+
+        assert response.status_code == 200
+
+
+class TestCursors(BaseApplicationTest):
+    def test_cursor_round_trip(self):
+        values = [datetime(2017, 1, 2, 3, 4, 5, 6), 'Supplier name', 123]
+
+        columns = [AuditEvent.created_at, Supplier.name, Supplier.supplier_id]
+
+        assert decode_cursor(encode_cursor(values), columns) == values
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(['?&/+', 1])
+
+        assert set(cursor) <= set(string.ascii_letters + string.digits + '-_=')
+
+    @pytest.mark.parametrize('cursor', ['not-a-cursor', encode_cursor([1]), encode_cursor([{'datetime': 'x'}, 1])])
+    def test_bad_cursors_are_rejected(self, cursor):
+        with pytest.raises(HTTPException) as e:
+            decode_cursor(cursor, [AuditEvent.created_at, AuditEvent.id])
+
+        assert e.value.code == 400
+
+    @pytest.mark.parametrize('values', [
+        ['x', 1],
+        [['x'], 1],
+        [{'datetime': '2017-01-02T03:04:05.000006'}, 1],
+        [123, 1],
+        [None, 1],
+        ['Supplier name', '1'],
+        ['Supplier name', 1.5],
+        ['Supplier name', True],
+        ['Supplier name', 2 ** 63],
+        ['Supplier\x00name', 1],
+    ])
+    def test_cursors_with_values_of_the_wrong_type_are_rejected(self, values):
+        with pytest.raises(HTTPException) as e:
+            decode_cursor(encode_cursor(values), [Supplier.name, Supplier.supplier_id])
+
+        assert e.value.code == 400
+
+    def test_integer_cursor_values_must_be_in_range(self):
+        assert decode_cursor(encode_cursor([2 ** 31 - 1]), [Service.id]) == [2 ** 31 - 1]
+        with pytest.raises(HTTPException) as e:
+            decode_cursor(encode_cursor([2 ** 31]), [Service.id])
+
+        assert e.value.code == 400
+
+
 def test_display_list_two_items():
     test_list = ["eggs", "spam"]
     expected = "eggs and spam"
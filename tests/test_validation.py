@@ -10,7 +10,9 @@ from jsonschema import validate, SchemaError, ValidationError
 from app.utils import drop_foreign_fields
 from app.validation import validates_against_schema, is_valid_service_id, is_valid_date, \
     is_valid_acknowledged_state, get_validation_errors, is_valid_string, min_price_less_than_max_price, \
-    translate_json_schema_errors, buyer_email_address_has_approved_domain, is_approved_buyer_domain
+    translate_json_schema_errors, buyer_email_address_has_approved_domain, is_approved_buyer_domain, \
+    domain_has_approved_suffix, get_validator, warm_validator_cache, get_incremental_validator, _SCHEMAS, \
+    _field_groups, _get_cached_field_group_validator
 from tests.helpers import load_example_listing
 
 
@@ -799,3 +801,127 @@ def test_is_approved_buyer_domain(domain, expected_result):
     ]
 
     assert is_approved_buyer_domain(existing_domains, domain) == expected_result
+
+
+@pytest.mark.parametrize(
+    'domain, expected_result', [
+        ('cool.gov', True), ('very.cool.gov', True), ('very.very.cool.gov', True), ('notcool.gov', False),
+        ('gov', False), ('cool.gov.uk', False), ('digital.gov.uk', True), ('uk', False), ('', False),
+    ]
+)
+def test_domain_has_approved_suffix(domain, expected_result):
+    assert domain_has_approved_suffix({'cool.gov', 'digital.gov.uk'}, domain) == expected_result
+
+
+class TestGetValidatorCache(object):
+    def test_same_validator_is_returned_for_repeated_calls(self):
+        assert get_validator('users') is get_validator('users')
+
+    def test_required_fields_are_ignored_when_enforcing_required(self):
+        assert get_validator('users') is get_validator('users', required_fields=['name'])
+
+    def test_order_of_required_fields_does_not_matter(self):
+        assert get_validator('users', False, ['name', 'role']) is get_validator('users', False, ['role', 'name'])
+
+    def test_different_required_fields_get_different_validators(self):
+        name_validator = get_validator('users', False, ['name'])
+        role_validator = get_validator('users', False, ['role'])
+
+        assert name_validator is not role_validator
+        assert name_validator.schema['required'] == ['name']
+        assert role_validator.schema['required'] == ['role']
+
+    def test_unenforced_validator_does_not_modify_cached_schema(self):
+        get_validator('users', False, ['name'])
+
+        assert set(get_validator('users').schema['required']) > {'name'}
+
+    def test_warm_validator_cache_builds_both_enforce_modes(self):
+        with mock.patch('app.validation.get_validator') as get_validator_mock:
+            warm_validator_cache(['users', 'new-supplier'])
+
+        assert get_validator_mock.call_args_list == [
+            mock.call('users'),
+            mock.call('users', enforce_required=False),
+            mock.call('new-supplier'),
+            mock.call('new-supplier', enforce_required=False),
+        ]
+
+
+class TestIncrementalValidation(object):
+    def test_only_touched_fields_are_validated(self):
+        data = load_example_listing("G7-SCS")
+        data = drop_api_exported_fields_so_that_api_import_will_validate(data)
+        data["serviceName"] = ""
+        data["serviceSummary"] = ""
+
+        errs = get_validation_errors("services-g-cloud-7-scs", data, enforce_required=False,
+                                     required_fields=["serviceName"], touched_fields=["serviceName"])
+
+        assert errs == {"serviceName": "answer_required"}
+
+    def test_required_fields_are_treated_as_touched(self):
+        errs = get_validation_errors("services-g-cloud-7-scs", {}, enforce_required=False,
+                                     required_fields=["serviceSummary"], touched_fields=[])
+
+        assert errs == {"serviceSummary": "answer_required"}
+
+    def test_unknown_touched_fields_are_still_rejected(self):
+        errs = get_validation_errors("services-g-cloud-7-scs", {"tea": "cakes"}, enforce_required=False,
+                                     touched_fields=["tea"])
+
+        assert errs == {"_form": ["Additional properties are not allowed ('tea' was unexpected)"]}
+
+    def test_dependencies_of_touched_fields_are_validated(self):
+        data = {"developerPriceMin": "1"}
+
+        errs = get_validation_errors("services-digital-outcomes-and-specialists-digital-specialists", data,
+                                     enforce_required=False, touched_fields=["developerPriceMin"])
+
+        assert errs == {"developerLocations": "answer_required", "developerPriceMax": "answer_required"}
+
+    def test_untouched_half_of_a_price_pair_is_compared(self):
+        data = {"agileCoachLocations": ["London"], "agileCoachPriceMin": "200", "agileCoachPriceMax": "100"}
+
+        errs = get_validation_errors("services-digital-outcomes-and-specialists-digital-specialists", data,
+                                     enforce_required=False, touched_fields=["agileCoachPriceMin"])
+
+        assert errs == {"agileCoachPriceMax": "max_less_than_min"}
+
+    def test_followup_questions_of_touched_fields_are_validated(self):
+        data = {"freeVersionTrialOption": True, "freeVersionDescription": "", "serviceName": ""}
+
+        errs = get_validation_errors("services-g-cloud-9-cloud-software", data, enforce_required=False,
+                                     touched_fields=["freeVersionTrialOption"])
+
+        assert errs == get_validation_errors(
+            "services-g-cloud-9-cloud-software", {"freeVersionTrialOption": True, "freeVersionDescription": ""},
+            enforce_required=False
+        )
+        assert "serviceName" not in errs
+
+    def test_incremental_validators_share_cached_field_group_validators(self):
+        validator, fields = get_incremental_validator("services-g-cloud-7-scs", ["serviceName"], ["serviceSummary"])
+        other_validator, other_fields = get_incremental_validator(
+            "services-g-cloud-7-scs", [], ["serviceSummary", "serviceName"]
+        )
+
+        group_validators = {group: part for part, group in validator.parts if group is not None}
+        assert group_validators == {group: part for part, group in other_validator.parts if group is not None}
+        assert fields == other_fields == {"serviceName", "serviceSummary"}
+        assert set(group_validators[frozenset(["serviceSummary"])].schema["properties"]) == {"serviceSummary"}
+
+    def test_field_group_validator_cache_grows_with_the_schema_not_the_touched_fields(self):
+        fields = sorted(_SCHEMAS["services-g-cloud-7-scs"]["properties"])
+        _get_cached_field_group_validator.cache_clear()
+
+        for start in range(len(fields)):
+            get_incremental_validator("services-g-cloud-7-scs", fields[:start], fields[start:start + 3])
+
+        groups = set(_field_groups("services-g-cloud-7-scs").values())
+        assert _get_cached_field_group_validator.cache_info().currsize <= len(groups) + 1
+
+    def test_touched_fields_are_ignored_when_enforcing_required(self):
+        errs = get_validation_errors("services-g-cloud-7-scs", {"serviceName": "Name"}, touched_fields=["serviceName"])
+
+        assert errs["serviceSummary"] == "answer_required"